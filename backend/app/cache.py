@@ -0,0 +1,173 @@
+import json
+from collections import OrderedDict
+from functools import lru_cache
+from logging import getLogger
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Protocol
+
+from app.config import get_settings
+
+log = getLogger(__name__)
+
+MISSING = object()
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Any: ...  # MISSING si absente ou expirée
+    def set(self, key: str, value: Any) -> None: ...
+    def delete(self, keys: list[str]) -> None: ...
+
+
+class MemoryCache:
+    """
+    In-process TTL + LRU cache. Values are stored as is, so callers must not
+    mutate what they get back.
+    """
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return MISSING
+            expires, value = item
+            if expires < monotonic():
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, keys: list[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+
+class LocalSharedCache(MemoryCache):
+    """
+    Local stand-in for the shared backend: values go through JSON like they
+    would through Redis, so what works here works against a real server.
+    """
+
+    def get(self, key: str) -> Any:
+        value = super().get(key)
+        return value if value is MISSING else json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        super().set(key, json.dumps(value))
+
+
+class RedisCache:
+    """
+    Shared cache across workers and hosts. Requires the optional `redis` package.
+    """
+
+    def __init__(self, url: str, ttl: float, prefix: str = "snd:") -> None:
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Any:
+        value = self.client.get(self.prefix + key)
+        return MISSING if value is None else json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(self.ttl)))
+
+    def delete(self, keys: list[str]) -> None:
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+
+class Cache:
+    """
+    Read-through cache used by the CRUD lookups, with hit/miss counters.
+    Values must be JSON-compatible (model_dump(mode="json")).
+    """
+
+    def __init__(self, backend: CacheBackend | None) -> None:
+        self.backend = backend
+        # Compteurs modifiés depuis les threads des requêtes : sous verrou, sinon des incréments se perdent
+        self._stats_lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for `key`, or call `loader` and cache its
+        result. A None result (row not found) is not cached.
+        """
+        if self.backend is None:
+            return loader()
+        value = self.backend.get(key)
+        hit = value is not MISSING
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if hit:
+            return value
+        value = loader()
+        if value is not None:
+            self.backend.set(key, value)
+        return value
+
+    def invalidate(self, *keys: str) -> None:
+        if self.backend is None or not keys:
+            return
+        with self._stats_lock:
+            self.invalidations += len(keys)
+        self.backend.delete(list(keys))
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else None,
+            "invalidations": self.invalidations,
+        }
+
+
+def cache_key(kind: str, value: Any) -> str:
+    return f"{kind}:{value}"
+
+
+@lru_cache()
+def get_cache() -> Cache:
+    settings = get_settings()
+    backend_name = settings["CACHE_BACKEND"]
+    ttl, max_size = settings["CACHE_TTL"], settings["CACHE_MAX_SIZE"]
+    if backend_name == "none":
+        return Cache(None)
+    if backend_name == "shared":
+        url = settings["CACHE_REDIS_URL"]
+        if url:
+            try:
+                return Cache(RedisCache(url, ttl))
+            except ImportError:
+                log.warning("CACHE_REDIS_URL is set but redis is not installed, using the local stand-in")
+        return Cache(LocalSharedCache(ttl, max_size))
+    return Cache(MemoryCache(ttl, max_size))
@@ -0,0 +1,61 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+
+from fastapi import Request, Response
+
+# Les clients revalident à chaque fois, mais un 304 évite requête complète et corps
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Weak ETag from the cheap validator of a resource (timestamps, counts),
+    never from the response body.
+    """
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def not_modified(
+    request: Request, etag: str, last_modified: datetime | None, exact_last_modified: bool = False
+) -> Response | None:
+    """
+    Return a 304 response if the client's validators still match, before any
+    row is loaded or serialised. If-None-Match takes precedence over
+    If-Modified-Since (RFC 9110).
+
+    If-Modified-Since is only honoured with `exact_last_modified`, when the
+    timestamp alone identifies the version (a file's mtime). It is ignored
+    otherwise: a count the ETag includes, a hard delete that leaves
+    max(updated_at) unchanged, or two writes in the same second (HTTP dates
+    have no sub-second part) would give a false 304.
+    """
+    headers = validator_headers(etag, last_modified)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if "*" in tags or etag.removeprefix("W/") in tags:
+            return Response(status_code=304, headers=headers)
+        return None
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None and exact_last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return None
+        if last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since:
+            return Response(status_code=304, headers=headers)
+    return None
+
+
+def validator_headers(etag: str, last_modified: datetime | None) -> dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    return headers
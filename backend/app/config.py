@@ -2,11 +2,69 @@ import os
 from dotenv import load_dotenv
 from functools import lru_cache
 
+
+def _as_bool(value: str | None, default: bool = False) -> bool:
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 @lru_cache()
 def get_settings():
     load_dotenv()  # Charge les variables depuis le fichier .env
     return {
         "API_KEY": os.getenv("API_KEY"),
         "DATABASE_URL": os.getenv("DATABASE_URL"),
+        # Active le moteur asynchrone (AsyncEngine/AsyncSession) pour tous les routeurs
+        "DB_ASYNC": _as_bool(os.getenv("DB_ASYNC")),
+        # URL du driver asynchrone, déduite de DATABASE_URL si absente
+        "ASYNC_DATABASE_URL": os.getenv("ASYNC_DATABASE_URL"),
+        # Pool de connexions (par moteur et par worker uvicorn)
+        "DB_POOL_SIZE": int(os.getenv("DB_POOL_SIZE", "5")),
+        "DB_MAX_OVERFLOW": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "DB_POOL_TIMEOUT": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "DB_POOL_RECYCLE": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "DB_POOL_PRE_PING": _as_bool(os.getenv("DB_POOL_PRE_PING"), default=True),
+        # Attente (en secondes) au-delà de laquelle un checkout est journalisé
+        "DB_POOL_SLOW_WAIT": float(os.getenv("DB_POOL_SLOW_WAIT", "0.1")),
+        # Nombre de lignes lues par aller-retour lors des exports en streaming
+        "EXPORT_CHUNK_SIZE": int(os.getenv("EXPORT_CHUNK_SIZE", "1000")),
+        # Insertions en masse : lignes par INSERT multi-lignes, et taille maximale d'un lot
+        "BULK_CHUNK_SIZE": int(os.getenv("BULK_CHUNK_SIZE", "1000")),
+        "BULK_MAX_ITEMS": int(os.getenv("BULK_MAX_ITEMS", "100000")),
+        # Cache des lectures par nom/email : memory (TTL+LRU par process), shared (Redis) ou none
+        "CACHE_BACKEND": os.getenv("CACHE_BACKEND", "memory").lower(),
+        "CACHE_TTL": float(os.getenv("CACHE_TTL", "60")),
+        "CACHE_MAX_SIZE": int(os.getenv("CACHE_MAX_SIZE", "10000")),
+        # Sans URL (ou sans le paquet redis), "shared" utilise un équivalent local
+        "CACHE_REDIS_URL": os.getenv("CACHE_REDIS_URL"),
+        # Budget de latence de /search (appliqué en statement_timeout sur PostgreSQL) et nombre max de résultats
+        "SEARCH_TIMEOUT_MS": int(os.getenv("SEARCH_TIMEOUT_MS", "150")),
+        "SEARCH_MAX_RESULTS": int(os.getenv("SEARCH_MAX_RESULTS", "50")),
+        # Répertoire des fichiers audio (Playlist.filename) et des peaks générés
+        "MEDIA_ROOT": os.getenv("MEDIA_ROOT", "media"),
+        # Génération des peaks : processus dédiés, frames par peak au niveau le plus fin
+        "PEAKS_WORKERS": int(os.getenv("PEAKS_WORKERS", "2")),
+        "PEAKS_SAMPLES_PER_PEAK": int(os.getenv("PEAKS_SAMPLES_PER_PEAK", "256")),
+        "PEAKS_CHUNK_FRAMES": int(os.getenv("PEAKS_CHUNK_FRAMES", "262144")),
+        # Fichiers de peaks gardés ouverts (mmap) pour GET /playlists/{id}/peaks
+        "PEAKS_OPEN_FILES": int(os.getenv("PEAKS_OPEN_FILES", "64")),
+        # Taille des lectures de GET /playlists/{id}/audio sans sendfile (mémoire par connexion)
+        "AUDIO_CHUNK_SIZE": int(os.getenv("AUDIO_CHUNK_SIZE", "65536")),
+        # Index en mémoire des pistes par playlist (requêtes "quelle piste à t")
+        "TIMELINE_TTL": float(os.getenv("TIMELINE_TTL", "30")),
+        "TIMELINE_MAX_PLAYLISTS": int(os.getenv("TIMELINE_MAX_PLAYLISTS", "1000")),
+        # Compteur d'écoutes en écriture différée : intervalle d'écriture (secondes) et shards
+        "LISTEN_FLUSH_INTERVAL": float(os.getenv("LISTEN_FLUSH_INTERVAL", "1")),
+        "LISTEN_SHARDS": int(os.getenv("LISTEN_SHARDS", "16")),
+        # Statistiques SQL par requête (en-tête Server-Timing, logs) et budget de requêtes par requête HTTP
+        "QUERY_STATS": _as_bool(os.getenv("QUERY_STATS"), default=True),
+        "QUERY_BUDGET": int(os.getenv("QUERY_BUDGET")) if os.getenv("QUERY_BUDGET") else None,
+        # Dépasser le budget lève QueryBudgetExceeded (tests, détection des N+1) au lieu d'un simple log
+        "QUERY_BUDGET_STRICT": _as_bool(os.getenv("QUERY_BUDGET_STRICT")),
+        # Endpoint /metrics (format Prometheus) et mesure de la latence de chaque requête
+        "METRICS": _as_bool(os.getenv("METRICS"), default=True),
+        # Démarrage rapide : une version de schéma enregistrée identique évite create_all et la création des index
+        "FAST_START": _as_bool(os.getenv("FAST_START")),
         # Ajoutez d'autres variables d'environnement ici
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,124 @@
+import asyncio
+from collections import defaultdict
+from functools import lru_cache
+from logging import getLogger
+from threading import Lock
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy import Engine, bindparam, update
+from starlette.concurrency import run_in_threadpool
+
+from app.cache import cache_key, get_cache
+from app.config import get_settings
+from app.models.playlist import Playlist
+
+log = getLogger(__name__)
+
+
+class ListenCounter:
+    """
+    Write-behind buffer of Playlist.count_listen increments. Increments only
+    touch memory (one lock per shard, so concurrent threads rarely contend);
+    flush() writes one relative UPDATE per playlist and batch, so there is
+    no read-modify-write and no lost increment.
+    """
+
+    def __init__(self, shards: int) -> None:
+        self._shards: list[defaultdict[int, int]] = [defaultdict(int) for _ in range(shards)]
+        self._locks = [Lock() for _ in range(shards)]
+        self._flush_lock = Lock()
+        # Total par shard, modifié sous le verrou du shard : un seul entier partagé perdrait des incréments
+        self._increments = [0] * shards
+        self.flushes = 0
+        self.rows_written = 0
+        self.failures = 0
+        self.last_flush_seconds = 0.0
+
+    def increment(self, playlist_id: int, count: int = 1) -> None:
+        shard = playlist_id % len(self._shards)
+        with self._locks[shard]:
+            self._shards[shard][playlist_id] += count
+            self._increments[shard] += count
+
+    @property
+    def increments(self) -> int:
+        return sum(self._increments)
+
+    def pending(self) -> int:
+        return sum(sum(shard.values()) for shard in self._shards)
+
+    def _drain(self) -> dict[int, int]:
+        counts: dict[int, int] = {}
+        for index, lock in enumerate(self._locks):
+            with lock:
+                shard, self._shards[index] = self._shards[index], defaultdict(int)
+            counts.update(shard)  # Un playlist_id n'appartient qu'à un shard
+        return counts
+
+    def _restore(self, counts: dict[int, int]) -> None:
+        for playlist_id, count in counts.items():
+            shard = playlist_id % len(self._shards)
+            with self._locks[shard]:
+                self._shards[shard][playlist_id] += count
+
+    def flush(self, engine: Engine) -> int:
+        """
+        Write the buffered increments in one transaction (executemany of
+        `count_listen = count_listen + :n`, ordered by id so that workers
+        flushing concurrently lock rows in the same order). On failure the
+        counts are put back for the next flush. Returns the number of playlists.
+        """
+        with self._flush_lock:
+            counts = self._drain()
+            if not counts:
+                return 0
+            start = perf_counter()
+            table = Playlist.__table__
+            statement = (
+                update(table)
+                .where(table.c.id == bindparam("playlist_id"))
+                .values(count_listen=table.c.count_listen + bindparam("increment"))
+            )
+            rows = [{"playlist_id": playlist_id, "increment": counts[playlist_id]} for playlist_id in sorted(counts)]
+            try:
+                with engine.begin() as connection:
+                    connection.execute(statement, rows)
+            except Exception:
+                self.failures += 1
+                self._restore(counts)
+                raise
+            self.flushes += 1
+            self.rows_written += len(rows)
+            self.last_flush_seconds = perf_counter() - start
+        get_cache().invalidate(*(cache_key("playlist", playlist_id) for playlist_id in counts))
+        return len(rows)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "pending": self.pending(),
+            "increments": self.increments,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "failures": self.failures,
+            "last_flush_seconds": self.last_flush_seconds,
+        }
+
+
+@lru_cache()
+def get_listen_counter() -> ListenCounter:
+    return ListenCounter(get_settings()["LISTEN_SHARDS"])
+
+
+async def flush_listens_periodically(engine: Engine, interval: float) -> None:
+    """
+    Background task started by the lifespan: flush every `interval` seconds.
+    The final flush on shutdown is done by the lifespan after cancelling it.
+    """
+    counter = get_listen_counter()
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(counter.flush, engine)
+        except Exception:
+            log.exception("Failed to flush listen counts, retrying at the next interval")
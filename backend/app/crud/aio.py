@@ -0,0 +1,23 @@
+from typing import Any, Callable, TypeVar
+
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+T = TypeVar("T")
+
+DbSession = Session | AsyncSession
+
+
+async def run(session: DbSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Async version of any CRUD function of app/crud.
+
+    With an AsyncSession, the function runs through AsyncSession.run_sync: the
+    queries go through the async driver on the event loop, no thread is used.
+    With a plain Session (DB_ASYNC disabled), it runs on the anyio threadpool
+    as before, so the event loop is never blocked.
+    """
+    if isinstance(session, AsyncSession):
+        return await session.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, session, *args, **kwargs)
@@ -0,0 +1,166 @@
+from typing import Any
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, SQLModel
+
+from app.models.bulk import BulkItemError, BulkResult
+from app.models.versioning import utcnow
+
+
+def _insert_ids(session: Session, table: Any, rows: list[dict[str, Any]]) -> list[int]:
+    # executemany + RETURNING : SQLAlchemy ("insertmanyvalues") l'envoie en INSERT ... VALUES (...), (...) RETURNING id
+    statement = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+    return list(session.execute(statement, rows).scalars())
+
+
+def bulk_create(
+    session: Session,
+    create_model: type[SQLModel],
+    table_model: type[SQLModel],
+    items: list[Any],
+    chunk_size: int,
+) -> BulkResult:
+    """
+    Validate every item against `create_model`, then insert the valid ones one
+    multi-row INSERT per chunk and commit once.
+
+    A chunk that hits a constraint is rolled back to its savepoint and replayed
+    row by row, so only the offending items are reported and the rest is kept.
+    """
+    ids: list[int | None] = [None] * len(items)
+    errors: list[BulkItemError] = []
+    valid: list[tuple[int, dict[str, Any]]] = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, create_model.model_validate(item).model_dump()))
+        except ValidationError as e:
+            errors.append(BulkItemError(index=index, detail=e.errors(include_url=False, include_context=False)))
+
+    table = table_model.__table__
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+        try:
+            with session.begin_nested():
+                new_ids = _insert_ids(session, table, [row for _, row in chunk])
+        except IntegrityError:
+            new_ids = []
+            for index, row in chunk:
+                try:
+                    with session.begin_nested():
+                        new_ids.extend(_insert_ids(session, table, [row]))
+                except IntegrityError as e:
+                    new_ids.append(None)
+                    errors.append(BulkItemError(index=index, detail=str(e.orig)))
+        for (index, _), new_id in zip(chunk, new_ids):
+            ids[index] = new_id
+
+    session.commit()
+    errors.sort(key=lambda error: error.index)
+    return BulkResult(ids=ids, errors=errors)
+
+
+def dialect_insert(session: Session, table: Any) -> Any:
+    """
+    INSERT of the dialect of the session, which has on_conflict_do_nothing
+    and on_conflict_do_update.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"INSERT ... ON CONFLICT is not supported on {dialect}")
+    return insert(table)
+
+
+def insert_ignore(session: Session, table: Any) -> Any:
+    """
+    INSERT ... ON CONFLICT DO NOTHING for the dialect of the session.
+    """
+    return dialect_insert(session, table).on_conflict_do_nothing()
+
+
+def _upsert(
+    session: Session, table: Any, key: str, rows: list[dict[str, Any]], returning: list[Any], where: Any = None
+) -> list[Any]:
+    statement = dialect_insert(session, table)
+    set_ = {column: statement.excluded[column] for column in rows[0] if column != key}
+    if "updated_at" in table.c:
+        # onupdate ne s'applique pas à ON CONFLICT DO UPDATE
+        set_["updated_at"] = utcnow()
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c[key]], index_where=where, set_=set_
+    ).returning(*returning)
+    return list(session.execute(statement, rows))
+
+
+def upsert_row(
+    session: Session, table_model: type[SQLModel], key: str, row: dict[str, Any], where: Any = None
+) -> Any:
+    """
+    Insert `row`, or replace every given column of the row with the same
+    `key`, in one INSERT ... ON CONFLICT (key) DO UPDATE ... RETURNING
+    statement. `key` needs a unique constraint, or a unique index partial on
+    `where` (the same expression as the index's). The caller commits.
+    """
+    table = table_model.__table__
+    written = _upsert(session, table, key, [row], list(table.c), where)
+    return table_model.model_validate(written[0]._mapping)
+
+
+def bulk_upsert(
+    session: Session,
+    create_model: type[SQLModel],
+    table_model: type[SQLModel],
+    key: str,
+    items: list[Any],
+    chunk_size: int,
+    where: Any = None,
+) -> BulkResult:
+    """
+    Validate every item against `create_model`, then upsert the valid ones on
+    `key` (and `where`, as in upsert_row), one statement per chunk, and commit
+    once. Items sharing a key are written once, the last one wins, and all of
+    them get its id.
+
+    Like bulk_create, a chunk that hits a constraint is replayed row by row.
+    """
+    ids: list[int | None] = [None] * len(items)
+    errors: list[BulkItemError] = []
+    valid: list[tuple[int, dict[str, Any]]] = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, create_model.model_validate(item).model_dump()))
+        except ValidationError as e:
+            errors.append(BulkItemError(index=index, detail=e.errors(include_url=False, include_context=False)))
+
+    table = table_model.__table__
+    returning = [table.c[key], table.c.id]
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+        # Une même ligne ne peut pas être modifiée deux fois par une instruction (PostgreSQL)
+        latest = {row[key]: row for _, row in chunk}
+        failed: dict[Any, str] = {}
+        try:
+            with session.begin_nested():
+                written = dict(_upsert(session, table, key, list(latest.values()), returning, where))
+        except IntegrityError:
+            written = {}
+            for value, row in latest.items():
+                try:
+                    with session.begin_nested():
+                        written.update(_upsert(session, table, key, [row], returning, where))
+                except IntegrityError as e:
+                    failed[value] = str(e.orig)
+        for index, row in chunk:
+            if row[key] in failed:
+                errors.append(BulkItemError(index=index, detail=failed[row[key]]))
+            else:
+                ids[index] = written[row[key]]
+
+    session.commit()
+    errors.sort(key=lambda error: error.index)
+    return BulkResult(ids=ids, errors=errors)
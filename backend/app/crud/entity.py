@@ -1,58 +1,100 @@
-from typing import List
-from sqlmodel import Session, select
+from datetime import datetime
+from typing import Any
 
-from app.models.entity import Entity, EntityCreate, EntityUpdate
-from app.models.person import Person # Needed for relationship management
+from sqlalchemy import delete, literal, update
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, func, select
+
+from app.cache import cache_key, get_cache
+from app.crud.bulk import bulk_create, insert_ignore
+from app.crud.membership import membership_cache_keys
+from app.crud.pagination import paginate
+from app.crud.returning import delete_returning, insert_returning, update_returning
+
+from app.models.entity import Entity, EntityCreate, EntityReadWithPersons, EntityUpdate
+from app.models.bulk import BulkResult
+from app.models.pagination import Page
+from app.models.person import Person, PersonEntityLink # Needed for relationship management
+from app.models.versioning import utcnow
 
 def create_entity(session: Session, entity_create: EntityCreate) -> Entity:
-    db_entity = Entity.model_validate(entity_create)
-    session.add(db_entity)
+    db_entity = insert_returning(session, Entity, entity_create.model_dump())
     session.commit()
-    session.refresh(db_entity)
     return db_entity
 
-def get_entity(session: Session, entity_id: int) -> Entity | None:
-    return session.get(Entity, entity_id)
+def create_entities(session: Session, entities: list[Any], chunk_size: int) -> BulkResult:
+    return bulk_create(session, EntityCreate, Entity, entities, chunk_size)
+
+def get_entity(session: Session, entity_id: int, populate_existing: bool = False) -> Entity | None:
+    # Renvoyée en EntityReadWithPersons : les personnes sont chargées en une seule requête IN
+    return session.get(
+        Entity, entity_id, options=[selectinload(Entity.persons)], populate_existing=populate_existing
+    )
 
 def get_entity_by_name(session: Session, name: str) -> Entity | None:
-    statement = select(Entity).where(Entity.name == name)
+    statement = select(Entity).where(Entity.name == name).options(selectinload(Entity.persons))
     return session.exec(statement).first()
 
-def get_entities(session: Session, skip: int = 0, limit: int = 100) -> List[Entity]:
-    statement = select(Entity).offset(skip).limit(limit)
-    entities = session.exec(statement).all()
-    return list(entities)
+def get_entity_by_name_cached(session: Session, name: str) -> EntityReadWithPersons | None:
+    """
+    Read-through cached get_entity_by_name, invalidated by every write that
+    changes the entity, its links or one of its persons.
+    """
+    def load() -> dict | None:
+        entity = get_entity_by_name(session, name)
+        return EntityReadWithPersons.model_validate(entity).model_dump(mode="json") if entity else None
+
+    data = get_cache().get_or_load(cache_key("entity", name), load)
+    return EntityReadWithPersons.model_validate(data) if data is not None else None
+
+def get_entity_version(session: Session, entity_id: int) -> tuple[datetime, int] | None:
+    """
+    Validator of EntityReadWithPersons in one aggregate query: latest
+    updated_at of the entity and its persons, and the number of persons.
+    Link changes bump the entity's updated_at. Returns None if the entity
+    does not exist.
+    """
+    statement = (
+        select(Entity.updated_at, func.max(Person.updated_at), func.count(Person.id))
+        .select_from(Entity)
+        .outerjoin(PersonEntityLink, PersonEntityLink.entity_id == Entity.id)
+        .outerjoin(Person, Person.id == PersonEntityLink.person_id)
+        .where(Entity.id == entity_id)
+        .group_by(Entity.id, Entity.updated_at)
+    )
+    row = session.exec(statement).first()
+    if row is None:
+        return None
+    entity_updated_at, persons_updated_at, count = row
+    return max(entity_updated_at, persons_updated_at or entity_updated_at), count
+
+def get_entities(session: Session, after_id: int | None = None, limit: int = 100) -> Page[Entity]:
+    return paginate(session, select(Entity), Entity.id, after_id=after_id, limit=limit)
 
 def update_entity(session: Session, entity_id: int, entity_update: EntityUpdate) -> Entity | None:
-    db_entity = session.get(Entity, entity_id)
+    stale_keys = membership_cache_keys(session, entity_ids=[entity_id], linked=True)
+    entity_data = entity_update.model_dump(exclude_unset=True)
+    db_entity = update_returning(session, Entity, [Entity.id == entity_id], entity_data)
     if not db_entity:
         return None
-    
-    entity_data = entity_update.model_dump(exclude_unset=True)
-    for key, value in entity_data.items():
-        setattr(db_entity, key, value)
-    
-    session.add(db_entity)
+
     session.commit()
-    session.refresh(db_entity)
+    get_cache().invalidate(*stale_keys, cache_key("entity", db_entity.name))
     return db_entity
 
 def delete_entity(session: Session, entity_id: int) -> Entity | None:
-    db_entity = session.get(Entity, entity_id)
+    stale_keys = membership_cache_keys(session, entity_ids=[entity_id], linked=True)
+    # Les liens d'abord (ce que faisait la relationship), puis la ligne, sans la charger
+    session.execute(delete(PersonEntityLink).where(PersonEntityLink.entity_id == entity_id))
+    db_entity = delete_returning(session, Entity, [Entity.id == entity_id])
     if not db_entity:
         return None
-    session.delete(db_entity)
     session.commit()
-    # After deletion, the object is expired. Return a representation or a success message.
-    # For now, returning the object as it was before deletion confirmation might be misleading
-    # if it's accessed after this. A simple dict or message is often better.
-    # However, to match other patterns, we can return it if the caller expects it.
-    # Or simply return True / False or a message.
-    # Let's return the object for now, but be mindful it's no longer in DB.
+    get_cache().invalidate(*stale_keys)
     return db_entity # Or return {"message": "Entity deleted successfully"}
 
 def add_person_to_entity(session: Session, entity_id: int, person_id: int) -> Entity | None:
-    entity = session.get(Entity, entity_id)
+    entity = get_entity(session, entity_id)
     if not entity:
         return None # Or raise HTTPException("Entity not found")
     
@@ -65,13 +107,16 @@ def add_person_to_entity(session: Session, entity_id: int, person_id: int) -> En
     # but good to check if you want to avoid appending to Python list unnecessarily.
     if person not in entity.persons:
         entity.persons.append(person)
+        entity.updated_at = utcnow()
         session.add(entity)
+        stale_keys = [cache_key("entity", entity.name), cache_key("person", person.email)]
         session.commit()
-        session.refresh(entity)
+        get_cache().invalidate(*stale_keys)
+        entity = get_entity(session, entity_id, populate_existing=True)
     return entity
 
 def remove_person_from_entity(session: Session, entity_id: int, person_id: int) -> Entity | None:
-    entity = session.get(Entity, entity_id)
+    entity = get_entity(session, entity_id)
     if not entity:
         return None # Or raise HTTPException("Entity not found")
     
@@ -81,7 +126,48 @@ def remove_person_from_entity(session: Session, entity_id: int, person_id: int)
 
     if person in entity.persons:
         entity.persons.remove(person)
+        entity.updated_at = utcnow()
         session.add(entity)
+        stale_keys = [cache_key("entity", entity.name), cache_key("person", person.email)]
         session.commit()
-        session.refresh(entity)
-    return entity 
\ No newline at end of file
+        get_cache().invalidate(*stale_keys)
+        entity = get_entity(session, entity_id, populate_existing=True)
+    return entity
+
+def add_persons_to_entity(session: Session, entity_id: int, person_ids: list[int]) -> int | None:
+    """
+    Link many persons at once in a fixed number of statements:
+    INSERT ... SELECT id FROM person WHERE id IN (...) ON CONFLICT DO NOTHING.
+    Unknown person ids and existing links are skipped. Returns the number of
+    links created, None if the entity does not exist.
+    """
+    if session.exec(select(Entity.id).where(Entity.id == entity_id)).first() is None:
+        return None
+    stale_keys = membership_cache_keys(session, person_ids=person_ids, entity_ids=[entity_id])
+    persons = select(Person.id, literal(entity_id)).where(Person.id.in_(set(person_ids)))
+    statement = insert_ignore(session, PersonEntityLink.__table__).from_select(["person_id", "entity_id"], persons)
+    count = session.execute(statement).rowcount
+    if count:
+        session.execute(update(Entity).where(Entity.id == entity_id).values(updated_at=utcnow()))
+    session.commit()
+    get_cache().invalidate(*stale_keys)
+    return count
+
+def remove_persons_from_entity(session: Session, entity_id: int, person_ids: list[int]) -> int | None:
+    """
+    Unlink many persons with one DELETE ... WHERE entity_id = :id AND person_id IN (...).
+    Returns the number of links removed, None if the entity does not exist.
+    """
+    if session.exec(select(Entity.id).where(Entity.id == entity_id)).first() is None:
+        return None
+    stale_keys = membership_cache_keys(session, person_ids=person_ids, entity_ids=[entity_id])
+    statement = delete(PersonEntityLink).where(
+        PersonEntityLink.entity_id == entity_id,
+        PersonEntityLink.person_id.in_(set(person_ids)),
+    )
+    count = session.execute(statement).rowcount
+    if count:
+        session.execute(update(Entity).where(Entity.id == entity_id).values(updated_at=utcnow()))
+    session.commit()
+    get_cache().invalidate(*stale_keys)
+    return count
@@ -0,0 +1,194 @@
+from collections import Counter
+from datetime import datetime
+
+from sqlmodel import Session, func, select
+
+from app.crud.bulk import dialect_insert
+from app.crud.loader import get_loader
+from app.crud.pagination import paginate
+from app.crud.returning import delete_returning, insert_returning, update_returning
+from app.models.entity import Entity
+from app.models.event import (
+    Event,
+    EventCreate,
+    EventReadWithDetails,
+    EventRollup,
+    EventUpdate,
+    Granularity,
+    Histogram,
+    HistogramBucket,
+    naive_utc,
+)
+from app.models.pagination import Page
+from app.models.place import Place
+from app.models.playlist import Playlist
+
+RollupKey = tuple[Granularity, datetime, int, int, int]
+
+
+def bucket_start(value: datetime, granularity: Granularity) -> datetime:
+    value = naive_utc(value).replace(minute=0, second=0, microsecond=0)
+    if granularity is Granularity.hour:
+        return value
+    value = value.replace(hour=0)
+    if granularity is Granularity.day:
+        return value
+    return value.replace(day=1)
+
+
+def _rollup_keys(event: Event) -> list[RollupKey]:
+    dimensions = (event.place_id or 0, event.playlist_id or 0, event.entity_id or 0)
+    return [(granularity, bucket_start(event.happened_on, granularity), *dimensions) for granularity in Granularity]
+
+
+def _apply_rollup(session: Session, deltas: Counter[RollupKey]) -> None:
+    """
+    Add `deltas` to the rollup counts with one INSERT ... ON CONFLICT DO
+    UPDATE SET count = count + excluded.count, in the caller's transaction.
+    """
+    rows = [
+        {
+            "granularity": key[0],
+            "bucket_start": key[1],
+            "place_id": key[2],
+            "playlist_id": key[3],
+            "entity_id": key[4],
+            "count": delta,
+        }
+        for key, delta in deltas.items()
+        if delta
+    ]
+    if not rows:
+        return
+    table = EventRollup.__table__
+    statement = dialect_insert(session, table).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(table.primary_key.columns),
+        set_={"count": table.c.count + statement.excluded.count},
+    )
+    session.execute(statement)
+
+
+def post_event(session: Session, event: EventCreate) -> Event:
+    db_event = insert_returning(session, Event, event.model_dump())
+    _apply_rollup(session, Counter(_rollup_keys(db_event)))
+    session.commit()
+    return db_event
+
+def get_event(session: Session, event_id: int) -> Event | None:
+    return session.get(Event, event_id)
+
+def get_events(
+    session: Session,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    place_id: int | None = None,
+    playlist_id: int | None = None,
+    entity_id: int | None = None,
+    after_id: int | None = None,
+    limit: int = 100,
+) -> Page[Event]:
+    """
+    Events with happened_on in [start, end), optionally for one place,
+    playlist or entity. Served by the happened_on and foreign key indexes.
+    Bounds with a time zone are converted to UTC, as happened_on is stored.
+    """
+    start, end = naive_utc(start), naive_utc(end)
+    query = select(Event)
+    if start is not None:
+        query = query.where(Event.happened_on >= start)
+    if end is not None:
+        query = query.where(Event.happened_on < end)
+    if place_id is not None:
+        query = query.where(Event.place_id == place_id)
+    if playlist_id is not None:
+        query = query.where(Event.playlist_id == playlist_id)
+    if entity_id is not None:
+        query = query.where(Event.entity_id == entity_id)
+    return paginate(session, query, Event.id, after_id=after_id, limit=limit, page_type=Page[Event])
+
+
+def get_events_with_details(
+    session: Session,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    place_id: int | None = None,
+    playlist_id: int | None = None,
+    entity_id: int | None = None,
+    after_id: int | None = None,
+    limit: int = 100,
+) -> Page[EventReadWithDetails]:
+    """
+    get_events with the place, playlist and entity of every event: one IN
+    query per type for the whole page, whatever the number of events.
+    """
+    page = get_events(session, start, end, place_id, playlist_id, entity_id, after_id=after_id, limit=limit)
+    loader = get_loader(session)
+    places = loader.load_many(Place.id, (event.place_id for event in page.items))
+    playlists = loader.load_many(Playlist.id, (event.playlist_id for event in page.items))
+    entities = loader.load_many(Entity.id, (event.entity_id for event in page.items))
+    items = [
+        EventReadWithDetails.model_validate({**event.model_dump(), "place": place, "playlist": playlist, "entity": entity})
+        for event, place, playlist, entity in zip(page.items, places, playlists, entities)
+    ]
+    return Page[EventReadWithDetails](items=items, next_cursor=page.next_cursor)
+
+
+def get_histogram(
+    session: Session,
+    granularity: Granularity,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    place_id: int | None = None,
+    playlist_id: int | None = None,
+    entity_id: int | None = None,
+) -> Histogram:
+    """
+    Number of events per bucket, read from the rollup table: a range scan on
+    (granularity, bucket_start) that never touches the event table. Buckets
+    without events are omitted. `start` and `end` are rounded down to buckets.
+    """
+    query = select(EventRollup.bucket_start, func.sum(EventRollup.count)).where(
+        EventRollup.granularity == granularity
+    )
+    if start is not None:
+        query = query.where(EventRollup.bucket_start >= bucket_start(start, granularity))
+    if end is not None:
+        query = query.where(EventRollup.bucket_start < bucket_start(end, granularity))
+    if place_id is not None:
+        query = query.where(EventRollup.place_id == place_id)
+    if playlist_id is not None:
+        query = query.where(EventRollup.playlist_id == playlist_id)
+    if entity_id is not None:
+        query = query.where(EventRollup.entity_id == entity_id)
+    query = query.group_by(EventRollup.bucket_start).having(func.sum(EventRollup.count) > 0)
+    rows = session.exec(query.order_by(EventRollup.bucket_start)).all()
+    return Histogram(
+        granularity=granularity,
+        buckets=[HistogramBucket(bucket_start=bucket, count=count) for bucket, count in rows],
+    )
+
+
+def update_event(session: Session, event_id: int, event_update: EventUpdate) -> Event | None:
+    db_event = get_event(session, event_id)
+    if not db_event:
+        return None
+
+    # L'ancien bucket perd l'événement, le nouveau le gagne (rien à écrire s'ils sont identiques)
+    deltas: Counter[RollupKey] = Counter({key: -1 for key in _rollup_keys(db_event)})
+    event_data = event_update.model_dump(exclude_unset=True)
+    db_event = update_returning(session, Event, [Event.id == event_id], event_data)
+    deltas.update(_rollup_keys(db_event))
+
+    _apply_rollup(session, deltas)
+    session.commit()
+    return db_event
+
+
+def delete_event(session: Session, event_id: int) -> Event | None:
+    event = delete_returning(session, Event, [Event.id == event_id])
+    if event:
+        _apply_rollup(session, Counter({key: -1 for key in _rollup_keys(event)}))
+        session.commit()
+        return event
+    return None
@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+from enum import Enum
+from typing import Any, AsyncIterator, Iterable, Iterator
+
+from sqlalchemy import Select, select
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.db_setup import get_async_engine, get_engine
+from app.models.music import Music
+from app.models.person import Person, PersonEntityLink
+from app.models.place import Place
+from app.models.product import Product
+
+
+class ExportResource(str, Enum):
+    products = "products"
+    persons = "persons"
+    places = "places"
+    musics = "musics"
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+def _export_statement(resource: ExportResource) -> Select[Any]:
+    # Colonnes explicites plutôt que des objets ORM : pas d'identity map qui grossit
+    if resource is ExportResource.products:
+        return (
+            select(Product.id, Product.name, Product.description, Product.price, Product.in_stock)
+            .where(Product.is_deleted == False)
+            .order_by(Product.id)
+        )
+    if resource is ExportResource.persons:
+        # Une ligne par (personne, entité), triée par personne : regroupée en flux par _group_entity_ids
+        return (
+            select(Person.id, Person.firstname, Person.lastname, Person.email, PersonEntityLink.entity_id)
+            .outerjoin(PersonEntityLink, PersonEntityLink.person_id == Person.id)
+            .order_by(Person.id, PersonEntityLink.entity_id)
+        )
+    if resource is ExportResource.places:
+        return select(*Place.__table__.columns).order_by(Place.id)
+    return select(*Music.__table__.columns).order_by(Music.id)
+
+
+class _EntityIdGrouper:
+    """
+    Fold consecutive (person, entity_id) rows into one row per person with an
+    `entity_ids` list. Only the person currently being read is kept across chunks.
+    """
+
+    def __init__(self) -> None:
+        self.current: dict[str, Any] | None = None
+
+    def feed(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        done = []
+        for row in rows:
+            entity_id = row.pop("entity_id")
+            if self.current is None or self.current["id"] != row["id"]:
+                if self.current is not None:
+                    done.append(self.current)
+                self.current = {**row, "entity_ids": []}
+            if entity_id is not None:
+                self.current["entity_ids"].append(entity_id)
+        return done
+
+    def flush(self) -> list[dict[str, Any]]:
+        rows, self.current = ([self.current] if self.current else []), None
+        return rows
+
+
+class _Encoder:
+    def __init__(self, fmt: ExportFormat, columns: list[str]) -> None:
+        self.fmt = fmt
+        self.columns = columns
+
+    def header(self) -> bytes:
+        if self.fmt is ExportFormat.ndjson:
+            return b""
+        return self._csv([self.columns])
+
+    def encode(self, rows: list[dict[str, Any]]) -> bytes:
+        if not rows:
+            return b""
+        if self.fmt is ExportFormat.ndjson:
+            return "".join(json.dumps(row, default=str) + "\n" for row in rows).encode()
+        return self._csv(
+            [";".join(map(str, value)) if isinstance(value, list) else value for value in row.values()]
+            for row in rows
+        )
+
+    @staticmethod
+    def _csv(rows: Iterable[Iterable[Any]]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+
+def _prepare(resource: ExportResource, fmt: ExportFormat, chunk_size: int) -> tuple[Select[Any], _Encoder, _EntityIdGrouper | None]:
+    statement = _export_statement(resource).execution_options(yield_per=chunk_size)
+    columns = list(statement.selected_columns.keys())
+    grouper = None
+    if resource is ExportResource.persons:
+        columns = [c for c in columns if c != "entity_id"] + ["entity_ids"]
+        grouper = _EntityIdGrouper()
+    return statement, _Encoder(fmt, columns), grouper
+
+
+def stream_export(resource: ExportResource, fmt: ExportFormat, chunk_size: int) -> Iterator[bytes]:
+    """
+    Stream a whole table as NDJSON or CSV. yield_per makes the driver use a
+    server-side cursor, so memory holds one chunk whatever the table size and
+    the first chunk is sent before the query has read the last row.
+    """
+    statement, encoder, grouper = _prepare(resource, fmt, chunk_size)
+    if header := encoder.header():
+        yield header
+    # La session de la requête est fermée avant l'envoi du corps : le flux ouvre la sienne
+    with Session(get_engine()) as session:
+        for partition in session.execute(statement).mappings().partitions():
+            rows = [dict(row) for row in partition]
+            if chunk := encoder.encode(grouper.feed(rows) if grouper else rows):
+                yield chunk
+    if grouper and (chunk := encoder.encode(grouper.flush())):
+        yield chunk
+
+
+async def stream_export_async(resource: ExportResource, fmt: ExportFormat, chunk_size: int) -> AsyncIterator[bytes]:
+    """
+    Same as stream_export, through the async engine (AsyncSession.stream).
+    """
+    statement, encoder, grouper = _prepare(resource, fmt, chunk_size)
+    if header := encoder.header():
+        yield header
+    async with AsyncSession(get_async_engine()) as session:
+        result = await session.stream(statement)
+        async for partition in result.mappings().partitions():
+            rows = [dict(row) for row in partition]
+            if chunk := encoder.encode(grouper.feed(rows) if grouper else rows):
+                yield chunk
+    if grouper and (chunk := encoder.encode(grouper.flush())):
+        yield chunk
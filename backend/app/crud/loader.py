@@ -0,0 +1,67 @@
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.orm.interfaces import LoaderOption
+from sqlmodel import Session, select
+
+# Clés par IN (...) : sous les limites de paramètres de SQLite et PostgreSQL
+IN_CHUNK_SIZE = 500
+
+
+class Loader:
+    """
+    Batched lookups by a unique column (id, name...), dataloader style. Each
+    load_many() deduplicates its keys and fetches the ones not seen yet with
+    one IN (...) query per IN_CHUNK_SIZE keys, then answers in the order of
+    the keys, None for the missing ones. Rows and misses are remembered for
+    the rest of the request, so the same key is never queried twice.
+
+    `where` restricts the rows considered (e.g. not soft-deleted ones, when
+    the column is only unique among those); lookups with different `where`
+    are remembered apart.
+
+    Meant for read paths: a row changed later in the same session through a
+    Core statement is not reloaded. `options` only apply to the rows this
+    call loads.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+        # (modèle, colonne, conditions) -> clé -> ligne, ou None si absente
+        self._rows: dict[tuple[type, str, tuple[str, ...]], dict[Any, Any]] = {}
+
+    def load_many(
+        self,
+        column: InstrumentedAttribute,
+        keys: Iterable[Any],
+        options: Sequence[LoaderOption] = (),
+        where: Sequence[Any] = (),
+    ) -> list[Any | None]:
+        keys = list(keys)
+        model = column.class_
+        rows = self._rows.setdefault((model, column.key, tuple(map(str, where))), {})
+        missing = list(dict.fromkeys(key for key in keys if key is not None and key not in rows))
+        for start in range(0, len(missing), IN_CHUNK_SIZE):
+            chunk = missing[start:start + IN_CHUNK_SIZE]
+            statement = select(model).where(column.in_(chunk), *where).options(*options)
+            found = {getattr(row, column.key): row for row in self.session.exec(statement)}
+            for key in chunk:
+                rows[key] = found.get(key)
+        return [rows.get(key) if key is not None else None for key in keys]
+
+    def load(
+        self, column: InstrumentedAttribute, key: Any, options: Sequence[LoaderOption] = (), where: Sequence[Any] = ()
+    ) -> Any | None:
+        return self.load_many(column, [key], options, where)[0]
+
+
+def get_loader(session: Session) -> Loader:
+    """
+    The Loader of `session`. Every request has its own session (get_session),
+    so this is a per-request loader. With an AsyncSession, pass the sync
+    session that run_sync gives to the CRUD functions.
+    """
+    loader = session.info.get("loader")
+    if loader is None:
+        loader = session.info["loader"] = Loader(session)
+    return loader
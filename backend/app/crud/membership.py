@@ -0,0 +1,42 @@
+from typing import Iterable
+
+from sqlmodel import Session, select
+
+from app.cache import cache_key, get_cache
+from app.models.entity import Entity
+from app.models.person import Person, PersonEntityLink
+
+
+def membership_cache_keys(
+    session: Session,
+    person_ids: Iterable[int] = (),
+    entity_ids: Iterable[int] = (),
+    linked: bool = False,
+) -> list[str]:
+    """
+    Cache keys (entity name, person email) of the given persons and entities.
+    With `linked`, also the keys of the rows linked to them, whose cached
+    EntityReadWithPersons / PersonReadWithEntities embed the given rows.
+
+    Must be called before the change (a deleted row has no name left to read),
+    the keys being invalidated after the commit. Runs no query when the cache
+    is disabled.
+    """
+    if not get_cache().enabled:
+        return []
+    person_ids, entity_ids = set(person_ids), set(entity_ids)
+    entity_filter = Entity.id.in_(entity_ids)
+    person_filter = Person.id.in_(person_ids)
+    if linked:
+        entity_filter |= Entity.id.in_(
+            select(PersonEntityLink.entity_id).where(PersonEntityLink.person_id.in_(person_ids))
+        )
+        person_filter |= Person.id.in_(
+            select(PersonEntityLink.person_id).where(PersonEntityLink.entity_id.in_(entity_ids))
+        )
+    keys = []
+    if entity_ids or linked:
+        keys += [cache_key("entity", name) for name in session.exec(select(Entity.name).where(entity_filter))]
+    if person_ids or linked:
+        keys += [cache_key("person", email) for email in session.exec(select(Person.email).where(person_filter))]
+    return keys
@@ -1,45 +1,66 @@
+from typing import Any
+
 from sqlmodel import Session, select
 
-from app.db.db_setup import engine
+from app.cache import cache_key, get_cache
+from app.crud.bulk import bulk_create
+from app.crud.pagination import paginate
+from app.crud.returning import delete_returning, insert_returning, update_returning
+from app.models.bulk import BulkResult
+from app.models.pagination import Page
 from app.models.music import Music, MusicCreate, MusicUpdate
 
 
 def post_music(session: Session, music: MusicCreate) -> Music:
-    db_music = Music.model_validate(music) 
-    session.add(db_music)
+    db_music = insert_returning(session, Music, music.model_dump())
     session.commit()
-    session.refresh(db_music)
     return db_music
 
+def post_musics(session: Session, musics: list[Any], chunk_size: int) -> BulkResult:
+    return bulk_create(session, MusicCreate, Music, musics, chunk_size)
+
 def get_music(session: Session, music_name: str) -> Music | None:
-    query = select(Music).where(Music.name == music_name)
+    query = select(Music).where(Music.title == music_name)
     return session.exec(query).first()
 
+def get_music_cached(session: Session, music_name: str) -> Music | None:
+    """
+    Read-through cached get_music. The returned object is detached from the
+    session: use get_music to modify a music.
+    """
+    def load() -> dict | None:
+        music = get_music(session, music_name)
+        return music.model_dump(mode="json") if music else None
+
+    data = get_cache().get_or_load(cache_key("music", music_name), load)
+    return Music.model_validate(data) if data is not None else None
 
-def get_all_musics(session: Session) -> list[Music]:
+
+def get_all_musics(session: Session, after_id: int | None = None, limit: int = 100) -> Page[Music]:
     query = select(Music)
-    return list(session.exec(query).all())
+    return paginate(session, query, Music.id, after_id=after_id, limit=limit, page_type=Page[Music])
+
+
+def _music_by_title(music_name: str) -> list[Any]:
+    # Le titre n'est pas unique : comme get_music, une seule musique est modifiée
+    return [Music.id == select(Music.id).where(Music.title == music_name).limit(1).scalar_subquery()]
 
 
 def update_music(session: Session, music_name: str, music_update: MusicUpdate) -> Music | None:
-    db_music = get_music(session, music_name)
+    music_data = music_update.model_dump(exclude_unset=True)
+    db_music = update_returning(session, Music, _music_by_title(music_name), music_data)
     if not db_music:
         return None
-    
-    music_data = music_update.model_dump(exclude_unset=True)
-    for key, value in music_data.items():
-        setattr(db_music, key, value)
-    
-    session.add(db_music)
+
     session.commit()
-    session.refresh(db_music)
+    get_cache().invalidate(cache_key("music", music_name), cache_key("music", db_music.title))
     return db_music
 
 
 def delete_music(session: Session, music_name: str) -> Music | None:
-    music = get_music(session, music_name)
+    music = delete_returning(session, Music, _music_by_title(music_name))
     if music:
-        session.delete(music)
         session.commit()
+        get_cache().invalidate(cache_key("music", music_name))
         return music
-    return None
\ No newline at end of file
+    return None
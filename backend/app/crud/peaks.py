@@ -0,0 +1,128 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from logging import getLogger
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from sqlalchemy import update
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.cache import cache_key, get_cache
+from app.config import get_settings
+from app.db.db_setup import get_engine
+from app.models.playlist import PeaksJob, PeaksJobStatus, Playlist
+
+# app.peaks (et NumPy) n'est importé qu'au premier accès aux peaks, pas au démarrage des workers
+if TYPE_CHECKING:
+    from app.peaks import PeaksFile, PeaksFileCache
+
+log = getLogger(__name__)
+
+# Dernier job par playlist (process courant) : évite de lancer deux fois le même calcul
+peaks_jobs: dict[int, PeaksJob] = {}
+_tasks: set[asyncio.Task] = set()
+
+
+@lru_cache()
+def get_peaks_pool() -> ProcessPoolExecutor:
+    # Le décodage et NumPy tiennent le CPU : des processus, pas le threadpool des requêtes.
+    # spawn, pas fork : un fork du worker (threads, pool de connexions, verrous pris) peut
+    # hériter d'un verrou tenu ou des sockets de la base. generate_peaks ne reçoit que des chemins
+    return ProcessPoolExecutor(
+        max_workers=get_settings()["PEAKS_WORKERS"], mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def shutdown_peaks_pool() -> None:
+    if get_peaks_pool.cache_info().currsize:
+        get_peaks_pool().shutdown(wait=False, cancel_futures=True)
+        get_peaks_pool.cache_clear()
+
+
+@lru_cache()
+def get_peaks_files() -> "PeaksFileCache":
+    from app.peaks import PeaksFileCache
+
+    return PeaksFileCache(get_settings()["PEAKS_OPEN_FILES"])
+
+
+def open_peaks(playlist: Playlist) -> "PeaksFile | None":
+    """
+    Memory-mapped peaks of a playlist, or None if not generated yet.
+    """
+    if not playlist.peaksfile:
+        return None
+    try:
+        return get_peaks_files().get(media_path(playlist.peaksfile))
+    except FileNotFoundError:
+        return None
+
+
+def media_path(relative: str) -> Path:
+    """
+    Resolve a path relative to MEDIA_ROOT, refusing anything outside of it.
+    """
+    root = Path(get_settings()["MEDIA_ROOT"]).resolve()
+    path = (root / relative).resolve()
+    if not path.is_relative_to(root):
+        raise ValueError(f"{relative} is outside of MEDIA_ROOT")
+    return path
+
+
+def peaksfile_name(playlist_id: int) -> str:
+    return f"peaks/{playlist_id}.peaks"
+
+
+def _save_peaksfile(playlist_id: int, peaksfile: str) -> None:
+    with Session(get_engine()) as session:
+        session.execute(update(Playlist).where(Playlist.id == playlist_id).values(peaksfile=peaksfile))
+        session.commit()
+    get_cache().invalidate(cache_key("playlist", playlist_id))
+
+
+async def _run_job(job: PeaksJob, source: Path) -> None:
+    from app.peaks import generate_peaks
+
+    settings = get_settings()
+    peaksfile = peaksfile_name(job.playlist_id)
+    loop = asyncio.get_running_loop()
+    try:
+        info = await loop.run_in_executor(
+            get_peaks_pool(),
+            generate_peaks,
+            str(source),
+            str(media_path(peaksfile)),
+            settings["PEAKS_SAMPLES_PER_PEAK"],
+            settings["PEAKS_CHUNK_FRAMES"],
+        )
+        await run_in_threadpool(_save_peaksfile, job.playlist_id, peaksfile)
+    except Exception as e:
+        log.exception("Peaks generation failed for playlist %s", job.playlist_id)
+        job.status, job.error = PeaksJobStatus.failed, str(e)
+        return
+    log.info("Peaks generated for playlist %s: %s", job.playlist_id, info)
+    job.status, job.peaksfile = PeaksJobStatus.done, peaksfile
+
+
+def start_peaks_job(playlist: Playlist) -> PeaksJob:
+    """
+    Schedule the peaks generation of a playlist in the process pool and
+    return at once. Playlist.peaksfile is set when the file is written.
+    A job already pending for the playlist is returned instead of a new one.
+    """
+    current = peaks_jobs.get(playlist.id)
+    if current and current.status is PeaksJobStatus.pending:
+        return current
+    source = media_path(playlist.filename)
+    if not source.is_file():
+        raise FileNotFoundError(playlist.filename)
+    job = PeaksJob(playlist_id=playlist.id, status=PeaksJobStatus.pending)
+    peaks_jobs[playlist.id] = job
+    task = asyncio.create_task(_run_job(job, source))
+    # Référence forte tant que la tâche tourne, sinon elle peut être ramassée
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job
@@ -1,52 +1,105 @@
-from typing import List
-from sqlmodel import Session, select
+from datetime import datetime
+from typing import Any
 
-from app.models.person import Person, PersonCreate, PersonUpdate
-from app.models.entity import Entity # Needed for relationship management
+from sqlalchemy import delete, literal, update
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, func, select
+
+from app.cache import cache_key, get_cache
+from app.crud.bulk import bulk_create, insert_ignore
+from app.crud.loader import get_loader
+from app.crud.membership import membership_cache_keys
+from app.crud.pagination import paginate
+from app.crud.returning import delete_returning, insert_returning, update_returning
+
+from app.models.bulk import BulkResult
+from app.models.pagination import Page
+from app.models.person import Person, PersonCreate, PersonEntityLink, PersonUpdate
+from app.models.versioning import utcnow
+from app.models.entity import Entity, PersonReadWithEntities # Needed for relationship management
 
 def create_person(session: Session, person_create: PersonCreate) -> Person:
-    db_person = Person.model_validate(person_create)
-    session.add(db_person)
+    db_person = insert_returning(session, Person, person_create.model_dump())
     session.commit()
-    session.refresh(db_person)
     return db_person
 
-def get_person(session: Session, person_id: int) -> Person | None:
-    return session.get(Person, person_id)
+def create_persons(session: Session, persons: list[Any], chunk_size: int) -> BulkResult:
+    return bulk_create(session, PersonCreate, Person, persons, chunk_size)
+
+def get_person(session: Session, person_id: int, populate_existing: bool = False) -> Person | None:
+    # Renvoyée en PersonReadWithEntities : les entités sont chargées en une seule requête IN
+    return session.get(
+        Person, person_id, options=[selectinload(Person.entities)], populate_existing=populate_existing
+    )
 
 def get_person_by_email(session: Session, email: str) -> Person | None:
-    statement = select(Person).where(Person.email == email)
+    statement = select(Person).where(Person.email == email).options(selectinload(Person.entities))
     return session.exec(statement).first()
 
-def get_persons(session: Session, skip: int = 0, limit: int = 100) -> List[Person]:
-    statement = select(Person).offset(skip).limit(limit)
-    persons = session.exec(statement).all()
-    return list(persons)
+def get_person_by_email_cached(session: Session, email: str) -> PersonReadWithEntities | None:
+    """
+    Read-through cached get_person_by_email, invalidated by every write that
+    changes the person, its links or one of its entities.
+    """
+    def load() -> dict | None:
+        person = get_person_by_email(session, email)
+        return PersonReadWithEntities.model_validate(person).model_dump(mode="json") if person else None
+
+    data = get_cache().get_or_load(cache_key("person", email), load)
+    return PersonReadWithEntities.model_validate(data) if data is not None else None
+
+def get_person_version(session: Session, person_id: int) -> tuple[datetime, int] | None:
+    """
+    Mirror of get_entity_version for PersonReadWithEntities.
+    """
+    statement = (
+        select(Person.updated_at, func.max(Entity.updated_at), func.count(Entity.id))
+        .select_from(Person)
+        .outerjoin(PersonEntityLink, PersonEntityLink.person_id == Person.id)
+        .outerjoin(Entity, Entity.id == PersonEntityLink.entity_id)
+        .where(Person.id == person_id)
+        .group_by(Person.id, Person.updated_at)
+    )
+    row = session.exec(statement).first()
+    if row is None:
+        return None
+    person_updated_at, entities_updated_at, count = row
+    return max(person_updated_at, entities_updated_at or person_updated_at), count
+
+def get_persons_by_ids(session: Session, person_ids: list[int]) -> list[Person | None]:
+    """
+    Persons in the order of `person_ids` (None for unknown ids), with one IN
+    query for the persons and one for all their entities.
+    """
+    return get_loader(session).load_many(Person.id, person_ids, options=[selectinload(Person.entities)])
+
+def get_persons(session: Session, after_id: int | None = None, limit: int = 100) -> Page[Person]:
+    return paginate(session, select(Person), Person.id, after_id=after_id, limit=limit)
 
 def update_person(session: Session, person_id: int, person_update: PersonUpdate) -> Person | None:
-    db_person = session.get(Person, person_id)
+    stale_keys = membership_cache_keys(session, person_ids=[person_id], linked=True)
+    person_data = person_update.model_dump(exclude_unset=True)
+    db_person = update_returning(session, Person, [Person.id == person_id], person_data)
     if not db_person:
         return None
-    
-    person_data = person_update.model_dump(exclude_unset=True)
-    for key, value in person_data.items():
-        setattr(db_person, key, value)
-    
-    session.add(db_person)
+
     session.commit()
-    session.refresh(db_person)
+    get_cache().invalidate(*stale_keys, cache_key("person", db_person.email))
     return db_person
 
 def delete_person(session: Session, person_id: int) -> Person | None:
-    db_person = session.get(Person, person_id)
+    stale_keys = membership_cache_keys(session, person_ids=[person_id], linked=True)
+    # Les liens d'abord (ce que faisait la relationship), puis la ligne, sans la charger
+    session.execute(delete(PersonEntityLink).where(PersonEntityLink.person_id == person_id))
+    db_person = delete_returning(session, Person, [Person.id == person_id])
     if not db_person:
         return None
-    session.delete(db_person)
     session.commit()
+    get_cache().invalidate(*stale_keys)
     return db_person # Or return {"message": "Person deleted successfully"}
 
 def add_entity_to_person(session: Session, person_id: int, entity_id: int) -> Person | None:
-    person = session.get(Person, person_id)
+    person = get_person(session, person_id)
     if not person:
         return None
     
@@ -56,13 +109,16 @@ def add_entity_to_person(session: Session, person_id: int, entity_id: int) -> Pe
 
     if entity not in person.entities:
         person.entities.append(entity)
+        person.updated_at = utcnow()
         session.add(person)
+        stale_keys = [cache_key("entity", entity.name), cache_key("person", person.email)]
         session.commit()
-        session.refresh(person)
+        get_cache().invalidate(*stale_keys)
+        person = get_person(session, person_id, populate_existing=True)
     return person
 
 def remove_entity_from_person(session: Session, person_id: int, entity_id: int) -> Person | None:
-    person = session.get(Person, person_id)
+    person = get_person(session, person_id)
     if not person:
         return None
     
@@ -72,7 +128,45 @@ def remove_entity_from_person(session: Session, person_id: int, entity_id: int)
 
     if entity in person.entities:
         person.entities.remove(entity)
+        person.updated_at = utcnow()
         session.add(person)
+        stale_keys = [cache_key("entity", entity.name), cache_key("person", person.email)]
         session.commit()
-        session.refresh(person)
+        get_cache().invalidate(*stale_keys)
+        person = get_person(session, person_id, populate_existing=True)
     return person
+
+def add_entities_to_person(session: Session, person_id: int, entity_ids: list[int]) -> int | None:
+    """
+    Mirror of add_persons_to_entity: links many entities to a person with one
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+    """
+    if session.exec(select(Person.id).where(Person.id == person_id)).first() is None:
+        return None
+    stale_keys = membership_cache_keys(session, person_ids=[person_id], entity_ids=entity_ids)
+    entities = select(literal(person_id), Entity.id).where(Entity.id.in_(set(entity_ids)))
+    statement = insert_ignore(session, PersonEntityLink.__table__).from_select(["person_id", "entity_id"], entities)
+    count = session.execute(statement).rowcount
+    if count:
+        session.execute(update(Person).where(Person.id == person_id).values(updated_at=utcnow()))
+    session.commit()
+    get_cache().invalidate(*stale_keys)
+    return count
+
+def remove_entities_from_person(session: Session, person_id: int, entity_ids: list[int]) -> int | None:
+    """
+    Mirror of remove_persons_from_entity.
+    """
+    if session.exec(select(Person.id).where(Person.id == person_id)).first() is None:
+        return None
+    stale_keys = membership_cache_keys(session, person_ids=[person_id], entity_ids=entity_ids)
+    statement = delete(PersonEntityLink).where(
+        PersonEntityLink.person_id == person_id,
+        PersonEntityLink.entity_id.in_(set(entity_ids)),
+    )
+    count = session.execute(statement).rowcount
+    if count:
+        session.execute(update(Person).where(Person.id == person_id).values(updated_at=utcnow()))
+    session.commit()
+    get_cache().invalidate(*stale_keys)
+    return count
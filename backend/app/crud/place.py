@@ -1,45 +1,142 @@
+from typing import Any
+
+from sqlalchemy import and_, or_, text
 from sqlmodel import Session, select
 
-from app.db.db_setup import engine
-from app.models.place import Place, PlaceCreate, PlaceUpdate
+from app.cache import cache_key, get_cache
+from app.crud.bulk import bulk_create, bulk_upsert, upsert_row
+from app.crud.pagination import paginate
+from app.crud.returning import delete_returning, insert_returning, update_returning
+from app.db.spatial_index import PLACE_GEOGRAPHY, has_postgis
+from app.geo import PREFIX_END, covering_prefixes, haversine_km
+from app.models.bulk import BulkResult
+from app.models.pagination import Page
+from app.models.place import Place, PlaceCreate, PlaceNearby, PlaceUpdate, place_geohash
 
 
 def post_place(session: Session, place: PlaceCreate) -> Place:
-    db_place = Place.model_validate(place) 
-    session.add(db_place)
+    db_place = insert_returning(session, Place, place.model_dump())
+    session.commit()
+    return db_place
+
+def post_places(session: Session, places: list[Any], chunk_size: int) -> BulkResult:
+    return bulk_create(session, PlaceCreate, Place, places, chunk_size)
+
+def put_place(session: Session, place: PlaceCreate) -> Place:
+    """
+    Create the place or replace the one with the same name, in one statement.
+    """
+    db_place = upsert_row(session, Place, "name", place.model_dump())
     session.commit()
-    session.refresh(db_place)
+    get_cache().invalidate(cache_key("place", db_place.name))
     return db_place
 
+def put_places(session: Session, places: list[Any], chunk_size: int) -> BulkResult:
+    result = bulk_upsert(session, PlaceCreate, Place, "name", places, chunk_size)
+    # Les noms des éléments rejetés sont invalidés aussi : sans effet
+    get_cache().invalidate(*(
+        cache_key("place", item["name"]) for item in places if isinstance(item, dict) and isinstance(item.get("name"), str)
+    ))
+    return result
+
 def get_place(session: Session, place_name: str) -> Place | None:
     query = select(Place).where(Place.name == place_name)
     return session.exec(query).first()
 
+def get_place_cached(session: Session, place_name: str) -> Place | None:
+    """
+    Read-through cached get_place. The returned object is detached from the
+    session: use get_place to modify a place.
+    """
+    def load() -> dict | None:
+        place = get_place(session, place_name)
+        return place.model_dump(mode="json") if place else None
+
+    data = get_cache().get_or_load(cache_key("place", place_name), load)
+    return Place.model_validate(data) if data is not None else None
+
 
-def get_all_places(session: Session) -> list[Place]:
+def get_all_places(session: Session, after_id: int | None = None, limit: int = 100) -> Page[Place]:
     query = select(Place)
-    return list(session.exec(query).all())
+    return paginate(session, query, Place.id, after_id=after_id, limit=limit, page_type=Page[Place])
+
+
+def _nearby_postgis_statement(latitude: float, longitude: float, radius_km: float, k: int) -> Any:
+    # KNN sur l'index GiST : <-> trie par distance en parcourant l'index, ST_DWithin borne le rayon.
+    # text() partout : literal_column ne lie pas les paramètres :name qu'il contient
+    point = "ST_SetSRID(ST_MakePoint(:longitude, :latitude), 4326)::geography"
+    return (
+        select(Place, text(f"ST_Distance({PLACE_GEOGRAPHY}, {point}) / 1000"))
+        .where(text(f"ST_DWithin({PLACE_GEOGRAPHY}, {point}, :radius_m)"))
+        .order_by(text(f"{PLACE_GEOGRAPHY} <-> {point}"))
+        .limit(k)
+        .params(latitude=latitude, longitude=longitude, radius_m=radius_km * 1000)
+    )
+
+
+def _nearby_postgis(session: Session, latitude: float, longitude: float, radius_km: float, k: int) -> list[PlaceNearby]:
+    statement = _nearby_postgis_statement(latitude, longitude, radius_km, k)
+    return [
+        PlaceNearby.model_validate({**place.model_dump(), "distance_km": distance})
+        for place, distance in session.exec(statement)
+    ]
+
+
+def _nearby_geohash(session: Session, latitude: float, longitude: float, radius_km: float, k: int) -> list[PlaceNearby]:
+    # Un intervalle de l'index geohash par cellule (9, ou les rangées entières près des pôles), puis distance exacte sur ces seuls candidats
+    prefixes = covering_prefixes(latitude, longitude, radius_km)
+    statement = select(Place).where(
+        or_(*(and_(Place.geohash >= prefix, Place.geohash < prefix + PREFIX_END) for prefix in prefixes))
+    )
+    hits = []
+    for place in session.exec(statement):
+        distance = haversine_km(latitude, longitude, place.latitude, place.longitude)
+        if distance <= radius_km:
+            hits.append((distance, place))
+    hits.sort(key=lambda hit: hit[0])
+    return [
+        PlaceNearby.model_validate({**place.model_dump(), "distance_km": distance})
+        for distance, place in hits[:k]
+    ]
+
+
+def get_places_nearby(session: Session, latitude: float, longitude: float, radius_km: float, k: int) -> list[PlaceNearby]:
+    """
+    The `k` places nearest to the point within `radius_km`, nearest first.
+    Uses the PostGIS GiST index when the extension is installed, the geohash
+    index otherwise (PostgreSQL without PostGIS, SQLite).
+    """
+    if has_postgis(session.connection()):
+        return _nearby_postgis(session, latitude, longitude, radius_km, k)
+    return _nearby_geohash(session, latitude, longitude, radius_km, k)
 
 
 def update_place(session: Session, place_name: str, place_update: PlaceUpdate) -> Place | None:
-    db_place = get_place(session, place_name)
+    place_data = place_update.model_dump(exclude_unset=True)
+    if "latitude" in place_data or "longitude" in place_data:
+        # Le geohash dépend des deux coordonnées : celle qui n'est pas fournie est lue
+        coordinates = {"latitude": None, "longitude": None}
+        if not coordinates.keys() <= place_data.keys():
+            current = session.exec(select(Place.latitude, Place.longitude).where(Place.name == place_name)).first()
+            if current is None:
+                return None
+            coordinates = current._asdict()
+        coordinates.update((key, place_data[key]) for key in coordinates if key in place_data)
+        place_data["geohash"] = place_geohash(**coordinates)
+
+    db_place = update_returning(session, Place, [Place.name == place_name], place_data)
     if not db_place:
         return None
-    
-    place_data = place_update.model_dump(exclude_unset=True)
-    for key, value in place_data.items():
-        setattr(db_place, key, value)
-    
-    session.add(db_place)
+
     session.commit()
-    session.refresh(db_place)
+    get_cache().invalidate(cache_key("place", place_name), cache_key("place", db_place.name))
     return db_place
 
 
 def delete_place(session: Session, place_name: str) -> Place | None:
-    place = get_place(session, place_name)
+    place = delete_returning(session, Place, [Place.name == place_name])
     if place:
-        session.delete(place)
         session.commit()
+        get_cache().invalidate(cache_key("place", place_name))
         return place
     return None
\ No newline at end of file
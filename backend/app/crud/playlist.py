@@ -0,0 +1,54 @@
+from sqlmodel import Session, select
+
+from app.cache import cache_key, get_cache
+from app.crud.pagination import paginate
+from app.crud.returning import delete_returning, insert_returning, update_returning
+from app.models.pagination import Page
+from app.models.playlist import Playlist, PlaylistCreate, PlaylistUpdate
+from app.timeline import get_timelines
+
+
+def post_playlist(session: Session, playlist: PlaylistCreate) -> Playlist:
+    db_playlist = insert_returning(session, Playlist, playlist.model_dump())
+    session.commit()
+    return db_playlist
+
+def get_playlist(session: Session, playlist_id: int) -> Playlist | None:
+    return session.get(Playlist, playlist_id)
+
+def get_playlist_cached(session: Session, playlist_id: int) -> Playlist | None:
+    """
+    Read-through cached get_playlist, used by the audio and peaks endpoints
+    that players call on every seek. The returned object is detached.
+    """
+    def load() -> dict | None:
+        playlist = get_playlist(session, playlist_id)
+        return playlist.model_dump(mode="json") if playlist else None
+
+    data = get_cache().get_or_load(cache_key("playlist", playlist_id), load)
+    return Playlist.model_validate(data) if data is not None else None
+
+def get_all_playlists(session: Session, after_id: int | None = None, limit: int = 100) -> Page[Playlist]:
+    query = select(Playlist)
+    return paginate(session, query, Playlist.id, after_id=after_id, limit=limit, page_type=Page[Playlist])
+
+
+def update_playlist(session: Session, playlist_id: int, playlist_update: PlaylistUpdate) -> Playlist | None:
+    playlist_data = playlist_update.model_dump(exclude_unset=True)
+    db_playlist = update_returning(session, Playlist, [Playlist.id == playlist_id], playlist_data)
+    if not db_playlist:
+        return None
+
+    session.commit()
+    get_cache().invalidate(cache_key("playlist", playlist_id))
+    return db_playlist
+
+
+def delete_playlist(session: Session, playlist_id: int) -> Playlist | None:
+    playlist = delete_returning(session, Playlist, [Playlist.id == playlist_id])
+    if playlist:
+        session.commit()
+        get_cache().invalidate(cache_key("playlist", playlist_id))
+        get_timelines().invalidate(playlist_id)
+        return playlist
+    return None
@@ -1,59 +1,112 @@
-from sqlmodel import Session, select
+from datetime import datetime
+from typing import Any
 
-from app.db.db_setup import engine
+from sqlmodel import Session, func, select
+
+from app.cache import cache_key, get_cache
+from app.crud.bulk import bulk_create, bulk_upsert, upsert_row
+from app.crud.loader import get_loader
+from app.crud.pagination import paginate
+from app.crud.returning import delete_returning, insert_returning, update_returning
+from app.models.bulk import BulkResult
+from app.models.pagination import Page
 from app.models.product import Product, ProductCreate, ProductUpdate
 
 
 def post_product(session: Session, product: ProductCreate) -> Product:
-    db_product = Product.model_validate(product) 
-    session.add(db_product)
+    db_product = insert_returning(session, Product, product.model_dump())
+    session.commit()
+    return db_product
+
+def post_products(session: Session, products: list[Any], chunk_size: int) -> BulkResult:
+    return bulk_create(session, ProductCreate, Product, products, chunk_size)
+
+def put_product(session: Session, product: ProductCreate) -> Product:
+    """
+    Create the product or replace the live one with the same name, in one
+    statement. A soft-deleted product of that name is left alone.
+    """
+    db_product = upsert_row(session, Product, "name", product.model_dump(), where=~Product.is_deleted)
     session.commit()
-    session.refresh(db_product)
+    get_cache().invalidate(cache_key("product", db_product.name))
     return db_product
 
+def put_products(session: Session, products: list[Any], chunk_size: int) -> BulkResult:
+    result = bulk_upsert(session, ProductCreate, Product, "name", products, chunk_size, where=~Product.is_deleted)
+    # Les noms des éléments rejetés sont invalidés aussi : sans effet
+    get_cache().invalidate(*(
+        cache_key("product", item["name"]) for item in products if isinstance(item, dict) and isinstance(item.get("name"), str)
+    ))
+    return result
+
 def get_product(session: Session, product_name: str) -> Product | None:
     query = select(Product).where(Product.name == product_name, Product.is_deleted == False)
     return session.exec(query).first()
 
+def get_product_cached(session: Session, product_name: str) -> Product | None:
+    """
+    Read-through cached get_product. The returned object is detached from the
+    session: use get_product to modify a product.
+    """
+    def load() -> dict | None:
+        product = get_product(session, product_name)
+        return product.model_dump(mode="json") if product else None
+
+    data = get_cache().get_or_load(cache_key("product", product_name), load)
+    return Product.model_validate(data) if data is not None else None
+
+
+def get_products_by_names(session: Session, names: list[str]) -> list[Product | None]:
+    """
+    Products in the order of `names` (None for unknown or soft-deleted ones),
+    with one IN query for all of them.
+    """
+    return get_loader(session).load_many(Product.name, names, where=[Product.is_deleted == False])
 
-def get_all_products(session: Session) -> list[Product]:
+
+def get_all_products(session: Session, after_id: int | None = None, limit: int = 100) -> Page[Product]:
     query = select(Product).where(Product.is_deleted == False)
-    return list(session.exec(query).all())
+    return paginate(session, query, Product.id, after_id=after_id, limit=limit, page_type=Page[Product])
+
+
+def get_products_version(session: Session) -> tuple[datetime | None, int]:
+    """
+    Cheap validator of the product collection: max(updated_at) comes from its
+    index, the count catches hard deletes. Soft-deleted rows are included, so
+    a soft delete (which bumps updated_at) changes the validator too.
+    """
+    latest, count = session.exec(select(func.max(Product.updated_at), func.count(Product.id))).one()
+    return latest, count
 
 
 def update_product(session: Session, product_name: str, product_update: ProductUpdate) -> Product | None:
-    db_product = get_product(session, product_name)
+    product_data = product_update.model_dump(exclude_unset=True)
+    db_product = update_returning(
+        session, Product, [Product.name == product_name, Product.is_deleted == False], product_data
+    )
     if not db_product:
         return None
-    
-    product_data = product_update.model_dump(exclude_unset=True)
-    for key, value in product_data.items():
-        setattr(db_product, key, value)
-    
-    session.add(db_product)
+
     session.commit()
-    session.refresh(db_product)
+    get_cache().invalidate(cache_key("product", product_name), cache_key("product", db_product.name))
     return db_product
 
 
 def delete_product(session: Session, product_name: str) -> Product | None:
-    product = get_product(session, product_name)
+    product = update_returning(
+        session, Product, [Product.name == product_name, Product.is_deleted == False], {"is_deleted": True}
+    )
     if not product:
         return None
-    
-    product.is_deleted = True
-    session.add(product)
+
     session.commit()
-    session.refresh(product)
+    get_cache().invalidate(cache_key("product", product_name))
     return product
 
 def hard_delete_product(session: Session, product_name: str) -> dict:
-    query = select(Product).where(Product.name == product_name)
-    product_to_delete = session.exec(query).first()
-
-    if not product_to_delete:
+    if not delete_returning(session, Product, [Product.name == product_name]):
         return {"message": "Product not found"}
-    
-    session.delete(product_to_delete)
+
     session.commit()
+    get_cache().invalidate(cache_key("product", product_name))
     return {"message": f"Product '{product_name}' permanently deleted"}
\ No newline at end of file
@@ -0,0 +1,46 @@
+from typing import Any, TypeVar
+
+from sqlalchemy import delete, insert, update
+from sqlmodel import Session, SQLModel, select
+
+Model = TypeVar("Model", bound=SQLModel)
+
+# Écritures en une instruction : les valeurs générées par la base (id,
+# updated_at...) reviennent par RETURNING, sans SELECT avant ni refresh après.
+# Les objets renvoyés ne sont pas attachés à la session. L'appelant commite.
+
+
+def _model(table_model: type[Model], row: Any) -> Model | None:
+    return table_model.model_validate(row._mapping) if row is not None else None
+
+
+def insert_returning(session: Session, table_model: type[Model], values: dict[str, Any]) -> Model:
+    """
+    INSERT ... RETURNING *: the new row as `table_model`.
+    """
+    table = table_model.__table__
+    row = session.execute(insert(table).values(**values).returning(*table.c)).one()
+    return _model(table_model, row)
+
+
+def update_returning(
+    session: Session, table_model: type[Model], where: list[Any], values: dict[str, Any]
+) -> Model | None:
+    """
+    UPDATE ... WHERE ... RETURNING *: the updated row, None if `where` matched
+    nothing. Column onupdate defaults (updated_at) apply. Without values the
+    row is only read, as an ORM flush would not have written anything either.
+    """
+    table = table_model.__table__
+    if not values:
+        return _model(table_model, session.execute(select(*table.c).where(*where)).first())
+    statement = update(table).where(*where).values(**values).returning(*table.c)
+    return _model(table_model, session.execute(statement).first())
+
+
+def delete_returning(session: Session, table_model: type[Model], where: list[Any]) -> Model | None:
+    """
+    DELETE ... WHERE ... RETURNING *: the deleted row, None if there was none.
+    """
+    table = table_model.__table__
+    return _model(table_model, session.execute(delete(table).where(*where).returning(*table.c)).first())
@@ -0,0 +1,99 @@
+import re
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import Session
+
+from app.db.search_index import SEARCH_FIELDS, tsvector_expression
+from app.models.search import SearchHit, SearchResults, SearchType
+
+# Libellé affiché pour chaque type de résultat
+LABELS = {
+    SearchType.music: "t.title || ' - ' || t.artist",
+    SearchType.place: "t.name || ', ' || t.city",
+    SearchType.person: "t.firstname || ' ' || t.lastname || ' <' || t.email || '>'",
+}
+
+# En dessous de 3 caractères, les trigrammes ne sont pas sélectifs : préfixe seulement
+MIN_TRIGRAM_LENGTH = 3
+
+
+def _tokens(query: str) -> list[str]:
+    return re.findall(r"\w+", query.lower())
+
+
+def _postgresql_statement(search_type: SearchType, fuzzy: bool) -> str:
+    table = search_type.value
+    fields = SEARCH_FIELDS[table]
+    tsv = tsvector_expression(table)
+    similarity = ", ".join(f"similarity({field}, :q)" for field in fields)
+    conditions = [f"{tsv} @@ to_tsquery('simple', :prefix)"]
+    conditions += [f"{field} ILIKE :like" for field in fields]
+    if fuzzy:
+        conditions += [f"{field} % :q" for field in fields]
+    return (
+        f"SELECT id, {LABELS[search_type]} AS label, "
+        f"greatest({similarity}) + ts_rank({tsv}, to_tsquery('simple', :prefix)) AS score "
+        f"FROM {table} t WHERE {' OR '.join(conditions)} ORDER BY score DESC LIMIT :k"
+    )
+
+
+def _search_postgresql(session: Session, query: str, types: Iterable[SearchType], k: int, timeout_ms: int) -> list[SearchHit]:
+    tokens = _tokens(query)
+    params = {
+        "q": query,
+        "like": query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%",
+        "prefix": " & ".join(f"{token}:*" for token in tokens),
+        "k": k,
+    }
+    # Budget de latence : PostgreSQL annule la requête au-delà (SET LOCAL : transaction courante seulement)
+    session.execute(text(f"SET LOCAL statement_timeout = {int(timeout_ms)}"))
+    hits = []
+    for search_type in types:
+        statement = text(_postgresql_statement(search_type, fuzzy=len(query) >= MIN_TRIGRAM_LENGTH))
+        for row in session.execute(statement, params):
+            hits.append(SearchHit(type=search_type, id=row.id, label=row.label, score=row.score))
+    return hits
+
+
+def _search_sqlite(session: Session, query: str, types: Iterable[SearchType], k: int) -> list[SearchHit]:
+    # Préfixe sur chaque mot ("beat"* "liv"*) ; FTS5 n'a pas de recherche floue
+    match = " ".join(f'"{token}"*' for token in _tokens(query))
+    hits = []
+    for search_type in types:
+        table = search_type.value
+        statement = text(
+            f"SELECT t.id, {LABELS[search_type]} AS label, -bm25({table}_fts) AS score "
+            f"FROM {table}_fts JOIN {table} t ON t.id = {table}_fts.rowid "
+            f"WHERE {table}_fts MATCH :match ORDER BY bm25({table}_fts) LIMIT :k"
+        )
+        for row in session.execute(statement, {"match": match, "k": k}):
+            hits.append(SearchHit(type=search_type, id=row.id, label=row.label, score=row.score))
+    return hits
+
+
+def search(session: Session, query: str, types: list[SearchType], k: int, timeout_ms: int) -> SearchResults:
+    """
+    Ranked prefix, fuzzy (trigram) and full-text search over musics, places
+    and persons, top `k` over all requested types.
+    """
+    if not _tokens(query):
+        return SearchResults(query=query, hits=[])
+    partial = False
+    dialect = session.get_bind().dialect.name
+    try:
+        if dialect == "postgresql":
+            hits = _search_postgresql(session, query, types, k, timeout_ms)
+        elif dialect == "sqlite":
+            hits = _search_sqlite(session, query, types, k)
+        else:
+            raise NotImplementedError(f"Search is not supported on {dialect}")
+    except DBAPIError as e:
+        # statement_timeout dépassé : on répond vide plutôt que de faire attendre la frappe
+        if "statement timeout" not in str(e.orig):
+            raise
+        session.rollback()
+        hits, partial = [], True
+    hits.sort(key=lambda hit: hit.score, reverse=True)
+    return SearchResults(query=query, hits=hits[:k], partial=partial)
@@ -0,0 +1,89 @@
+
+from sqlalchemy import or_
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select
+
+from app.crud.returning import delete_returning, insert_returning, update_returning
+from app.models.playlist import Playlist
+from app.models.track import Track, TrackCreate, TrackRead, TrackUpdate, check_track_times
+from app.timeline import Timeline, get_timelines
+
+
+class TrackOverlapError(Exception):
+    def __init__(self, track_id: int) -> None:
+        super().__init__(f"Overlaps track {track_id}")
+        self.track_id = track_id
+
+
+def _check_overlap(session: Session, track: Track) -> None:
+    """
+    Raise TrackOverlapError if the track overlaps another track of its
+    playlist. The playlist row is locked first (FOR UPDATE on PostgreSQL) so
+    that two concurrent writes on the same playlist cannot both pass the check.
+    """
+    if track.playlist_id is None:
+        return
+    session.exec(select(Playlist.id).where(Playlist.id == track.playlist_id).with_for_update())
+    statement = select(Track.id).where(
+        Track.playlist_id == track.playlist_id,
+        or_(Track.end_time.is_(None), Track.end_time > track.start_time),
+    )
+    if track.end_time is not None:
+        statement = statement.where(Track.start_time < track.end_time)
+    if track.id is not None:
+        statement = statement.where(Track.id != track.id)
+    conflict = session.exec(statement.limit(1)).first()
+    if conflict is not None:
+        raise TrackOverlapError(conflict)
+
+
+def post_track(session: Session, track: TrackCreate) -> Track:
+    _check_overlap(session, Track.model_validate(track))
+    db_track = insert_returning(session, Track, track.model_dump())
+    session.commit()
+    get_timelines().invalidate(db_track.playlist_id)
+    return db_track
+
+def get_track(session: Session, track_id: int) -> Track | None:
+    # Renvoyée en TrackReadWithDetails : musique et playlist en une requête IN chacune
+    return session.get(Track, track_id, options=[selectinload(Track.music), selectinload(Track.playlist)])
+
+def get_playlist_tracks(session: Session, playlist_id: int) -> list[Track]:
+    statement = select(Track).where(Track.playlist_id == playlist_id).order_by(Track.start_time)
+    return list(session.exec(statement).all())
+
+def get_timeline(session: Session, playlist_id: int) -> Timeline:
+    """
+    Timeline of a playlist from the in-memory index, loaded with one query on
+    a miss. Point and window queries on it are binary searches.
+    """
+    def load() -> list[TrackRead]:
+        return [TrackRead.model_validate(track) for track in get_playlist_tracks(session, playlist_id)]
+
+    return get_timelines().get_or_load(playlist_id, load)
+
+def update_track(session: Session, track_id: int, track_update: TrackUpdate) -> Track | None:
+    db_track = session.get(Track, track_id)
+    if not db_track:
+        return None
+
+    previous_playlist_id = db_track.playlist_id
+    track_data = track_update.model_dump(exclude_unset=True)
+    # Les vérifications portent sur la piste modifiée, écrite ensuite en un UPDATE ... RETURNING
+    candidate = Track.model_validate({**db_track.model_dump(), **track_data})
+    check_track_times(candidate.start_time, candidate.end_time)
+    _check_overlap(session, candidate)
+
+    db_track = update_returning(session, Track, [Track.id == track_id], track_data)
+    session.commit()
+    get_timelines().invalidate(previous_playlist_id, db_track.playlist_id)
+    return db_track
+
+
+def delete_track(session: Session, track_id: int) -> Track | None:
+    track = delete_returning(session, Track, [Track.id == track_id])
+    if track:
+        session.commit()
+        get_timelines().invalidate(track.playlist_id)
+        return track
+    return None
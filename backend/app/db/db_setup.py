@@ -1,23 +1,123 @@
 #webapp_essentials/src/database/database_setup.py
+from functools import lru_cache
 from logging import INFO, basicConfig, getLogger
-from typing import Generator
+from typing import Any, AsyncGenerator, Generator
 
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import get_settings
+from app.db.pool_stats import PoolStats, instrumented_pool_class
+from app.db.query_stats import instrument_engine
+from app.db.schema_version import record_schema_version, recorded_schema_version, schema_version
+from app.db.search_index import create_search_indexes
+from app.db.spatial_index import create_spatial_indexes
 
 log = getLogger(__name__)
 basicConfig(level=INFO)
 
 DB_SETTINGS = get_settings()
 DATABASE_URL = str(DB_SETTINGS.get("DATABASE_URL"))  # Accès correct au dictionnaire
+DB_ASYNC = bool(DB_SETTINGS.get("DB_ASYNC"))
 
-engine = create_engine(DATABASE_URL)
+# Drivers asynchrones utilisés quand ASYNC_DATABASE_URL n'est pas renseignée
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
 
-def create_db_and_tables() -> None:
+sync_pool_stats = PoolStats("sync", slow_wait=DB_SETTINGS["DB_POOL_SLOW_WAIT"])
+async_pool_stats = PoolStats("async", slow_wait=DB_SETTINGS["DB_POOL_SLOW_WAIT"])
+
+
+def pool_options(url: str, base: type[QueuePool], stats: PoolStats) -> dict[str, Any]:
+    # SQLite en mémoire utilise un pool à connexion unique, non configurable
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+        return {}
+    return {
+        "poolclass": instrumented_pool_class(base, stats),
+        "pool_size": DB_SETTINGS["DB_POOL_SIZE"],
+        "max_overflow": DB_SETTINGS["DB_MAX_OVERFLOW"],
+        "pool_timeout": DB_SETTINGS["DB_POOL_TIMEOUT"],
+        "pool_recycle": DB_SETTINGS["DB_POOL_RECYCLE"],
+        "pool_pre_ping": DB_SETTINGS["DB_POOL_PRE_PING"],
+    }
+
+
+# Moteurs créés à la première utilisation : importer l'application (outils, workers
+# qui démarrent) ne charge pas le driver et n'ouvre rien tant qu'aucune requête n'arrive
+@lru_cache()
+def get_engine() -> Engine:
+    engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL, QueuePool, sync_pool_stats))
+    if DB_SETTINGS["QUERY_STATS"]:
+        instrument_engine(engine)
+    return engine
+
+
+def get_async_database_url() -> str:
+    url = DB_SETTINGS.get("ASYNC_DATABASE_URL")
+    if url:
+        return str(url)
+    scheme, sep, rest = DATABASE_URL.partition("://")
+    if scheme not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for '{scheme}', set ASYNC_DATABASE_URL")
+    return f"{ASYNC_DRIVERS[scheme]}{sep}{rest}"
+
+
+# Le moteur asynchrone n'est utilisé que si DB_ASYNC est activé : asyncpg/aiosqlite
+# ne sont pas exigés dans les déploiements synchrones.
+@lru_cache()
+def get_async_engine() -> AsyncEngine:
+    url = get_async_database_url()
+    async_engine = create_async_engine(url, **pool_options(url, AsyncAdaptedQueuePool, async_pool_stats))
+    if DB_SETTINGS["QUERY_STATS"]:
+        instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+
+def create_db_and_tables(fast: bool = False) -> bool:
+    """
+    Create the missing tables and the /search and /places/nearby indexes,
+    then record the schema version. With `fast`, a recorded version equal
+    to the current one skips all of it (one SELECT instead of a check per
+    table). Returns False when skipped.
+    """
+    engine = get_engine()
+    version = schema_version(SQLModel.metadata)
+    if fast and recorded_schema_version(engine) == version:
+        return False
     SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        create_search_indexes(connection)
+        create_spatial_indexes(connection)
+        record_schema_version(connection, version)
+    return True
+
+
+def get_sync_session() -> Generator[Session, Session, None]:
+    log.debug("Initialising database session...")
+    with Session(get_engine()) as session:
+        yield session
+
 
-def get_session() -> Generator[Session, Session, None]:
-    log.info("Initialising database session...")
-    with Session(engine) as session:
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    log.debug("Initialising async database session...")
+    # expire_on_commit=False : les objets restent lisibles après commit, la
+    # sérialisation de la réponse ne peut pas relancer de requête hors greenlet.
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
         yield session
+
+
+def get_pool_stats() -> dict[str, Any]:
+    stats = {"sync": sync_pool_stats.snapshot()}
+    if DB_ASYNC:
+        stats["async"] = async_pool_stats.snapshot()
+    return stats
+
+
+# Dépendance utilisée par tous les routeurs, choisie selon DB_ASYNC
+get_session = get_async_session if DB_ASYNC else get_sync_session
@@ -0,0 +1,92 @@
+from bisect import bisect_left
+from logging import getLogger
+from threading import Lock
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool, QueuePool
+
+log = getLogger(__name__)
+
+# Bornes supérieures (en secondes) des buckets de l'histogramme d'attente
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolStats:
+    """
+    Counters for connection checkouts of one pool: how many, how long the
+    caller waited for a connection (histogram) and how many timed out.
+    """
+
+    def __init__(self, name: str, slow_wait: float | None = None) -> None:
+        self.name = name
+        self.slow_wait = slow_wait
+        self.pool: QueuePool | None = None
+        self._lock = Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self.wait_counts = [0] * (len(WAIT_BUCKETS) + 1)  # dernier bucket : +Inf
+
+    def observe(self, wait: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_sum += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.wait_counts[bisect_left(WAIT_BUCKETS, wait)] += 1
+        if self.slow_wait is not None and wait >= self.slow_wait:
+            log.warning(
+                "Waited %.3fs for a '%s' database connection (%s)",
+                wait, self.name, self.pool.status() if self.pool else "no pool",
+            )
+
+    def timed_out(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip((*WAIT_BUCKETS, float("inf")), self.wait_counts):
+                cumulative += count
+                buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+            stats: dict[str, Any] = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_sum": self.wait_sum,
+                "wait_seconds_max": self.wait_max,
+                "wait_seconds_buckets": buckets,
+            }
+        if self.pool is not None:
+            stats.update(
+                size=self.pool.size(),
+                checked_in=self.pool.checkedin(),
+                checked_out=self.pool.checkedout(),
+                overflow=self.pool.overflow(),
+            )
+        return stats
+
+
+def instrumented_pool_class(base: type[QueuePool], stats: PoolStats) -> type[QueuePool]:
+    """
+    Subclass of a QueuePool that times every checkout into `stats`.
+    Pool.recreate() reuses the class, so the stats survive engine.dispose().
+    """
+
+    def __init__(self: QueuePool, *args: Any, **kwargs: Any) -> None:
+        base.__init__(self, *args, **kwargs)
+        stats.pool = self
+
+    def connect(self: Pool) -> Any:
+        start = perf_counter()
+        try:
+            connection = base.connect(self)
+        except exc.TimeoutError:
+            stats.timed_out()
+            raise
+        stats.observe(perf_counter() - start)
+        return connection
+
+    return type(f"Instrumented{base.__name__}", (base,), {"__init__": __init__, "connect": connect})
@@ -0,0 +1,92 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+# Longueur maximale de la requête la plus lente gardée pour les logs
+STATEMENT_MAX_LENGTH = 300
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+@dataclass
+class QueryStats:
+    """
+    Statements run for one request (see app.middleware.QueryStatsMiddleware).
+    With `budget`, going over it is reported, and with `strict` the statement
+    that goes over raises QueryBudgetExceeded instead of running.
+    """
+
+    budget: int | None = None
+    strict: bool = False
+    # Faux une fois la requête terminée : les tâches lancées pendant la requête héritent du contexte
+    active: bool = True
+    count: int = 0
+    refused: int = 0
+    duration: float = 0.0
+    slowest: float = 0.0
+    slowest_statement: str | None = None
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count + self.refused > self.budget
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.duration * 1000:.2f};desc="queries={self.count}", '
+            f"db-slowest;dur={self.slowest * 1000:.2f}"
+        )
+
+
+# Positionné par le middleware pour la durée d'une requête : le threadpool et
+# AsyncSession.run_sync copient le contexte, l'objet lui-même est partagé
+current_query_stats: ContextVar[QueryStats | None] = ContextVar("current_query_stats", default=None)
+
+
+def _before_cursor_execute(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+    stats = current_query_stats.get()
+    if stats is None or not stats.active:
+        return
+    if stats.strict and stats.budget is not None and stats.count >= stats.budget:
+        stats.refused += 1
+        raise QueryBudgetExceeded(f"Query budget of {stats.budget} exceeded by: {statement[:STATEMENT_MAX_LENGTH]}")
+    conn.info.setdefault("query_start", []).append(perf_counter())
+
+
+def _after_cursor_execute(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+    # Retire le départ même hors requête : la liste vit avec la connexion DBAPI, dans le pool
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    started = starts.pop()
+    stats = current_query_stats.get()
+    if stats is None or not stats.active:
+        return
+    elapsed = perf_counter() - started
+    stats.count += 1
+    stats.duration += elapsed
+    if elapsed >= stats.slowest:
+        stats.slowest = elapsed
+        stats.slowest_statement = statement[:STATEMENT_MAX_LENGTH]
+
+
+def _handle_error(context: Any) -> None:
+    # Instruction en échec (IntegrityError des replis ligne par ligne...) : after_cursor_execute
+    # n'est pas appelé. Elle a bien fait un aller-retour : comptée comme les autres
+    if context.connection is not None:
+        _after_cursor_execute(context.connection, None, context.statement or "")
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Record every statement run by `engine` into the QueryStats of the current
+    request. Statements outside a request (startup, background flushes) are
+    not recorded. For an AsyncEngine, pass its sync_engine.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
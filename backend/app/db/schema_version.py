@@ -0,0 +1,59 @@
+from hashlib import sha256
+
+from sqlalchemy import Column, Connection, DateTime, Engine, MetaData, String, Table, delete, exc, insert, select
+
+from app.models.versioning import utcnow
+
+# À incrémenter quand le DDL créé hors des modèles change (index de recherche, index spatial)
+SCHEMA_REVISION = 1
+
+# Hors de SQLModel.metadata : ne fait pas partie du schéma qu'elle décrit
+schema_version_table = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", String(64), primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def schema_version(metadata: MetaData) -> str:
+    """
+    Fingerprint of the tables, columns, indexes and constraints declared in
+    `metadata`, plus SCHEMA_REVISION: changes whenever a model does.
+    """
+    parts = [f"revision:{SCHEMA_REVISION}"]
+    for table in sorted(metadata.tables.values(), key=lambda table: table.name):
+        parts.append(f"table:{table.name}")
+        for column in table.columns:
+            parts.append(
+                f"column:{column.name}:{column.type!r}:{column.nullable}:{column.primary_key}:"
+                f"{column.unique}:{sorted(fk.target_fullname for fk in column.foreign_keys)}"
+            )
+        # Index et contraintes sont des ensembles, souvent sans nom : tri sur leur description
+        parts += sorted(
+            f"index:{index.name}:{index.unique}:{[column.name for column in index.columns]}" for index in table.indexes
+        )
+        parts += sorted(
+            f"constraint:{type(constraint).__name__}:{constraint.name}:{sorted(constraint.columns.keys())}"
+            for constraint in table.constraints
+        )
+    return sha256("\n".join(parts).encode()).hexdigest()
+
+
+def recorded_schema_version(engine: Engine) -> str | None:
+    """
+    Version recorded by the last create_db_and_tables, None if there is none
+    (new database, or one created before versions were recorded).
+    """
+    try:
+        with engine.connect() as connection:
+            return connection.execute(select(schema_version_table.c.version)).scalar()
+    except exc.DBAPIError:
+        # Table absente
+        return None
+
+
+def record_schema_version(connection: Connection, version: str) -> None:
+    schema_version_table.create(connection, checkfirst=True)
+    connection.execute(delete(schema_version_table))
+    connection.execute(insert(schema_version_table).values(version=version, applied_at=utcnow()))
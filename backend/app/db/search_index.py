@@ -0,0 +1,74 @@
+from logging import getLogger
+
+from sqlalchemy import Connection, text
+
+log = getLogger(__name__)
+
+# Champs indexés pour /search, par table
+SEARCH_FIELDS: dict[str, tuple[str, ...]] = {
+    "music": ("title", "artist", "album"),
+    "place": ("name", "city"),
+    "person": ("firstname", "lastname", "email"),
+}
+
+
+def tsvector_expression(table: str) -> str:
+    # Doit rester identique à l'expression indexée pour que l'index GIN soit utilisé
+    fields = " || ' ' || ".join(f"coalesce({field}, '')" for field in SEARCH_FIELDS[table])
+    return f"to_tsvector('simple', {fields})"
+
+
+def _postgresql_ddl() -> list[str]:
+    statements = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]
+    for table, fields in SEARCH_FIELDS.items():
+        for field in fields:
+            statements.append(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_{field}_trgm ON {table} USING gin ({field} gin_trgm_ops)"
+            )
+        statements.append(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_search_tsv ON {table} USING gin (({tsvector_expression(table)}))"
+        )
+    return statements
+
+
+def _sqlite_ddl(table: str) -> list[str]:
+    # Table FTS5 à contenu externe, tenue à jour par triggers (y compris pour les INSERT en masse)
+    fields = SEARCH_FIELDS[table]
+    columns = ", ".join(fields)
+    new_values = ", ".join(f"new.{field}" for field in fields)
+    old_values = ", ".join(f"old.{field}" for field in fields)
+    fts = f"{table}_fts"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, content='{table}', "
+        f"content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END",
+    ]
+
+
+def create_search_indexes(connection: Connection) -> None:
+    """
+    Create the /search indexes if missing: pg_trgm GIN indexes and tsvector
+    expression indexes on PostgreSQL, FTS5 tables on SQLite (rebuilt from the
+    existing rows when first created). Idempotent, safe to run at every start.
+    """
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        for statement in _postgresql_ddl():
+            connection.execute(text(statement))
+    elif dialect == "sqlite":
+        for table in SEARCH_FIELDS:
+            exists = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": f"{table}_fts"}
+            ).first()
+            for statement in _sqlite_ddl(table):
+                connection.execute(text(statement))
+            if not exists:
+                connection.execute(text(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')"))
+    else:
+        log.warning("No search index for dialect %s, /search is unavailable", dialect)
@@ -0,0 +1,40 @@
+from logging import getLogger
+
+from sqlalchemy import Connection, text
+
+log = getLogger(__name__)
+
+# Point géographique d'un lieu : doit rester identique à l'expression indexée
+PLACE_GEOGRAPHY = "(ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography)"
+
+# Résultat de la détection de PostGIS, par URL de base de données
+_postgis: dict[str, bool] = {}
+
+
+def has_postgis(connection: Connection) -> bool:
+    """
+    True if the database is PostgreSQL with the postgis extension installed.
+    Checked once per database.
+    """
+    if connection.dialect.name != "postgresql":
+        return False
+    url = str(connection.engine.url)
+    if url not in _postgis:
+        _postgis[url] = connection.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'postgis'")
+        ).first() is not None
+    return _postgis[url]
+
+
+def create_spatial_indexes(connection: Connection) -> None:
+    """
+    Create the GiST index used by /places/nearby when PostGIS is installed.
+    Without it, the geohash column (plain b-tree index) is used instead.
+    Idempotent, safe to run at every start.
+    """
+    if has_postgis(connection):
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_place_geography ON place USING gist ({PLACE_GEOGRAPHY})"
+        ))
+    else:
+        log.info("PostGIS not available, /places/nearby uses the geohash index")
@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+from typing import Annotated, Any
+
+from fastapi import Body, HTTPException, Query
+
+from app.config import get_settings
+from app.crud.pagination import decode_cursor
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+@dataclass
+class PageParams:
+    after_id: int | None
+    limit: int
+
+
+async def page_params(
+    cursor: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+) -> PageParams:
+    """
+    Query parameters shared by every list endpoint: `cursor` is the
+    `next_cursor` of the previous page.
+    """
+    if cursor is None:
+        return PageParams(after_id=None, limit=limit)
+    try:
+        return PageParams(after_id=decode_cursor(cursor), limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+MAX_BULK_CHUNK_SIZE = 10000
+
+
+async def bulk_chunk_size(
+    chunk_size: int | None = Query(default=None, ge=1, le=MAX_BULK_CHUNK_SIZE),
+) -> int:
+    """
+    Rows per multi-row INSERT for bulk endpoints, BULK_CHUNK_SIZE by default.
+    """
+    return chunk_size or get_settings()["BULK_CHUNK_SIZE"]
+
+
+async def bulk_items(items: Annotated[list[Any], Body()]) -> list[Any]:
+    """
+    Raw array of a bulk endpoint: items are validated one by one by the CRUD
+    layer, so one invalid item does not reject the whole request.
+    """
+    if len(items) > get_settings()["BULK_MAX_ITEMS"]:
+        raise HTTPException(status_code=413, detail="Too many items in one bulk request")
+    return items
@@ -0,0 +1,103 @@
+from math import asin, cos, degrees, floor, radians, sin, sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 12
+# Plus grand que tous les caractères de BASE32 : [prefix, prefix + "~") couvre la cellule
+PREFIX_END = "~"
+# Bandes de latitude entières (cercle trop large en longitude, ou contenant un pôle) : cellules au plus
+MAX_BAND_CELLS = 128
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        # Les bits alternent longitude / latitude, en commençant par la longitude
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """
+    (height, width) in degrees of a geohash cell.
+    """
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def _circle_extent(latitude: float, radius_km: float) -> tuple[float, float | None]:
+    # Demi-hauteur et demi-largeur (degrés) du cercle ; largeur None s'il contient un pôle
+    angle = radius_km / EARTH_RADIUS_KM
+    radius_lat = degrees(angle)
+    if angle >= radians(90.0 - abs(latitude)):
+        return radius_lat, None
+    return radius_lat, degrees(asin(sin(angle) / cos(radians(latitude))))
+
+
+def _band_prefixes(south: float, north: float) -> list[str]:
+    # Toutes les cellules des rangées couvrant [south, north], à la précision la plus fine qui reste sous MAX_BAND_CELLS
+    chosen = None
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        height, width = cell_size(precision)
+        first, last = floor((south + 90.0) / height), min(floor((north + 90.0) / height), round(180.0 / height) - 1)
+        columns = round(360.0 / width)
+        if chosen is not None and (last - first + 1) * columns > MAX_BAND_CELLS:
+            break
+        chosen = precision, height, width, first, last, columns
+    precision, height, width, first, last, columns = chosen
+    return sorted(
+        encode_geohash(-90.0 + (row + 0.5) * height, -180.0 + (column + 0.5) * width, precision)
+        for row in range(first, last + 1)
+        for column in range(columns)
+    )
+
+
+def covering_prefixes(latitude: float, longitude: float, radius_km: float) -> list[str]:
+    """
+    Geohash prefixes whose cells together contain the whole circle: the cell
+    containing the point and its 8 neighbours, at the finest precision whose
+    cells are at least as wide and high as the circle. Near the poles, where
+    the circle is wider than any cell or contains the pole, every cell of the
+    latitude rows the circle spans instead.
+    """
+    radius_lat, radius_lon = _circle_extent(latitude, radius_km)
+    precision = None
+    if radius_lon is not None:
+        for candidate in range(GEOHASH_PRECISION, 0, -1):
+            height, width = cell_size(candidate)
+            if height >= radius_lat and width >= radius_lon:
+                precision = candidate
+                break
+    if precision is None:
+        return _band_prefixes(max(latitude - radius_lat, -90.0), min(latitude + radius_lat, 90.0))
+    height, width = cell_size(precision)
+    prefixes = set()
+    for d_lat in (-height, 0.0, height):
+        lat = latitude + d_lat
+        if not -90.0 <= lat <= 90.0:
+            continue
+        for d_lon in (-width, 0.0, width):
+            lon = (longitude + d_lon + 180.0) % 360.0 - 180.0
+            prefixes.add(encode_geohash(lat, lon, precision))
+    return sorted(prefixes)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    d_lat, d_lon = radians(lat2 - lat1), radians(lon2 - lon1)
+    a = sin(d_lat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(d_lon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(sqrt(a))
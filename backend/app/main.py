@@ -1,11 +1,21 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from logging import INFO, basicConfig, getLogger
 from typing import AsyncGenerator
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
-from app.db.db_setup import create_db_and_tables
-from app.routers import product, music, place, person, entity
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.counters import flush_listens_periodically, get_listen_counter
+from app.crud.peaks import shutdown_peaks_pool
+from app.db.db_setup import create_db_and_tables, get_engine
+from app.metrics import get_request_metrics
+from app.middleware import MetricsMiddleware, QueryStatsMiddleware
+from app.routers import product, music, place, person, entity, playlist, track, event, export, search, system, metrics
+from app.startup import get_startup_profile
 
 logger = getLogger(__name__)
 basicConfig(level=INFO)
@@ -14,20 +24,51 @@ basicConfig(level=INFO)
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info("Starting up...")
-    create_db_and_tables()
+    settings, profile = get_settings(), get_startup_profile()
+    with profile.phase("schema"):
+        profile.schema_created = create_db_and_tables(fast=settings["FAST_START"])
+    flusher = asyncio.create_task(flush_listens_periodically(get_engine(), settings["LISTEN_FLUSH_INTERVAL"]))
+    profile.ready()
+    logger.info(
+        "Ready %s, schema %s", profile.summary(), "created or updated" if profile.schema_created else "up to date"
+    )
     yield
     logger.info("Shutting down...")
+    flusher.cancel()
+    with suppress(asyncio.CancelledError):
+        await flusher
+    # Dernière écriture des écoutes en attente (attend un flush éventuellement en cours)
+    await run_in_threadpool(get_listen_counter().flush, get_engine())
+    shutdown_peaks_pool()
     logger.info("Finished shutting down.")
 
 
 def get_app() -> FastAPI:
-    app = FastAPI(title="FastAPI Snd", lifespan=lifespan)
+    # orjson pour toutes les réponses encore sérialisées par FastAPI (dict, schémas de lecture)
+    app = FastAPI(title="FastAPI Snd", lifespan=lifespan, default_response_class=ORJSONResponse)
+    settings = get_settings()
+    if settings["QUERY_STATS"]:
+        app.add_middleware(
+            QueryStatsMiddleware, budget=settings["QUERY_BUDGET"], strict=settings["QUERY_BUDGET_STRICT"]
+        )
+    if settings["METRICS"]:
+        # Ajouté en dernier, donc le plus à l'extérieur : la latence inclut les autres middlewares
+        app.add_middleware(MetricsMiddleware, metrics=get_request_metrics())
     app.include_router(product.router)
     app.include_router(music.router)
     app.include_router(place.router)
     app.include_router(person.router)
     app.include_router(entity.router)
+    app.include_router(playlist.router)
+    app.include_router(track.router)
+    app.include_router(event.router)
+    app.include_router(export.router)
+    app.include_router(search.router)
+    app.include_router(system.router)
+    if settings["METRICS"]:
+        app.include_router(metrics.router)
     return app
 
 
-app = get_app()
+with get_startup_profile().phase("app"):
+    app = get_app()
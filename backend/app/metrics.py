@@ -0,0 +1,157 @@
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Any, Iterable
+
+from anyio import to_thread
+
+from app.cache import get_cache
+from app.crud.peaks import get_peaks_files
+from app.db.db_setup import get_pool_stats
+from app.timeline import get_timelines
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bornes supérieures (en secondes) des buckets de latence des requêtes HTTP
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Label des requêtes sans route (404) : le chemin brut ferait exploser le nombre de séries
+UNMATCHED_ROUTE = "unmatched"
+
+
+class Histogram:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # dernier bucket : +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+
+
+class RequestMetrics:
+    """
+    In-flight requests and latency histograms per (method, route, status),
+    fed by app.middleware.MetricsMiddleware. Only updated from the event
+    loop, so no lock is needed.
+    """
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.latency: dict[tuple[str, str, int], Histogram] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route, status)
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram()
+        histogram.observe(seconds)
+
+
+@lru_cache()
+def get_request_metrics() -> RequestMetrics:
+    return RequestMetrics()
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _value(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def _sample(name: str, value: float, **labels: Any) -> str:
+    if labels:
+        name += "{" + ",".join(f'{key}="{_escape(label)}"' for key, label in labels.items()) + "}"
+    return f"{name} {_value(value)}"
+
+
+def _family(lines: list[str], name: str, kind: str, help: str, samples: Iterable[str]) -> None:
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} {kind}")
+    lines.extend(samples)
+
+
+def _histogram(name: str, buckets: Iterable[tuple[str, int]], total: float, **labels: Any) -> list[str]:
+    # `buckets` : (borne, nombre cumulé), la dernière étant +Inf
+    samples, count = [], 0
+    for bound, count in buckets:
+        samples.append(_sample(f"{name}_bucket", count, **labels, le=bound))
+    samples.append(_sample(f"{name}_sum", total, **labels))
+    samples.append(_sample(f"{name}_count", count, **labels))
+    return samples
+
+
+def _request_samples(metrics: RequestMetrics) -> list[str]:
+    samples = []
+    # Copie : le rendu peut croiser une nouvelle série créée par une autre requête
+    for (method, route, status), histogram in list(metrics.latency.items()):
+        cumulative, buckets = 0, []
+        for bound, count in zip((*map(str, LATENCY_BUCKETS), "+Inf"), histogram.counts):
+            cumulative += count
+            buckets.append((bound, cumulative))
+        samples += _histogram(
+            "snd_http_request_duration_seconds", buckets, histogram.sum, method=method, route=route, status=status
+        )
+    return samples
+
+
+def render_metrics() -> str:
+    """
+    All metrics in the Prometheus text format. Must be called from the event
+    loop (reads the anyio default thread limiter). Values are per process:
+    with several workers, Prometheus sees the worker that answered the scrape.
+    """
+    lines: list[str] = []
+    requests = get_request_metrics()
+    _family(lines, "snd_http_requests_in_flight", "gauge", "HTTP requests being processed.",
+            [_sample("snd_http_requests_in_flight", requests.in_flight)])
+    _family(lines, "snd_http_request_duration_seconds", "histogram",
+            "HTTP request latency until the response is fully sent, by route template and status.",
+            _request_samples(requests))
+
+    # Threadpool anyio : handlers synchrones, CRUD sans DB_ASYNC, fichiers
+    limiter = to_thread.current_default_thread_limiter()
+    _family(lines, "snd_threadpool_threads_busy", "gauge", "Threads of the anyio threadpool running a task.",
+            [_sample("snd_threadpool_threads_busy", limiter.borrowed_tokens)])
+    _family(lines, "snd_threadpool_threads_max", "gauge", "Size limit of the anyio threadpool.",
+            [_sample("snd_threadpool_threads_max", limiter.total_tokens)])
+    _family(lines, "snd_threadpool_tasks_waiting", "gauge", "Tasks waiting for a thread of the anyio threadpool.",
+            [_sample("snd_threadpool_tasks_waiting", limiter.statistics().tasks_waiting)])
+
+    pools = get_pool_stats()
+    _family(lines, "snd_db_pool_checkouts_total", "counter", "Database connections checked out of the pool.",
+            [_sample("snd_db_pool_checkouts_total", stats["checkouts"], pool=pool) for pool, stats in pools.items()])
+    _family(lines, "snd_db_pool_checkout_timeouts_total", "counter", "Checkouts that gave up after pool_timeout.",
+            [_sample("snd_db_pool_checkout_timeouts_total", stats["timeouts"], pool=pool) for pool, stats in pools.items()])
+    _family(lines, "snd_db_pool_checkout_wait_seconds", "histogram", "Time spent waiting for a pooled connection.",
+            [sample for pool, stats in pools.items() for sample in _histogram(
+                "snd_db_pool_checkout_wait_seconds", stats["wait_seconds_buckets"].items(),
+                stats["wait_seconds_sum"], pool=pool)])
+    # Pools absents avec SQLite en mémoire (pool non configurable)
+    _family(lines, "snd_db_pool_connections", "gauge", "Pooled connections by state.",
+            # overflow() est négatif tant que le pool n'a pas ouvert pool_size connexions
+            [_sample("snd_db_pool_connections", max(stats[state], 0), pool=pool, state=state)
+             for pool, stats in pools.items() if "size" in stats
+             for state in ("checked_out", "checked_in", "overflow")])
+    _family(lines, "snd_db_pool_size", "gauge", "Configured pool size (without overflow).",
+            [_sample("snd_db_pool_size", stats["size"], pool=pool) for pool, stats in pools.items() if "size" in stats])
+
+    lookups, timelines, peaks_files = get_cache(), get_timelines(), get_peaks_files()
+    caches = {"lookup": lookups, "timeline": timelines, "peaks_files": peaks_files}
+    if not lookups.enabled:
+        del caches["lookup"]
+    _family(lines, "snd_cache_hits_total", "counter", "Cache lookups answered from the cache.",
+            [_sample("snd_cache_hits_total", cache.hits, cache=name) for name, cache in caches.items()])
+    _family(lines, "snd_cache_misses_total", "counter", "Cache lookups that had to load the value.",
+            [_sample("snd_cache_misses_total", cache.misses, cache=name) for name, cache in caches.items()])
+    _family(lines, "snd_cache_hit_ratio", "gauge", "Hits over lookups since startup (NaN before the first lookup).",
+            [_sample("snd_cache_hit_ratio", cache.hits / (cache.hits + cache.misses) if cache.hits + cache.misses else float("nan"),
+                     cache=name) for name, cache in caches.items()])
+    return "\n".join(lines) + "\n"
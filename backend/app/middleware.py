@@ -0,0 +1,104 @@
+from logging import DEBUG, WARNING, getLogger
+from time import perf_counter
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.query_stats import QueryStats, current_query_stats
+from app.metrics import UNMATCHED_ROUTE, RequestMetrics
+
+log = getLogger(__name__)
+
+
+def route_path(scope: Scope) -> str:
+    # Le modèle de la route (/entities/{entity_id}) plutôt que le chemin, une fois la route trouvée
+    route = scope.get("route")
+    return getattr(route, "path", scope["path"])
+
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware giving each HTTP request its own QueryStats. Adds a
+    Server-Timing header (queries run before the response starts; a streamed
+    body's queries only reach the log) and logs the totals at the end: at
+    DEBUG, or WARNING when the request went over its query budget.
+    """
+
+    def __init__(self, app: ASGIApp, budget: int | None = None, strict: bool = False) -> None:
+        self.app = app
+        self.budget = budget
+        self.strict = strict
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(budget=self.budget, strict=self.strict)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        token = current_query_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            stats.active = False
+            level = WARNING if stats.over_budget else DEBUG
+            if log.isEnabledFor(level):
+                log.log(
+                    level,
+                    "%s %s: %d queries (budget %s, %d refused), %.1f ms in the database, slowest %.1f ms",
+                    scope["method"], route_path(scope), stats.count + stats.refused, stats.budget, stats.refused,
+                    stats.duration * 1000, stats.slowest * 1000,
+                    extra={
+                        "method": scope["method"],
+                        "route": route_path(scope),
+                        "query_count": stats.count + stats.refused,
+                        "query_refused": stats.refused,
+                        "query_budget": stats.budget,
+                        "db_ms": stats.duration * 1000,
+                        "slowest_ms": stats.slowest * 1000,
+                        "slowest_statement": stats.slowest_statement,
+                    },
+                )
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording each HTTP request into RequestMetrics:
+    in-flight count and latency by method, route template and status. A
+    request that raised before responding is counted as a 500.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics = self.metrics
+        metrics.in_flight += 1
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.in_flight -= 1
+            route = scope.get("route")
+            metrics.observe(
+                scope["method"], route.path if route is not None else UNMATCHED_ROUTE, status, perf_counter() - start
+            )
@@ -0,0 +1,14 @@
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class BulkItemError(BaseModel):
+    index: int  # Position de l'élément dans le tableau envoyé
+    detail: Any
+
+
+class BulkResult(BaseModel):
+    # Même longueur et même ordre que le tableau envoyé, None pour les éléments rejetés
+    ids: list[int | None]
+    errors: list[BulkItemError] = []
@@ -1,9 +1,11 @@
+from datetime import datetime
 from typing import TYPE_CHECKING, List
 from sqlmodel import Field, SQLModel, Relationship
 from pydantic import EmailStr
 
 # Importer PersonEntityLink directement
 from .person import PersonBase, PersonEntityLink 
+from .versioning import updated_at_field
 
 if TYPE_CHECKING:
     from .person import Person # Garder Person sous TYPE_CHECKING pour la List["Person"]
@@ -16,11 +18,14 @@ class EntityBase(SQLModel):
 
 class Entity(EntityBase, table=True):
     id: int | None = Field(default=None, primary_key=True)
+    # Aussi mis à jour quand les liens de l'entité changent (validateur ETag de /entities/{id})
+    updated_at: datetime = updated_at_field()
 
+    # Pas de chargement automatique : les endpoints qui renvoient les personnes
+    # (EntityReadWithPersons) les chargent explicitement avec selectinload
     persons: List["Person"] = Relationship(
         back_populates="entities", 
         link_model=PersonEntityLink, # Utiliser la classe importée directement
-        sa_relationship_kwargs={"lazy": "selectin"}
     )
 
 class EntityCreate(EntityBase):
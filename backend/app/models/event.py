@@ -1,18 +1,25 @@
-from datetime import datetime
+from datetime import datetime, timezone
+from enum import Enum
+
+from pydantic import field_validator
 from sqlmodel import Field, SQLModel
-from typing import TYPE_CHECKING
 
-if TYPE_CHECKING:
-    from .place import Place
-    from .playlist import Playlist
-    from .entity import Entity
+
+def naive_utc(value: datetime | None) -> datetime | None:
+    # Même convention que updated_at : UTC sans fuseau en base
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
 
 class EventBase(SQLModel):
     name: str = Field(index=True)
-    happened_on: datetime = Field(index=True)
-    place: Place = Field(foreign_key="place.id")
-    playlist: Playlist = Field(foreign_key="playlist.id")
-    entity: Entity = Field(foreign_key="entity.id")
+    happened_on: datetime = Field(index=True)  # UTC
+    place_id: int | None = Field(default=None, foreign_key="place.id", index=True)
+    playlist_id: int | None = Field(default=None, foreign_key="playlist.id", index=True)
+    entity_id: int | None = Field(default=None, foreign_key="entity.id", index=True)
+
+    _naive_utc = field_validator("happened_on")(naive_utc)
 
 class Event(EventBase, table=True):
     id: int | None = Field(default=None, primary_key=True)
@@ -23,6 +30,57 @@ class EventCreate(EventBase):
 class EventUpdate(SQLModel):
     name: str | None = None
     happened_on: datetime | None = None
-    place: Place | None = None
-    playlist: Playlist | None = None
-    entity: Entity | None = None
\ No newline at end of file
+    place_id: int | None = None
+    playlist_id: int | None = None
+    entity_id: int | None = None
+
+    _naive_utc = field_validator("happened_on")(naive_utc)
+
+
+class PlaceReadInner(SQLModel):
+    id: int
+    name: str
+    city: str
+
+class PlaylistReadInner(SQLModel):
+    id: int
+    name: str
+
+class EntityReadInner(SQLModel):
+    id: int
+    name: str
+
+class EventReadWithDetails(EventBase):
+    id: int
+    place: PlaceReadInner | None = None
+    playlist: PlaylistReadInner | None = None
+    entity: EntityReadInner | None = None
+
+
+class Granularity(str, Enum):
+    hour = "hour"
+    day = "day"
+    month = "month"
+
+class EventRollup(SQLModel, table=True):
+    """
+    Number of events per bucket and per (place, playlist, entity), kept up to
+    date in the same transaction as every event write. 0 stands for "none"
+    in the dimensions: NULL would never conflict in the upsert.
+    """
+    __tablename__ = "event_rollup"
+
+    granularity: Granularity = Field(primary_key=True)
+    bucket_start: datetime = Field(primary_key=True)
+    place_id: int = Field(default=0, primary_key=True)
+    playlist_id: int = Field(default=0, primary_key=True)
+    entity_id: int = Field(default=0, primary_key=True)
+    count: int = Field(default=0)
+
+class HistogramBucket(SQLModel):
+    bucket_start: datetime
+    count: int
+
+class Histogram(SQLModel):
+    granularity: Granularity
+    buckets: list[HistogramBucket]
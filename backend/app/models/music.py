@@ -1,5 +1,9 @@
+from datetime import datetime
+
 from sqlmodel import Field, SQLModel
 
+from .versioning import updated_at_field
+
 class MusicBase(SQLModel):
     title: str = Field(index=True)
     artist: str = Field(index=True)
@@ -7,6 +11,7 @@ class MusicBase(SQLModel):
 
 class Music(MusicBase, table=True):
     id: int | None = Field(default=None, primary_key=True)
+    updated_at: datetime = updated_at_field()
 
 class MusicCreate(MusicBase):
     pass
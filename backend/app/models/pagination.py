@@ -0,0 +1,11 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    # Curseur opaque à renvoyer tel quel pour obtenir la page suivante (None : dernière page)
+    next_cursor: str | None = None
@@ -1,7 +1,10 @@
+from datetime import datetime
 from typing import TYPE_CHECKING, List
 from sqlmodel import Field, SQLModel, Relationship
 from pydantic import EmailStr
 
+from .versioning import updated_at_field
+
 if TYPE_CHECKING:
     from .entity import Entity
 
@@ -16,6 +19,13 @@ class PersonEntityLink(SQLModel, table=True):
     # You can add extra data to the relationship here if needed
     # For example: role_in_entity: str | None = None
 
+# Bulk link/unlink: ids of the persons (or entities) to attach or detach
+class PersonEntityLinkIds(SQLModel):
+    ids: List[int] = Field(max_length=100000)
+
+class PersonEntityLinkResult(SQLModel):
+    count: int  # Number of links actually created or removed
+
 
 class PersonBase(SQLModel):
     firstname: str = Field(index=True)
@@ -25,12 +35,14 @@ class PersonBase(SQLModel):
 
 class Person(PersonBase, table=True):
     id: int | None = Field(default=None, primary_key=True)
+    # Aussi mis à jour quand les liens de la personne changent (validateur ETag de /persons/{id})
+    updated_at: datetime = updated_at_field()
     # entity: "Entity" | None = Relationship(back_populates="persons")
 
+    # Chargées explicitement (selectinload) par les endpoints PersonReadWithEntities
     entities: List["Entity"] = Relationship(
         back_populates="persons", 
         link_model=PersonEntityLink,
-        sa_relationship_kwargs={"lazy": "selectin"}
     )
 
 class PersonCreate(PersonBase):
@@ -1,17 +1,39 @@
+from datetime import datetime
+
+from pydantic import computed_field
 from sqlmodel import Field, SQLModel
 
+from app.geo import encode_geohash
+
+from .versioning import updated_at_field
+
+
+def place_geohash(latitude: float | None, longitude: float | None) -> str | None:
+    if latitude is None or longitude is None:
+        return None
+    return encode_geohash(latitude, longitude)
+
 class PlaceBase(SQLModel):
-    name: str = Field(index=True)
+    name: str = Field(index=True, unique=True)  # Clé des upserts (ON CONFLICT (name))
     address: str = Field()
     zip_code: int = Field()
     city: str = Field(index=True)
     country: str = Field(index=True)
+    latitude: float | None = Field(default=None, ge=-90, le=90)
+    longitude: float | None = Field(default=None, ge=-180, le=180)
 
 class Place(PlaceBase, table=True):
     id: int | None = Field(default=None, primary_key=True)
+    updated_at: datetime = updated_at_field()
+    # Dérivé de latitude/longitude : les lieux proches partagent un préfixe (index b-tree)
+    geohash: str | None = Field(default=None, index=True)
 
 class PlaceCreate(PlaceBase):
-    pass
+    # Calculé ici pour que post_place et l'insertion en masse le renseignent
+    @computed_field
+    @property
+    def geohash(self) -> str | None:
+        return place_geohash(self.latitude, self.longitude)
 
 class PlaceUpdate(SQLModel):  # Tous les champs sont optionnels pour une mise à jour
     name: str | None = None
@@ -19,3 +41,9 @@ class PlaceUpdate(SQLModel):  # Tous les champs sont optionnels pour une mise à
     zip_code: int | None = None
     city: str | None = None
     country: str | None = None
+    latitude: float | None = Field(default=None, ge=-90, le=90)
+    longitude: float | None = Field(default=None, ge=-180, le=180)
+
+class PlaceNearby(PlaceBase):
+    id: int
+    distance_km: float
@@ -1,10 +1,12 @@
+from enum import Enum
+
 from sqlmodel import Field, SQLModel
 
 class PlaylistBase(SQLModel):
    name: str = Field(index=True)
-   filename: str  = Field()
-   peaksfile: str = Field() 
-   count_listen : int = Field()
+   filename: str  = Field()  # Relatif à MEDIA_ROOT
+   peaksfile: str | None = Field(default=None)  # Renseigné par POST /playlists/{id}/peaks
+   count_listen : int = Field(default=0)
 
 class Playlist(PlaylistBase, table=True): 
     id: int | None = Field(default=None, primary_key=True)
@@ -16,4 +18,19 @@ class PlaylistUpdate(SQLModel):
     name: str | None = None
     filename: str | None = None
     peaksfile: str | None = None
-    count_listen: int | None = None
\ No newline at end of file
+    count_listen: int | None = None
+
+class PeaksFormat(str, Enum):
+    binary = "binary"  # Paires (min, max) int16 little-endian
+    json = "json"
+
+class PeaksJobStatus(str, Enum):
+    pending = "pending"
+    done = "done"
+    failed = "failed"
+
+class PeaksJob(SQLModel):
+    playlist_id: int
+    status: PeaksJobStatus
+    peaksfile: str | None = None
+    error: str | None = None
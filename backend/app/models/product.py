@@ -1,8 +1,13 @@
+from datetime import datetime
+
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
+from .versioning import updated_at_field
+
 
 class ProductBase(SQLModel):
-    name: str = Field(index=True)
+    name: str = Field(index=True)  # Unique parmi les produits non supprimés : voir ix_product_name_live
     description: str | None = Field(default=None)
     price: float | None = Field(default=None)
     in_stock: bool = Field(default=False)
@@ -10,7 +15,22 @@ class ProductBase(SQLModel):
 
 
 class Product(ProductBase, table=True):
+    # Pagination par curseur sur les produits non supprimés : WHERE is_deleted = false AND id > :after ORDER BY id
+    __table_args__ = (Index("ix_product_is_deleted_id", "is_deleted", "id"),)
+
     id: int | None = Field(default=None, primary_key=True)
+    updated_at: datetime = updated_at_field()
+
+
+# Clé des upserts (ON CONFLICT (name) WHERE NOT is_deleted). Partiel : un produit
+# supprimé (soft delete) libère son nom, qui peut être recréé
+Index(
+    "ix_product_name_live",
+    Product.name,
+    unique=True,
+    postgresql_where=~Product.is_deleted,
+    sqlite_where=~Product.is_deleted,
+)
 
 
 class ProductCreate(ProductBase):
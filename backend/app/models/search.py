@@ -0,0 +1,23 @@
+from enum import Enum
+
+from sqlmodel import SQLModel
+
+
+class SearchType(str, Enum):
+    music = "music"
+    place = "place"
+    person = "person"
+
+
+class SearchHit(SQLModel):
+    type: SearchType
+    id: int
+    label: str
+    score: float  # Plus grand = plus pertinent, comparable seulement pour un même backend
+
+
+class SearchResults(SQLModel):
+    query: str
+    hits: list[SearchHit]
+    # True si le budget de latence a été dépassé : résultats partiels
+    partial: bool = False
@@ -1,6 +1,8 @@
 from sqlmodel import Field, SQLModel, Relationship
 from datetime import timedelta
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Optional
+
+from pydantic import model_validator
 
 if TYPE_CHECKING:
     from .music import Music
@@ -10,16 +12,20 @@ if TYPE_CHECKING:
 class TrackBase(SQLModel):
     music_id: int | None = Field(default=None, foreign_key="music.id", index=True)
     playlist_id: int | None = Field(default=None, foreign_key="playlist.id", index=True)
-    start_time: timedelta = Field(default=timedelta(timedelta(0)))
-    end_time: timedelta | None = None
+    start_time: timedelta = Field(default=timedelta(0))
+    end_time: timedelta | None = None  # None : jusqu'à la fin de la playlist
 
 class Track(TrackBase, table=True):
     id: int | None = Field(default=None, primary_key=True)
-    music: "Music" | None = Relationship(back_populates="playlist_tracks")
-    playlist: "Playlist" | None = Relationship(back_populates="tracks")
+    # Pas de chargement automatique : GET /tracks/{id} les charge avec selectinload
+    music: Optional["Music"] = Relationship()
+    playlist: Optional["Playlist"] = Relationship()
 
 class TrackCreate(TrackBase):
-    pass
+    @model_validator(mode="after")
+    def check_times(self) -> "TrackCreate":
+        check_track_times(self.start_time, self.end_time)
+        return self
 
 class TrackUpdate(SQLModel):
     music_id: int | None = None
@@ -40,4 +46,11 @@ class PlaylistReadInner(SQLModel):
 
 class TrackReadWithDetails(TrackRead):
     music: MusicReadInner | None = None
-    playlist: PlaylistReadInner | None = None
\ No newline at end of file
+    playlist: PlaylistReadInner | None = None
+
+
+def check_track_times(start_time: timedelta, end_time: timedelta | None) -> None:
+    if start_time < timedelta(0):
+        raise ValueError("start_time must not be negative")
+    if end_time is not None and end_time <= start_time:
+        raise ValueError("end_time must be after start_time")
@@ -0,0 +1,21 @@
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlmodel import Field
+
+
+def utcnow() -> datetime:
+    # Naïf en UTC : même représentation sur PostgreSQL (timestamp) et SQLite
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def updated_at_field() -> Any:
+    """
+    `updated_at` column, set on insert (ORM and Core) and bumped by every UPDATE.
+    Indexed so that max(updated_at) used as collection validator is an index lookup.
+    """
+    return Field(
+        default_factory=utcnow,
+        index=True,
+        sa_column_kwargs={"default": utcnow, "onupdate": utcnow},
+    )
@@ -0,0 +1,233 @@
+import math
+import mmap
+import os
+import struct
+import subprocess
+import wave
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Iterator
+
+import numpy as np
+
+# Format du fichier de peaks (little-endian) :
+#   en-tête    : magic, sample_rate, nombre de niveaux
+#   par niveau : samples_per_peak, nombre de peaks, offset (octets) des données
+#   données    : pour chaque niveau, `count` paires (min, max) en int16
+# Chaque niveau regroupe deux peaks du précédent : le fichier fait environ
+# deux fois la taille du niveau le plus fin.
+MAGIC = b"SNDPEAK1"
+HEADER = struct.Struct("<8sIH")
+LEVEL = struct.Struct("<IQQ")
+PEAK_DTYPE = np.dtype("<i2")
+
+# ffmpeg décode les formats non-WAV en mono 16 bits à cette fréquence
+FFMPEG_SAMPLE_RATE = 44100
+
+
+class PeaksError(Exception):
+    pass
+
+
+def _wav_chunks(wav: wave.Wave_read, chunk_frames: int) -> Iterator[np.ndarray]:
+    channels, width = wav.getnchannels(), wav.getsampwidth()
+    try:
+        while data := wav.readframes(chunk_frames):
+            raw = np.frombuffer(data, dtype=np.uint8)
+            # Tout est ramené en int16 : la précision de l'affichage ne justifie pas plus
+            if width == 1:
+                samples = ((raw.astype(np.int16) - 128) << 8).astype(np.int16)
+            elif width == 2:
+                samples = raw.view("<i2")
+            elif width == 3:
+                samples = raw.reshape(-1, 3)[:, 1:].copy().view("<i2").ravel()
+            else:
+                samples = (raw.view("<i4") >> 16).astype(np.int16)
+            yield samples.reshape(-1, channels)
+    finally:
+        wav.close()
+
+
+def _ffmpeg_chunks(path: Path, chunk_frames: int) -> Iterator[np.ndarray]:
+    command = [
+        "ffmpeg", "-v", "error", "-nostdin", "-i", str(path),
+        "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(FFMPEG_SAMPLE_RATE), "-",
+    ]
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        raise PeaksError("ffmpeg is required to decode non-WAV files") from None
+    assert process.stdout is not None and process.stderr is not None
+    try:
+        while data := process.stdout.read(chunk_frames * 2):
+            yield np.frombuffer(data, dtype="<i2", count=len(data) // 2).reshape(-1, 1)
+    finally:
+        process.stdout.close()
+        # stderr n'est lu qu'à la fin : "-v error" le garde petit, pas de blocage du pipe
+        error = process.stderr.read().decode(errors="replace").strip()
+        process.stderr.close()
+        if process.wait() != 0:
+            raise PeaksError(f"ffmpeg failed on {path.name}: {error}")
+
+
+def decode(path: Path, chunk_frames: int) -> tuple[int, Iterator[np.ndarray]]:
+    """
+    Return the sample rate and an iterator of int16 chunks of shape
+    (frames, channels). PCM WAV is read directly, anything else goes
+    through ffmpeg. Only one chunk is in memory at a time.
+    """
+    if path.suffix.lower() == ".wav":
+        try:
+            wav = wave.open(str(path), "rb")
+        except (wave.Error, EOFError):
+            pass  # WAV non PCM (float, extensible...) : ffmpeg sait le lire
+        else:
+            return wav.getframerate(), _wav_chunks(wav, chunk_frames)
+    return FFMPEG_SAMPLE_RATE, _ffmpeg_chunks(path, chunk_frames)
+
+
+def _block_peaks(frames: np.ndarray, samples_per_peak: int) -> np.ndarray:
+    # Un bloc = samples_per_peak frames, toutes voies confondues
+    blocks = frames.reshape(-1, samples_per_peak * frames.shape[1])
+    return np.stack((blocks.min(axis=1), blocks.max(axis=1)), axis=1)
+
+
+def compute_base_peaks(chunks: Iterator[np.ndarray], samples_per_peak: int) -> np.ndarray:
+    """
+    (min, max) of every `samples_per_peak` frames, as an int16 array of shape
+    (n, 2). Memory holds one decoded chunk plus the peaks themselves, i.e.
+    1/samples_per_peak of the signal.
+    """
+    parts, pending = [], None
+    for chunk in chunks:
+        if pending is not None:
+            chunk = np.concatenate((pending, chunk))
+        whole = len(chunk) // samples_per_peak * samples_per_peak
+        if whole:
+            parts.append(_block_peaks(chunk[:whole], samples_per_peak))
+        pending = chunk[whole:] if whole < len(chunk) else None
+    if pending is not None:
+        # Dernier bloc incomplet
+        parts.append(_block_peaks(pending, len(pending)))
+    if not parts:
+        return np.zeros((0, 2), dtype=PEAK_DTYPE)
+    return np.concatenate(parts).astype(PEAK_DTYPE, copy=False)
+
+
+def build_pyramid(base: np.ndarray) -> list[np.ndarray]:
+    """
+    Halve the resolution until a single peak is left: each level takes the
+    min of mins and the max of maxes of consecutive pairs of the previous one.
+    """
+    levels = [base]
+    while len(levels[-1]) > 1:
+        previous = levels[-1]
+        if len(previous) % 2:
+            previous = np.concatenate((previous, previous[-1:]))
+        pairs = previous.reshape(-1, 2, 2)
+        levels.append(np.stack((pairs[:, :, 0].min(axis=1), pairs[:, :, 1].max(axis=1)), axis=1))
+    return levels
+
+
+def write_peaks(path: Path, sample_rate: int, samples_per_peak: int, levels: list[np.ndarray]) -> None:
+    """
+    Write the pyramid atomically (temporary file + rename), so readers never
+    see a half-written file.
+    """
+    offset = HEADER.size + LEVEL.size * len(levels)
+    table = []
+    for index, level in enumerate(levels):
+        table.append(LEVEL.pack(samples_per_peak << index, len(level), offset))
+        offset += level.nbytes
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "wb") as file:
+        file.write(HEADER.pack(MAGIC, sample_rate, len(levels)))
+        file.write(b"".join(table))
+        for level in levels:
+            file.write(np.ascontiguousarray(level, dtype=PEAK_DTYPE).tobytes())
+    os.replace(temporary, path)
+
+
+def generate_peaks(source: str, target: str, samples_per_peak: int, chunk_frames: int) -> dict[str, Any]:
+    """
+    Decode `source` in chunks and write its peaks pyramid to `target`.
+    Runs in a worker process (see app.crud.peaks): arguments and result are
+    plain picklable values.
+    """
+    sample_rate, chunks = decode(Path(source), chunk_frames)
+    base = compute_base_peaks(chunks, samples_per_peak)
+    levels = build_pyramid(base)
+    write_peaks(Path(target), sample_rate, samples_per_peak, levels)
+    return {"sample_rate": sample_rate, "peaks": len(base), "levels": len(levels)}
+
+
+class PeaksFile:
+    """
+    Memory-mapped peaks file. Levels are NumPy views on the mapping: slicing
+    one reads only the pages it touches, nothing is parsed or copied upfront.
+    """
+
+    def __init__(self, path: Path) -> None:
+        with open(path, "rb") as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.sample_rate, count = HEADER.unpack_from(self.mmap)
+        if magic != MAGIC:
+            raise PeaksError(f"{path.name} is not a peaks file")
+        self.samples_per_peak: list[int] = []
+        self.levels: list[np.ndarray] = []
+        for index in range(count):
+            samples_per_peak, peaks, offset = LEVEL.unpack_from(self.mmap, HEADER.size + index * LEVEL.size)
+            self.samples_per_peak.append(samples_per_peak)
+            self.levels.append(np.frombuffer(self.mmap, PEAK_DTYPE, peaks * 2, offset).reshape(-1, 2))
+
+    def nearest_level(self, samples_per_peak: float) -> int:
+        # Plus proche en échelle logarithmique : les niveaux doublent à chaque fois
+        target = math.log2(max(samples_per_peak, 1) / self.samples_per_peak[0])
+        return min(max(round(target), 0), len(self.levels) - 1)
+
+    def slice(self, level: int, start: float, end: float | None) -> tuple[int, np.ndarray]:
+        """
+        Peaks of `level` covering [start, end) seconds: index of the first
+        peak and a view of the (min, max) pairs.
+        """
+        samples_per_peak, peaks = self.samples_per_peak[level], self.levels[level]
+        first = min(int(start * self.sample_rate // samples_per_peak), len(peaks))
+        last = len(peaks) if end is None else math.ceil(end * self.sample_rate / samples_per_peak)
+        return first, peaks[first:max(first, min(last, len(peaks)))]
+
+
+class PeaksFileCache:
+    """
+    LRU of open PeaksFile, keyed by path and checked against the file's
+    mtime/size so that a regenerated file is mapped again.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._files: OrderedDict[Path, tuple[tuple[int, int], PeaksFile]] = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: Path) -> PeaksFile:
+        stat = path.stat()
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            # hits/misses restent dans ce bloc : le verrou les protège aussi
+            item = self._files.get(path)
+            if item and item[0] == version:
+                self._files.move_to_end(path)
+                self.hits += 1
+                return item[1]
+            self.misses += 1
+        peaks_file = PeaksFile(path)
+        with self._lock:
+            self._files[path] = (version, peaks_file)
+            self._files.move_to_end(path)
+            # Pas de close() explicite : des vues NumPy peuvent encore pointer sur le mapping,
+            # il est libéré avec la dernière référence
+            while len(self._files) > self.max_size:
+                self._files.popitem(last=False)
+        return peaks_file
@@ -0,0 +1,106 @@
+import os
+from secrets import token_hex
+from typing import Any, Mapping
+
+import anyio
+from fastapi import Response
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+from starlette.types import Receive, Scope, Send
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def model_json_response(
+    value: BaseModel,
+    status_code: int = 200,
+    headers: Mapping[str, str] | None = None,
+) -> Response:
+    """
+    Serialise a model instance with its own (Rust) serializer straight to bytes.
+
+    Returning a Response makes FastAPI skip the response_model validation and
+    jsonable_encoder passes, so the value must already be an instance of the
+    declared response_model (ORM rows of a table model, Page[Product], ...).
+    The route keeps its response_model for the OpenAPI schema.
+    """
+    return Response(value.model_dump_json(), status_code=status_code, headers=headers, media_type=JSON_MEDIA_TYPE)
+
+
+
+# Extension ASGI "zero-copy send" : le serveur transmet le fichier par sendfile()
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+
+class RangeFileResponse(FileResponse):
+    """
+    FileResponse (Range, If-Range, multi-range 206, bounded chunks read after
+    a seek, never from the start of the file) that hands single-range and
+    full bodies to the server as sendfile() when it supports the ASGI
+    zero-copy extension. Otherwise the body goes through `chunk_size` reads,
+    so memory per connection stays bounded either way.
+
+    Multi-range responses are rewritten: Starlette 0.46 puts the multipart
+    boundary in Content-Range instead of Content-Type and frames the parts
+    with bare LF, which clients cannot parse.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], chunk_size: int | None = None, **kwargs: Any) -> None:
+        super().__init__(path, **kwargs)
+        if chunk_size:
+            self.chunk_size = chunk_size
+        self.zerocopy = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.zerocopy = ZEROCOPY_EXTENSION in scope.get("extensions", {})
+        await super().__call__(scope, receive, send)
+
+    async def _send_file(self, send: Send, offset: int, count: int) -> None:
+        with open(self.path, "rb") as file:
+            await send({"type": ZEROCOPY_EXTENSION, "file": file, "offset": offset, "count": count, "more_body": False})
+
+    async def _handle_simple(self, send: Send, send_header_only: bool) -> None:
+        if not self.zerocopy or send_header_only:
+            return await super()._handle_simple(send, send_header_only)
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        await self._send_file(send, 0, int(self.headers["content-length"]))
+
+    async def _handle_single_range(
+        self, send: Send, start: int, end: int, file_size: int, send_header_only: bool
+    ) -> None:
+        if not self.zerocopy or send_header_only:
+            return await super()._handle_single_range(send, start, end, file_size, send_header_only)
+        self.headers["content-range"] = f"bytes {start}-{end - 1}/{file_size}"
+        self.headers["content-length"] = str(end - start)
+        await send({"type": "http.response.start", "status": 206, "headers": self.raw_headers})
+        await self._send_file(send, start, end - start)
+
+    async def _handle_multiple_ranges(
+        self, send: Send, ranges: list[tuple[int, int]], file_size: int, send_header_only: bool
+    ) -> None:
+        boundary = token_hex(13)
+        content_type = self.headers["content-type"]
+        part_headers = [
+            f"--{boundary}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Range: bytes {start}-{end - 1}/{file_size}\r\n\r\n".encode("latin-1")
+            for start, end in ranges
+        ]
+        closing = f"--{boundary}--\r\n".encode("latin-1")
+        # Chaque partie est suivie d'un CRLF avant la délimitation suivante
+        length = sum(len(head) + (end - start) + 2 for head, (start, end) in zip(part_headers, ranges)) + len(closing)
+        self.headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+        self.headers["content-length"] = str(length)
+        await send({"type": "http.response.start", "status": 206, "headers": self.raw_headers})
+        if send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            for head, (start, end) in zip(part_headers, ranges):
+                await send({"type": "http.response.body", "body": head, "more_body": True})
+                await file.seek(start)
+                while start < end:
+                    chunk = await file.read(min(self.chunk_size, end - start))
+                    start += len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                await send({"type": "http.response.body", "body": b"\r\n", "more_body": True})
+        await send({"type": "http.response.body", "body": closing, "more_body": False})
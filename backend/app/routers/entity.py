@@ -1,8 +1,14 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 
 from app.db.db_setup import get_session # Assurez-vous que ce chemin est correct
+from app.conditional import make_etag, not_modified, validator_headers
+from app.crud.aio import DbSession, run
+from app.dependencies import PageParams, bulk_chunk_size, bulk_items, page_params
+from app.models.bulk import BulkResult
+from app.models.pagination import Page
+from app.models.person import PersonEntityLinkIds, PersonEntityLinkResult
 from app.models.entity import (
     Entity, 
     EntityCreate, 
@@ -15,13 +21,17 @@ from app.models.entity import (
 
 from app.crud.entity import (
     create_entity,
+    create_entities,
     get_entity,
-    get_entity_by_name,
+    get_entity_version,
+    get_entity_by_name_cached,
     get_entities,
     update_entity,
     delete_entity,
     add_person_to_entity,
     remove_person_from_entity,
+    add_persons_to_entity,
+    remove_persons_from_entity,
 )
 
 router = APIRouter(
@@ -31,106 +41,154 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=EntityRead, status_code=status.HTTP_201_CREATED)
-def create_new_entity(
+async def create_new_entity(
     *, 
-    session: Session = Depends(get_session), 
+    session: DbSession = Depends(get_session), 
     entity_in: EntityCreate
 ) -> Entity:
     """
     Create new entity.
     """
-    return create_entity(session=session, entity_create=entity_in)
+    return await run(session, create_entity, entity_create=entity_in)
 
-@router.get("/", response_model=List[EntityRead])
-def read_all_entities(
-    session: Session = Depends(get_session),
-    skip: int = 0,
-    limit: int = 100
-) -> List[Entity]:
+@router.post("/bulk", response_model=BulkResult, status_code=status.HTTP_201_CREATED)
+async def create_new_entities(
+    entities: list[Any] = Depends(bulk_items),
+    chunk_size: int = Depends(bulk_chunk_size),
+    session: DbSession = Depends(get_session),
+) -> BulkResult:
+    """
+    Create many entities in one request, one multi-row INSERT per chunk.
+    Returns the new ids in input order and the errors of rejected items.
+    """
+    return await run(session, create_entities, entities=entities, chunk_size=chunk_size)
+
+@router.get("/", response_model=Page[EntityRead])
+async def read_all_entities(
+    session: DbSession = Depends(get_session),
+    page: PageParams = Depends(page_params),
+) -> Page[Entity]:
     """
     Retrieve all entities.
     """
-    return get_entities(session=session, skip=skip, limit=limit)
+    return await run(session, get_entities, after_id=page.after_id, limit=page.limit)
 
 @router.get("/{entity_id}", response_model=EntityReadWithPersons)
-def read_entity_by_id(
+async def read_entity_by_id(
     entity_id: int, 
-    session: Session = Depends(get_session)
-) -> Entity:
+    request: Request,
+    response: Response,
+    session: DbSession = Depends(get_session)
+) -> Entity | Response:
     """
     Get entity by ID, with its associated persons.
-    """
-    db_entity = get_entity(session=session, entity_id=entity_id)
+    Answers 304 to a matching If-None-Match without loading the persons.
+    """
+    version = await run(session, get_entity_version, entity_id=entity_id)
+    if version is not None:
+        etag = make_etag("entity", entity_id, *version)
+        if cached := not_modified(request, etag, version[0]):
+            return cached
+        response.headers.update(validator_headers(etag, version[0]))
+    db_entity = await run(session, get_entity, entity_id=entity_id)
     if not db_entity:
         raise HTTPException(status_code=404, detail="Entity not found")
     return db_entity
 
 @router.get("/by_name/{entity_name}", response_model=EntityReadWithPersons)
-def read_entity_by_name_route(
+async def read_entity_by_name_route(
     entity_name: str, 
-    session: Session = Depends(get_session)
-) -> Entity:
+    session: DbSession = Depends(get_session)
+) -> EntityReadWithPersons:
     """
     Get entity by name, with its associated persons.
     """
-    db_entity = get_entity_by_name(session=session, name=entity_name)
+    db_entity = await run(session, get_entity_by_name_cached, name=entity_name)
     if not db_entity:
         raise HTTPException(status_code=404, detail="Entity not found")
     return db_entity
 
 @router.patch("/{entity_id}", response_model=EntityRead)
-def update_existing_entity(
+async def update_existing_entity(
     entity_id: int, 
     entity_in: EntityUpdate, 
-    session: Session = Depends(get_session)
+    session: DbSession = Depends(get_session)
 ) -> Entity:
     """
     Update an entity.
     """
-    db_entity = update_entity(session=session, entity_id=entity_id, entity_update=entity_in)
+    db_entity = await run(session, update_entity, entity_id=entity_id, entity_update=entity_in)
     if not db_entity:
         raise HTTPException(status_code=404, detail="Entity not found")
     return db_entity
 
 @router.delete("/{entity_id}", status_code=status.HTTP_200_OK)
-def delete_existing_entity(
+async def delete_existing_entity(
     entity_id: int, 
-    session: Session = Depends(get_session)
+    session: DbSession = Depends(get_session)
 ) -> dict: # Retourne un message de confirmation
     """
     Delete an entity.
     """
-    deleted = delete_entity(session=session, entity_id=entity_id)
+    deleted = await run(session, delete_entity, entity_id=entity_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Entity not found")
     return {"message": "Entity deleted successfully"}
 
 @router.post("/{entity_id}/persons/{person_id}", response_model=EntityReadWithPersons)
-def link_person_to_entity(
+async def link_person_to_entity(
     entity_id: int,
     person_id: int,
-    session: Session = Depends(get_session)
+    session: DbSession = Depends(get_session)
 ) -> Entity:
     """
     Link a person to an entity.
     """
-    entity = add_person_to_entity(session=session, entity_id=entity_id, person_id=person_id)
+    entity = await run(session, add_person_to_entity, entity_id=entity_id, person_id=person_id)
     if not entity:
         # Le CRUD devrait être plus précis, mais pour l'instant, on suppose que l'un ou l'autre n'a pas été trouvé
         raise HTTPException(status_code=404, detail="Entity or Person not found, or already linked")
     return entity
 
 @router.delete("/{entity_id}/persons/{person_id}", response_model=EntityReadWithPersons)
-def unlink_person_from_entity(
+async def unlink_person_from_entity(
     entity_id: int,
     person_id: int,
-    session: Session = Depends(get_session)
+    session: DbSession = Depends(get_session)
 ) -> Entity:
     """
     Unlink a person from an entity.
     """
-    entity = remove_person_from_entity(session=session, entity_id=entity_id, person_id=person_id)
+    entity = await run(session, remove_person_from_entity, entity_id=entity_id, person_id=person_id)
     if not entity:
          # Le CRUD devrait être plus précis
         raise HTTPException(status_code=404, detail="Entity or Person not found, or not linked")
-    return entity 
\ No newline at end of file
+    return entity
+
+@router.post("/{entity_id}/persons", response_model=PersonEntityLinkResult)
+async def link_persons_to_entity(
+    entity_id: int,
+    persons: PersonEntityLinkIds,
+    session: DbSession = Depends(get_session)
+) -> PersonEntityLinkResult:
+    """
+    Link many persons to an entity. Already linked or unknown person ids are ignored.
+    """
+    count = await run(session, add_persons_to_entity, entity_id=entity_id, person_ids=persons.ids)
+    if count is None:
+        raise HTTPException(status_code=404, detail="Entity not found")
+    return PersonEntityLinkResult(count=count)
+
+@router.delete("/{entity_id}/persons", response_model=PersonEntityLinkResult)
+async def unlink_persons_from_entity(
+    entity_id: int,
+    persons: PersonEntityLinkIds,
+    session: DbSession = Depends(get_session)
+) -> PersonEntityLinkResult:
+    """
+    Unlink many persons from an entity.
+    """
+    count = await run(session, remove_persons_from_entity, entity_id=entity_id, person_ids=persons.ids)
+    if count is None:
+        raise HTTPException(status_code=404, detail="Entity not found")
+    return PersonEntityLinkResult(count=count)
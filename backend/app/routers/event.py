@@ -0,0 +1,106 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+from app.crud.aio import DbSession, run
+from app.crud.event import (
+    delete_event,
+    get_event,
+    get_events,
+    get_events_with_details,
+    get_histogram,
+    post_event,
+    update_event,
+)
+from app.db.db_setup import get_session
+from app.dependencies import PageParams, page_params
+from app.models.event import Event, EventCreate, EventReadWithDetails, EventUpdate, Granularity, Histogram
+from app.models.pagination import Page
+from app.responses import model_json_response
+
+router = APIRouter(
+    prefix="/events",
+    tags=["Events"],
+    responses={404: {"description": "Event not found"}},
+)
+
+@router.post("/", response_model=Event, status_code=201)
+async def create(event: EventCreate, session: DbSession = Depends(get_session)) -> Response:
+    return model_json_response(await run(session, post_event, event), status_code=201)
+
+@router.get("/", response_model=Page[Event])
+async def get_all(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    place_id: int | None = None,
+    playlist_id: int | None = None,
+    entity_id: int | None = None,
+    session: DbSession = Depends(get_session),
+    page: PageParams = Depends(page_params),
+) -> Response:
+    """
+    Events that happened in [start, end), optionally for one place, playlist
+    or entity.
+    """
+    events = await run(
+        session, get_events, start, end, place_id, playlist_id, entity_id,
+        after_id=page.after_id, limit=page.limit,
+    )
+    return model_json_response(events)
+
+@router.get("/details", response_model=Page[EventReadWithDetails])
+async def get_all_with_details(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    place_id: int | None = None,
+    playlist_id: int | None = None,
+    entity_id: int | None = None,
+    session: DbSession = Depends(get_session),
+    page: PageParams = Depends(page_params),
+) -> Response:
+    """
+    Same as GET /events/, each event with its place, playlist and entity.
+    Four queries per page: the events, then one per related type.
+    """
+    events = await run(
+        session, get_events_with_details, start, end, place_id, playlist_id, entity_id,
+        after_id=page.after_id, limit=page.limit,
+    )
+    return model_json_response(events)
+
+@router.get("/histogram", response_model=Histogram)
+async def histogram(
+    granularity: Granularity = Query(default=Granularity.day),
+    start: datetime | None = None,
+    end: datetime | None = None,
+    place_id: int | None = None,
+    playlist_id: int | None = None,
+    entity_id: int | None = None,
+    session: DbSession = Depends(get_session),
+) -> Response:
+    """
+    Number of events per hour, day or month, from the precomputed rollups.
+    """
+    result = await run(session, get_histogram, granularity, start, end, place_id, playlist_id, entity_id)
+    return model_json_response(result)
+
+@router.get("/{event_id}", response_model=Event)
+async def get_by_id(event_id: int, session: DbSession = Depends(get_session)) -> Response:
+    event = await run(session, get_event, event_id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return model_json_response(event)
+
+@router.patch("/{event_id}", response_model=Event)
+async def update(event_id: int, event_update: EventUpdate, session: DbSession = Depends(get_session)) -> Response:
+    event = await run(session, update_event, event_id, event_update)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return model_json_response(event)
+
+@router.delete("/{event_id}", response_model=Event)
+async def delete(event_id: int, session: DbSession = Depends(get_session)) -> Response:
+    event = await run(session, delete_event, event_id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return model_json_response(event)
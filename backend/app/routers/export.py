@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from app.config import get_settings
+from app.crud.export import (
+    MEDIA_TYPES,
+    ExportFormat,
+    ExportResource,
+    stream_export,
+    stream_export_async,
+)
+from app.db.db_setup import DB_ASYNC
+
+router = APIRouter(
+    prefix="/export",
+    tags=["Export"],
+)
+
+@router.get("/{resource}", response_class=StreamingResponse)
+async def export_resource(
+    resource: ExportResource,
+    format: ExportFormat = ExportFormat.ndjson,
+) -> StreamingResponse:
+    """
+    Stream a full dump of products, persons (with their entity ids), places or
+    musics as NDJSON (one object per line) or CSV.
+    """
+    chunk_size = get_settings()["EXPORT_CHUNK_SIZE"]
+    stream = stream_export_async if DB_ASYNC else stream_export
+    return StreamingResponse(
+        stream(resource, format, chunk_size),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{resource.value}.{format.value}"'},
+    )
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.metrics import CONTENT_TYPE, render_metrics
+
+router = APIRouter(
+    tags=["System"],
+)
+
+@router.get("/metrics", response_class=Response)
+async def read_metrics() -> Response:
+    """
+    Prometheus metrics of this worker: request latency histograms per route
+    and status, in-flight requests, threadpool occupancy, connection pool
+    checkouts and waits, and cache hit ratios.
+    """
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
@@ -1,14 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Response
 
 from app.crud.music import (
     delete_music,
     get_all_musics,
-    get_music,
+    get_music_cached,
     post_music,
+    post_musics,
     update_music,
 )
 from app.db.db_setup import get_session
+from app.crud.aio import DbSession, run
+from app.dependencies import PageParams, bulk_chunk_size, bulk_items, page_params
+from app.models.bulk import BulkResult
+from app.models.pagination import Page
+from app.responses import model_json_response
 from app.models.music import Music, MusicCreate, MusicUpdate
 
 router = APIRouter(
@@ -17,14 +24,35 @@ router = APIRouter(
 )
 
 @router.post("/musics/", response_model=Music, status_code=201)
-def create(music: MusicCreate, session: Session = Depends(get_session)) -> Music:
-    new_music = Music.model_validate(music)
-    return post_music(session, new_music)
+async def create(music: MusicCreate, session: DbSession = Depends(get_session)) -> Response:
+    # MusicCreate est déjà validé par FastAPI, post_music le convertit une seule fois en Music
+    return model_json_response(await run(session, post_music, music), status_code=201)
+
+
+@router.post("/musics/bulk", response_model=BulkResult, status_code=201)
+async def create_bulk(
+    musics: list[Any] = Depends(bulk_items),
+    chunk_size: int = Depends(bulk_chunk_size),
+    session: DbSession = Depends(get_session),
+) -> BulkResult:
+    """
+    Create many musics in one request, one multi-row INSERT per chunk.
+    Returns the new ids in input order and the errors of rejected items.
+    """
+    return await run(session, post_musics, musics, chunk_size)
 
 
 @router.get("/musics/{music_name}", response_model=Music, status_code=200)
-def get_by_name(music_name: str, session: Session = Depends(get_session)) -> Music:
-    music = get_music(session, music_name)
+async def get_by_name(music_name: str, session: DbSession = Depends(get_session)) -> Response:
+    music = await run(session, get_music_cached, music_name)
     if not music:
         raise HTTPException(status_code=404, detail="Music not found")
-    return music
\ No newline at end of file
+    return model_json_response(music)
+
+@router.get("/musics/", response_model=Page[Music], status_code=200)
+async def get_all(
+    session: DbSession = Depends(get_session),
+    page: PageParams = Depends(page_params),
+) -> Response:
+    musics = await run(session, get_all_musics, after_id=page.after_id, limit=page.limit)
+    return model_json_response(musics)
\ No newline at end of file
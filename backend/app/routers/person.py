@@ -1,10 +1,16 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from pydantic import EmailStr # Pour valider le paramètre email dans la route
 
 from app.db.db_setup import get_session # Assurez-vous que ce chemin est correct
+from app.conditional import make_etag, not_modified, validator_headers
+from app.crud.aio import DbSession, run
+from app.dependencies import MAX_PAGE_SIZE, PageParams, bulk_chunk_size, bulk_items, page_params
+from app.models.bulk import BulkResult
+from app.models.pagination import Page
 from app.models.person import Person, PersonCreate, PersonUpdate # Modèles de base
+from app.models.person import PersonEntityLinkIds, PersonEntityLinkResult
 # Les schémas de lecture avec relations sont dans entity.py ou person.py selon votre organisation
 # Assumons qu'ils sont accessibles ou à définir si besoin pour PersonReadWithEntities
 from app.models.entity import PersonRead, PersonReadWithEntities # Si définis dans entity.py
@@ -13,13 +19,18 @@ from app.models.entity import PersonRead, PersonReadWithEntities # Si définis d
 
 from app.crud.person import (
     create_person,
+    create_persons,
     get_person,
-    get_person_by_email,
+    get_persons_by_ids,
+    get_person_version,
+    get_person_by_email_cached,
     get_persons,
     update_person,
     delete_person,
     add_entity_to_person,
     remove_entity_from_person,
+    add_entities_to_person,
+    remove_entities_from_person,
 )
 
 router = APIRouter(
@@ -29,9 +40,9 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=PersonRead, status_code=status.HTTP_201_CREATED)
-def create_new_person(
+async def create_new_person(
     *, 
-    session: Session = Depends(get_session), 
+    session: DbSession = Depends(get_session), 
     person_in: PersonCreate
 ) -> Person:
     """
@@ -41,96 +52,155 @@ def create_new_person(
     # db_person_by_email = get_person_by_email(session, email=person_in.email)
     # if db_person_by_email:
     #     raise HTTPException(status_code=400, detail="Email already registered")
-    return create_person(session=session, person_create=person_in)
+    return await run(session, create_person, person_create=person_in)
+
+@router.post("/bulk", response_model=BulkResult, status_code=status.HTTP_201_CREATED)
+async def create_new_persons(
+    persons: list[Any] = Depends(bulk_items),
+    chunk_size: int = Depends(bulk_chunk_size),
+    session: DbSession = Depends(get_session),
+) -> BulkResult:
+    """
+    Create many persons in one request, one multi-row INSERT per chunk.
+    Returns the new ids in input order and the errors of rejected items.
+    """
+    return await run(session, create_persons, persons=persons, chunk_size=chunk_size)
 
-@router.get("/", response_model=List[PersonRead])
-def read_all_persons(
-    session: Session = Depends(get_session),
-    skip: int = 0,
-    limit: int = 100
-) -> List[Person]:
+@router.get("/", response_model=Page[PersonRead])
+async def read_all_persons(
+    session: DbSession = Depends(get_session),
+    page: PageParams = Depends(page_params),
+) -> Page[Person]:
     """
     Retrieve all persons.
     """
-    return get_persons(session=session, skip=skip, limit=limit)
+    return await run(session, get_persons, after_id=page.after_id, limit=page.limit)
+
+@router.get("/batch", response_model=list[PersonReadWithEntities | None])
+async def read_persons_by_ids(
+    ids: list[int] = Query(min_length=1, max_length=MAX_PAGE_SIZE),
+    session: DbSession = Depends(get_session),
+) -> list[Person | None]:
+    """
+    Persons for `?ids=1&ids=2...`, with their entities, in the order of the
+    ids (null for unknown ones). Two queries whatever the number of ids.
+    """
+    return await run(session, get_persons_by_ids, ids)
 
 @router.get("/{person_id}", response_model=PersonReadWithEntities)
-def read_person_by_id(
+async def read_person_by_id(
     person_id: int, 
-    session: Session = Depends(get_session)
-) -> Person:
+    request: Request,
+    response: Response,
+    session: DbSession = Depends(get_session)
+) -> Person | Response:
     """
     Get person by ID, with their associated entities.
-    """
-    db_person = get_person(session=session, person_id=person_id)
+    Answers 304 to a matching If-None-Match without loading the entities.
+    """
+    version = await run(session, get_person_version, person_id=person_id)
+    if version is not None:
+        etag = make_etag("person", person_id, *version)
+        if cached := not_modified(request, etag, version[0]):
+            return cached
+        response.headers.update(validator_headers(etag, version[0]))
+    db_person = await run(session, get_person, person_id=person_id)
     if not db_person:
         raise HTTPException(status_code=404, detail="Person not found")
     return db_person
 
 @router.get("/by_email/{email}", response_model=PersonReadWithEntities)
-def read_person_by_email_route(
+async def read_person_by_email_route(
     email: EmailStr, # Utilise EmailStr pour la validation du format de l'email
-    session: Session = Depends(get_session)
-) -> Person:
+    session: DbSession = Depends(get_session)
+) -> PersonReadWithEntities:
     """
     Get person by email, with their associated entities.
     """
-    db_person = get_person_by_email(session=session, email=email)
+    db_person = await run(session, get_person_by_email_cached, email=email)
     if not db_person:
         raise HTTPException(status_code=404, detail="Person not found with this email")
     return db_person
 
 @router.patch("/{person_id}", response_model=PersonRead)
-def update_existing_person(
+async def update_existing_person(
     person_id: int, 
     person_in: PersonUpdate, 
-    session: Session = Depends(get_session)
+    session: DbSession = Depends(get_session)
 ) -> Person:
     """
     Update a person.
     """
-    db_person = update_person(session=session, person_id=person_id, person_update=person_in)
+    db_person = await run(session, update_person, person_id=person_id, person_update=person_in)
     if not db_person:
         raise HTTPException(status_code=404, detail="Person not found")
     return db_person
 
 @router.delete("/{person_id}", status_code=status.HTTP_200_OK)
-def delete_existing_person(
+async def delete_existing_person(
     person_id: int, 
-    session: Session = Depends(get_session)
+    session: DbSession = Depends(get_session)
 ) -> dict:
     """
     Delete a person.
     """
-    deleted = delete_person(session=session, person_id=person_id)
+    deleted = await run(session, delete_person, person_id=person_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Person not found")
     return {"message": "Person deleted successfully"}
 
 @router.post("/{person_id}/entities/{entity_id}", response_model=PersonReadWithEntities)
-def link_entity_to_person(
+async def link_entity_to_person(
     person_id: int,
     entity_id: int,
-    session: Session = Depends(get_session)
+    session: DbSession = Depends(get_session)
 ) -> Person:
     """
     Link an entity to a person.
     """
-    person = add_entity_to_person(session=session, person_id=person_id, entity_id=entity_id)
+    person = await run(session, add_entity_to_person, person_id=person_id, entity_id=entity_id)
     if not person:
         raise HTTPException(status_code=404, detail="Person or Entity not found, or already linked")
     return person
 
 @router.delete("/{person_id}/entities/{entity_id}", response_model=PersonReadWithEntities)
-def unlink_entity_from_person(
+async def unlink_entity_from_person(
     person_id: int,
     entity_id: int,
-    session: Session = Depends(get_session)
+    session: DbSession = Depends(get_session)
 ) -> Person:
     """
     Unlink an entity from a person.
     """
-    person = remove_entity_from_person(session=session, person_id=person_id, entity_id=entity_id)
+    person = await run(session, remove_entity_from_person, person_id=person_id, entity_id=entity_id)
     if not person:
         raise HTTPException(status_code=404, detail="Person or Entity not found, or not linked")
-    return person 
\ No newline at end of file
+    return person
+
+@router.post("/{person_id}/entities", response_model=PersonEntityLinkResult)
+async def link_entities_to_person(
+    person_id: int,
+    entities: PersonEntityLinkIds,
+    session: DbSession = Depends(get_session)
+) -> PersonEntityLinkResult:
+    """
+    Link many entities to a person. Already linked or unknown entity ids are ignored.
+    """
+    count = await run(session, add_entities_to_person, person_id=person_id, entity_ids=entities.ids)
+    if count is None:
+        raise HTTPException(status_code=404, detail="Person not found")
+    return PersonEntityLinkResult(count=count)
+
+@router.delete("/{person_id}/entities", response_model=PersonEntityLinkResult)
+async def unlink_entities_from_person(
+    person_id: int,
+    entities: PersonEntityLinkIds,
+    session: DbSession = Depends(get_session)
+) -> PersonEntityLinkResult:
+    """
+    Unlink many entities from a person.
+    """
+    count = await run(session, remove_entities_from_person, person_id=person_id, entity_ids=entities.ids)
+    if count is None:
+        raise HTTPException(status_code=404, detail="Person not found")
+    return PersonEntityLinkResult(count=count)
@@ -1,15 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.exc import IntegrityError
 
 from app.crud.place import (
     delete_place,
     get_all_places,
-    get_place,
+    get_place_cached,
+    get_places_nearby,
     post_place,
+    post_places,
+    put_place,
+    put_places,
     update_place,
 )
 from app.db.db_setup import get_session
-from app.models.place import Place, PlaceCreate, PlaceUpdate
+from app.crud.aio import DbSession, run
+from app.dependencies import PageParams, bulk_chunk_size, bulk_items, page_params
+from app.models.bulk import BulkResult
+from app.models.pagination import Page
+from app.responses import model_json_response
+from app.models.place import Place, PlaceCreate, PlaceNearby, PlaceUpdate
 
 router = APIRouter(
     tags=["places"], 
@@ -17,14 +28,75 @@ router = APIRouter(
 )
 
 @router.post("/places/", response_model=Place, status_code=201)
-def create(place: PlaceCreate, session: Session = Depends(get_session)) -> Place:
-    new_place = Place.model_validate(place)
-    return post_place(session, new_place)
+async def create(place: PlaceCreate, session: DbSession = Depends(get_session)) -> Response:
+    # PlaceCreate est déjà validé par FastAPI, post_place le convertit une seule fois en Place
+    try:
+        return model_json_response(await run(session, post_place, place), status_code=201)
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Place name already exists, use PUT to replace it")
+
+
+@router.post("/places/bulk", response_model=BulkResult, status_code=201)
+async def create_bulk(
+    places: list[Any] = Depends(bulk_items),
+    chunk_size: int = Depends(bulk_chunk_size),
+    session: DbSession = Depends(get_session),
+) -> BulkResult:
+    """
+    Create many places in one request, one multi-row INSERT per chunk.
+    Returns the new ids in input order and the errors of rejected items.
+    """
+    return await run(session, post_places, places, chunk_size)
+
+
+@router.get("/places/nearby", response_model=list[PlaceNearby], status_code=200)
+async def get_nearby(
+    lat: float = Query(ge=-90, le=90),
+    lon: float = Query(ge=-180, le=180),
+    radius: float = Query(default=10, gt=0, le=1000, description="Radius in km"),
+    k: int = Query(default=10, ge=1, le=100),
+    session: DbSession = Depends(get_session),
+) -> list[PlaceNearby]:
+    """
+    The `k` nearest places within `radius` km, nearest first, with their distance.
+    Places without coordinates are never returned.
+    """
+    return await run(session, get_places_nearby, lat, lon, radius, k)
+
+@router.put("/places/bulk", response_model=BulkResult, status_code=200)
+async def upsert_bulk(
+    places: list[Any] = Depends(bulk_items),
+    chunk_size: int = Depends(bulk_chunk_size),
+    session: DbSession = Depends(get_session),
+) -> BulkResult:
+    """
+    Create or replace many places by name, one INSERT ... ON CONFLICT DO UPDATE
+    per chunk. Returns the ids in input order and the errors of rejected items.
+    """
+    return await run(session, put_places, places, chunk_size)
+
+
+@router.put("/places/{place_name}", response_model=Place, status_code=200)
+async def upsert(place_name: str, place: PlaceCreate, session: DbSession = Depends(get_session)) -> Response:
+    """
+    Create the place or replace every field of the existing one, in one statement.
+    """
+    if place.name != place_name:
+        raise HTTPException(status_code=400, detail="Name in body does not match the URL")
+    return model_json_response(await run(session, put_place, place))
 
 
 @router.get("/places/{place_name}", response_model=Place, status_code=200)
-def get_by_name(place_name: str, session: Session = Depends(get_session)) -> Place:
-    place = get_place(session, place_name)
+async def get_by_name(place_name: str, session: DbSession = Depends(get_session)) -> Response:
+    place = await run(session, get_place_cached, place_name)
     if not place:
         raise HTTPException(status_code=404, detail="Place not found")
-    return place
\ No newline at end of file
+    return model_json_response(place)
+
+@router.get("/places/", response_model=Page[Place], status_code=200)
+async def get_all(
+    session: DbSession = Depends(get_session),
+    page: PageParams = Depends(page_params),
+) -> Response:
+    places = await run(session, get_all_places, after_id=page.after_id, limit=page.limit)
+    return model_json_response(places)
\ No newline at end of file
@@ -0,0 +1,173 @@
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+import anyio
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+
+from app.conditional import not_modified
+from app.config import get_settings
+from app.counters import get_listen_counter
+
+from app.crud.aio import DbSession, run
+from app.crud.peaks import media_path, open_peaks, peaks_jobs, start_peaks_job
+from app.crud.playlist import (
+    delete_playlist,
+    get_all_playlists,
+    get_playlist,
+    get_playlist_cached,
+    post_playlist,
+    update_playlist,
+)
+from app.db.db_setup import get_session
+from app.dependencies import PageParams, page_params
+from app.models.pagination import Page
+from app.models.playlist import PeaksFormat, PeaksJob, Playlist, PlaylistCreate, PlaylistUpdate
+from app.responses import RangeFileResponse, model_json_response
+
+router = APIRouter(
+    prefix="/playlists",
+    tags=["Playlists"],
+    responses={404: {"description": "Playlist not found"}},
+)
+
+@router.post("/", response_model=Playlist, status_code=201)
+async def create(playlist: PlaylistCreate, session: DbSession = Depends(get_session)) -> Response:
+    return model_json_response(await run(session, post_playlist, playlist), status_code=201)
+
+@router.get("/", response_model=Page[Playlist])
+async def get_all(
+    session: DbSession = Depends(get_session),
+    page: PageParams = Depends(page_params),
+) -> Response:
+    playlists = await run(session, get_all_playlists, after_id=page.after_id, limit=page.limit)
+    return model_json_response(playlists)
+
+@router.get("/{playlist_id}", response_model=Playlist)
+async def get_by_id(playlist_id: int, session: DbSession = Depends(get_session)) -> Response:
+    playlist = await run(session, get_playlist, playlist_id)
+    if not playlist:
+        raise HTTPException(status_code=404, detail="Playlist not found")
+    return model_json_response(playlist)
+
+@router.patch("/{playlist_id}", response_model=Playlist)
+async def update(playlist_id: int, playlist_update: PlaylistUpdate, session: DbSession = Depends(get_session)) -> Response:
+    playlist = await run(session, update_playlist, playlist_id, playlist_update)
+    if not playlist:
+        raise HTTPException(status_code=404, detail="Playlist not found")
+    return model_json_response(playlist)
+
+@router.delete("/{playlist_id}", response_model=Playlist)
+async def delete(playlist_id: int, session: DbSession = Depends(get_session)) -> Response:
+    playlist = await run(session, delete_playlist, playlist_id)
+    if not playlist:
+        raise HTTPException(status_code=404, detail="Playlist not found")
+    return model_json_response(playlist)
+
+@router.post("/{playlist_id}/listen", status_code=202)
+async def listen(playlist_id: int, count: int = Query(default=1, ge=1, le=1000)) -> dict:
+    """
+    Count `count` listens of the playlist. Buffered in memory and written to
+    count_listen every LISTEN_FLUSH_INTERVAL seconds, so this does not touch
+    the database. Listens of an unknown playlist are dropped at flush time.
+    """
+    get_listen_counter().increment(playlist_id, count)
+    return {"playlist_id": playlist_id, "accepted": count}
+
+@router.api_route("/{playlist_id}/audio", methods=["GET", "HEAD"], response_class=RangeFileResponse)
+async def stream_audio(playlist_id: int, request: Request, session: DbSession = Depends(get_session)) -> Response:
+    """
+    Audio file of the playlist. Supports Range (single and multiple, 206),
+    If-Range, If-None-Match/If-Modified-Since (304) and HEAD. A seek only
+    reads the requested bytes.
+    """
+    playlist = await run(session, get_playlist_cached, playlist_id)
+    if not playlist:
+        raise HTTPException(status_code=404, detail="Playlist not found")
+    try:
+        path = media_path(playlist.filename)
+        stat_result = await anyio.to_thread.run_sync(os.stat, path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Audio file not found")
+    response = RangeFileResponse(
+        path,
+        chunk_size=get_settings()["AUDIO_CHUNK_SIZE"],
+        stat_result=stat_result,
+        filename=Path(playlist.filename).name,
+        content_disposition_type="inline",
+    )
+    modified = datetime.fromtimestamp(stat_result.st_mtime, timezone.utc).replace(tzinfo=None)
+    if cached := not_modified(request, response.headers["etag"], modified, exact_last_modified=True):
+        return cached
+    return response
+
+@router.get("/{playlist_id}/peaks")
+async def get_peaks(
+    playlist_id: int,
+    start: float = Query(default=0.0, ge=0, description="Start of the window, in seconds"),
+    end: float | None = Query(default=None, ge=0, description="End of the window, in seconds"),
+    resolution: float = Query(default=256, gt=0, description="Wanted samples per peak"),
+    format: PeaksFormat = PeaksFormat.binary,
+    session: DbSession = Depends(get_session),
+) -> Response:
+    """
+    Peaks of the visible window at the precomputed level nearest to
+    `resolution`. The peaks file is memory-mapped once and kept open, so a
+    request only slices the pages it needs. Binary is int16 (min, max) pairs,
+    JSON a flat [min, max, ...] list; both describe the slice in X-Peaks-* headers.
+    """
+    if end is not None and end < start:
+        raise HTTPException(status_code=400, detail="end must be greater than start")
+    playlist = await run(session, get_playlist_cached, playlist_id)
+    if not playlist:
+        raise HTTPException(status_code=404, detail="Playlist not found")
+    # stat, ouverture et mmap (disque au premier accès) hors de la boucle d'événements
+    peaks = await anyio.to_thread.run_sync(open_peaks, playlist)
+    if peaks is None:
+        raise HTTPException(status_code=404, detail="Peaks not generated yet")
+    level = peaks.nearest_level(resolution)
+    first, data = peaks.slice(level, start, end)
+    headers = {
+        "X-Peaks-Sample-Rate": str(peaks.sample_rate),
+        "X-Peaks-Samples-Per-Peak": str(peaks.samples_per_peak[level]),
+        "X-Peaks-Start": str(first),
+        "X-Peaks-Count": str(len(data)),
+    }
+    if format is PeaksFormat.json:
+        body = orjson.dumps(
+            {
+                "sample_rate": peaks.sample_rate,
+                "samples_per_peak": peaks.samples_per_peak[level],
+                "start": first,
+                "data": data.ravel(),
+            },
+            option=orjson.OPT_SERIALIZE_NUMPY,
+        )
+        return Response(body, media_type="application/json", headers=headers)
+    return Response(data.tobytes(), media_type="application/octet-stream", headers=headers)
+
+@router.post("/{playlist_id}/peaks", response_model=PeaksJob, status_code=202)
+async def generate_peaks(playlist_id: int, session: DbSession = Depends(get_session)) -> PeaksJob:
+    """
+    Start generating the waveform peaks of the playlist audio file in a
+    worker process. Returns immediately; poll GET /playlists/{id}/peaks/job.
+    """
+    playlist = await run(session, get_playlist, playlist_id)
+    if not playlist:
+        raise HTTPException(status_code=404, detail="Playlist not found")
+    try:
+        return start_peaks_job(playlist)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=409, detail="Audio file not found")
+
+@router.get("/{playlist_id}/peaks/job", response_model=PeaksJob)
+async def get_peaks_job(playlist_id: int) -> PeaksJob:
+    job = peaks_jobs.get(playlist_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="No peaks job for this playlist")
+    return job
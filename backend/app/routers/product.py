@@ -1,15 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.exc import IntegrityError
 
 from app.crud.product import (
     delete_product,
     get_all_products,
-    get_product,
+    get_products_version,
+    get_product_cached,
+    get_products_by_names,
     post_product,
+    post_products,
+    put_product,
+    put_products,
     update_product,
     hard_delete_product
 )
 from app.db.db_setup import get_session
+from app.conditional import make_etag, not_modified, validator_headers
+from app.crud.aio import DbSession, run
+from app.dependencies import MAX_PAGE_SIZE, PageParams, bulk_chunk_size, bulk_items, page_params
+from app.models.bulk import BulkResult
+from app.models.pagination import Page
+from app.responses import model_json_response
 from app.models.product import Product, ProductCreate, ProductUpdate
 
 router = APIRouter(
@@ -18,47 +31,113 @@ router = APIRouter(
 )
 
 @router.post("/products/", response_model=Product, status_code=201)
-def create(product: ProductCreate, session: Session = Depends(get_session)) -> Product:
-    new_product = Product.model_validate(product)
-    return post_product(session, new_product)
+async def create(product: ProductCreate, session: DbSession = Depends(get_session)) -> Response:
+    # ProductCreate est déjà validé par FastAPI, post_product le convertit une seule fois en Product
+    try:
+        return model_json_response(await run(session, post_product, product), status_code=201)
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Product name already exists, use PUT to replace it")
+
+
+@router.post("/products/bulk", response_model=BulkResult, status_code=201)
+async def create_bulk(
+    products: list[Any] = Depends(bulk_items),
+    chunk_size: int = Depends(bulk_chunk_size),
+    session: DbSession = Depends(get_session),
+) -> BulkResult:
+    """
+    Create many products in one request, one multi-row INSERT per chunk.
+    Returns the new ids in input order and the errors of rejected items.
+    """
+    return await run(session, post_products, products, chunk_size)
+
+
+@router.put("/products/bulk", response_model=BulkResult, status_code=200)
+async def upsert_bulk(
+    products: list[Any] = Depends(bulk_items),
+    chunk_size: int = Depends(bulk_chunk_size),
+    session: DbSession = Depends(get_session),
+) -> BulkResult:
+    """
+    Create or replace many products by name, one INSERT ... ON CONFLICT DO UPDATE
+    per chunk. Returns the ids in input order and the errors of rejected items.
+    """
+    return await run(session, put_products, products, chunk_size)
 
 
+@router.put("/products/{product_name}", response_model=Product, status_code=200)
+async def upsert(product_name: str, product: ProductCreate, session: DbSession = Depends(get_session)) -> Response:
+    """
+    Create the product or replace every field of the existing one, in one statement.
+    A soft-deleted product of the same name is not restored: a new one is created.
+    """
+    if product.name != product_name:
+        raise HTTPException(status_code=400, detail="Name in body does not match the URL")
+    return model_json_response(await run(session, put_product, product))
+
+
+@router.get("/products/batch", response_model=list[Product | None], status_code=200)
+async def get_by_names(
+    names: list[str] = Query(min_length=1, max_length=MAX_PAGE_SIZE),
+    session: DbSession = Depends(get_session),
+) -> list[Product | None]:
+    """
+    Products for `?names=a&names=b...` in the order of the names (null for
+    unknown or deleted ones), with one query whatever the number of names.
+    """
+    return await run(session, get_products_by_names, names)
+
 @router.get("/products/{product_name}", response_model=Product, status_code=200)
-def get_by_name(product_name: str, session: Session = Depends(get_session)) -> Product:
-    product = get_product(session, product_name)
+async def get_by_name(product_name: str, session: DbSession = Depends(get_session)) -> Response:
+    product = await run(session, get_product_cached, product_name)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found or has been deleted")
-    return product
+    return model_json_response(product)
 
-@router.get("/products/", response_model=list[Product], status_code=200)
-def get_all(session: Session = Depends(get_session)) -> list[Product]:
-    products = get_all_products(session)
-    return products
+@router.get("/products/", response_model=Page[Product], status_code=200)
+async def get_all(
+    request: Request,
+    session: DbSession = Depends(get_session),
+    page: PageParams = Depends(page_params),
+) -> Response:
+    """
+    List products. Supports If-None-Match: the validator is max(updated_at)
+    and the row count of the table, a 304 skips the query and the body.
+    """
+    latest, count = await run(session, get_products_version)
+    etag = make_etag("products", latest, count)
+    if cached := not_modified(request, etag, latest):
+        return cached
+    products = await run(session, get_all_products, after_id=page.after_id, limit=page.limit)
+    return model_json_response(products, headers=validator_headers(etag, latest))
 
 @router.patch("/products/{product_name}", response_model=Product, status_code=200)
-def update(product_name: str, product_update: ProductUpdate, session: Session = Depends(get_session)) -> Product:
-    updated_product = update_product(session, product_name, product_update)
+async def update(product_name: str, product_update: ProductUpdate, session: DbSession = Depends(get_session)) -> Response:
+    try:
+        updated_product = await run(session, update_product, product_name, product_update)
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Product name already exists")
     if not updated_product:
         raise HTTPException(status_code=404, detail="Product not found or has been deleted")
-    return updated_product
+    return model_json_response(updated_product)
 
 @router.delete("/products/{product_name}", response_model=Product, status_code=200)
-def remove_product(product_name: str, session: Session = Depends(get_session)) -> Product:
+async def remove_product(product_name: str, session: DbSession = Depends(get_session)) -> Response:
     """
     Soft delete a product.
     """
-    deleted_product = delete_product(session, product_name)
+    deleted_product = await run(session, delete_product, product_name)
     if not deleted_product:
         raise HTTPException(status_code=404, detail="Product not found or already soft-deleted")
-    return deleted_product
+    return model_json_response(deleted_product)
 
 @router.delete("/products/{product_name}/permanent", status_code=200)
-async def permanently_remove_product(product_name: str, session: Session = Depends(get_session)) -> dict:
+async def permanently_remove_product(product_name: str, session: DbSession = Depends(get_session)) -> dict:
     """
     Permanently delete a product from the database.
     Use with caution.
     """
-    result = hard_delete_product(session, product_name)
+    result = await run(session, hard_delete_product, product_name)
     if "not found" in result.get("message", "").lower():
         raise HTTPException(status_code=404, detail=result.get("message", "Product not found"))
     return result
\ No newline at end of file
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.config import get_settings
+from app.crud.aio import DbSession, run
+from app.crud.search import search
+from app.db.db_setup import get_session
+from app.models.search import SearchResults, SearchType
+
+router = APIRouter(
+    prefix="/search",
+    tags=["Search"],
+)
+
+@router.get("/", response_model=SearchResults)
+async def search_all(
+    q: str = Query(min_length=1, max_length=100),
+    types: list[SearchType] = Query(default=list(SearchType)),
+    k: int = Query(default=10, ge=1),
+    session: DbSession = Depends(get_session),
+) -> SearchResults:
+    """
+    Search-as-you-type over musics (title, artist, album), places (name, city)
+    and persons (firstname, lastname, email). Returns the `k` best matches.
+    """
+    settings = get_settings()
+    k = min(k, settings["SEARCH_MAX_RESULTS"])
+    return await run(session, search, q, types, k, settings["SEARCH_TIMEOUT_MS"])
@@ -0,0 +1,42 @@
+from fastapi import APIRouter
+
+from app.cache import get_cache
+from app.counters import get_listen_counter
+from app.db.db_setup import get_pool_stats
+from app.startup import get_startup_profile
+
+router = APIRouter(
+    prefix="/system",
+    tags=["System"],
+)
+
+@router.get("/pool")
+async def read_pool_stats() -> dict:
+    """
+    Live connection pool statistics: checked out connections, overflow,
+    checkout timeouts and the histogram of time spent waiting for a connection.
+    """
+    return get_pool_stats()
+
+@router.get("/cache")
+async def read_cache_stats() -> dict:
+    """
+    Hit/miss counters of the read-through cache used by the name/email lookups.
+    """
+    return get_cache().stats()
+
+@router.get("/listens")
+async def read_listen_stats() -> dict:
+    """
+    Write-behind listen counter: increments buffered, flushes and rows written.
+    """
+    return get_listen_counter().stats()
+
+@router.get("/startup")
+async def read_startup_profile() -> dict:
+    """
+    Startup profile of this worker: seconds from process start to ready,
+    time spent in each phase (imports, app, schema) and whether the schema
+    had to be created or updated.
+    """
+    return get_startup_profile().snapshot()
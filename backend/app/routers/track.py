@@ -0,0 +1,88 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+from app.crud.aio import DbSession, run
+from app.crud.track import (
+    TrackOverlapError,
+    delete_track,
+    get_timeline,
+    get_track,
+    post_track,
+    update_track,
+)
+from app.db.db_setup import get_session
+from app.models.track import Track, TrackCreate, TrackRead, TrackReadWithDetails, TrackUpdate
+from app.responses import model_json_response
+
+router = APIRouter(
+    tags=["Tracks"],
+    responses={404: {"description": "Track not found"}},
+)
+
+@router.post("/tracks/", response_model=Track, status_code=201)
+async def create(track: TrackCreate, session: DbSession = Depends(get_session)) -> Response:
+    """
+    Add a track to a playlist. 409 if it overlaps another track of the playlist.
+    """
+    try:
+        return model_json_response(await run(session, post_track, track), status_code=201)
+    except TrackOverlapError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/tracks/{track_id}", response_model=TrackReadWithDetails)
+async def get_by_id(track_id: int, session: DbSession = Depends(get_session)) -> Track:
+    track = await run(session, get_track, track_id)
+    if not track:
+        raise HTTPException(status_code=404, detail="Track not found")
+    return track
+
+@router.patch("/tracks/{track_id}", response_model=Track)
+async def update(track_id: int, track_update: TrackUpdate, session: DbSession = Depends(get_session)) -> Response:
+    try:
+        track = await run(session, update_track, track_id, track_update)
+    except TrackOverlapError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not track:
+        raise HTTPException(status_code=404, detail="Track not found")
+    return model_json_response(track)
+
+@router.delete("/tracks/{track_id}", response_model=Track)
+async def delete(track_id: int, session: DbSession = Depends(get_session)) -> Response:
+    track = await run(session, delete_track, track_id)
+    if not track:
+        raise HTTPException(status_code=404, detail="Track not found")
+    return model_json_response(track)
+
+@router.get("/playlists/{playlist_id}/tracks", response_model=list[TrackRead])
+async def get_playlist_tracks(playlist_id: int, session: DbSession = Depends(get_session)) -> list[TrackRead]:
+    """
+    Tracks of a playlist, sorted by start time.
+    """
+    return (await run(session, get_timeline, playlist_id)).tracks
+
+@router.get("/playlists/{playlist_id}/tracks/at", response_model=TrackRead | None)
+async def get_track_at(
+    playlist_id: int,
+    t: float = Query(ge=0, description="Offset in the playlist, in seconds"),
+    session: DbSession = Depends(get_session),
+) -> TrackRead | None:
+    """
+    Track playing at `t`, or null. Served from the in-memory timeline of the
+    playlist (binary search), the database is only read on a cache miss.
+    """
+    return (await run(session, get_timeline, playlist_id)).at(t)
+
+@router.get("/playlists/{playlist_id}/tracks/between", response_model=list[TrackRead])
+async def get_tracks_between(
+    playlist_id: int,
+    start: float = Query(ge=0, description="Start of the window, in seconds"),
+    end: float = Query(gt=0, description="End of the window, in seconds"),
+    session: DbSession = Depends(get_session),
+) -> list[TrackRead]:
+    """
+    Tracks overlapping the window [start, end), sorted by start time.
+    """
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be greater than start")
+    return (await run(session, get_timeline, playlist_id)).between(start, end)
@@ -0,0 +1,71 @@
+import os
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from time import perf_counter, time
+from typing import Any, Iterator
+
+
+def process_started_at() -> float | None:
+    """
+    Wall-clock start time of the current process (Linux, 10 ms resolution),
+    None elsewhere. Covers what perf_counter cannot: the interpreter, the
+    server and the imports before any of our code runs.
+    """
+    try:
+        # Le nom du processus (2e champ) peut contenir des espaces : on découpe après ")"
+        fields = Path("/proc/self/stat").read_text().rsplit(")", 1)[1].split()
+        started_ticks = int(fields[19])
+        uptime = float(Path("/proc/uptime").read_text().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return time() - uptime + started_ticks / os.sysconf("SC_CLK_TCK")
+
+
+class StartupProfile:
+    """
+    Duration of each startup phase of this worker: "imports" (process start
+    to get_app), then the phases timed with `phase()`, and the total once
+    the lifespan startup is done (`ready()`).
+    """
+
+    def __init__(self) -> None:
+        self.process_started_at = process_started_at()
+        self.phases: dict[str, float] = {}
+        self.ready_seconds: float | None = None
+        self.schema_created: bool | None = None
+
+    def since_process_start(self) -> float | None:
+        return time() - self.process_started_at if self.process_started_at is not None else None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self.phases:
+            self.phases["imports"] = self.since_process_start()
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = perf_counter() - start
+
+    def ready(self) -> None:
+        self.ready_seconds = self.since_process_start()
+
+    def summary(self) -> str:
+        phases = ", ".join(
+            f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.phases.items() if seconds is not None
+        )
+        total = f"{self.ready_seconds * 1000:.0f} ms after process start" if self.ready_seconds is not None else "ready"
+        return f"{total} ({phases})"
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "ready_seconds": self.ready_seconds,
+            "phases_seconds": dict(self.phases),
+            "schema_created": self.schema_created,
+        }
+
+
+@lru_cache()
+def get_startup_profile() -> StartupProfile:
+    return StartupProfile()
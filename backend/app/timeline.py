@@ -0,0 +1,68 @@
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from math import inf
+from threading import Lock
+from typing import Callable
+
+from app.cache import MISSING, MemoryCache
+from app.config import get_settings
+from app.models.track import TrackRead
+
+
+class Timeline:
+    """
+    Tracks of one playlist, sorted by start time. Tracks never overlap (checked
+    on every write), so both starts and ends are sorted and a point or window
+    query is two binary searches: O(log n), no interval tree needed.
+    """
+
+    def __init__(self, tracks: list[TrackRead]) -> None:
+        self.tracks = sorted(tracks, key=lambda track: track.start_time)
+        self.starts = [track.start_time.total_seconds() for track in self.tracks]
+        self.ends = [track.end_time.total_seconds() if track.end_time is not None else inf for track in self.tracks]
+
+    def at(self, seconds: float) -> TrackRead | None:
+        index = bisect_right(self.starts, seconds) - 1
+        if index >= 0 and seconds < self.ends[index]:
+            return self.tracks[index]
+        return None
+
+    def between(self, start: float, end: float) -> list[TrackRead]:
+        # Pistes qui finissent après `start` et commencent avant `end`
+        return self.tracks[bisect_right(self.ends, start):bisect_left(self.starts, end)]
+
+
+class TimelineCache:
+    """
+    Per-process TTL + LRU of playlist timelines. Writes through app.crud.track
+    invalidate the playlist's timeline; the TTL bounds how long another
+    worker's writes stay invisible.
+    """
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self._timelines = MemoryCache(ttl, max_size)
+        self._stats_lock = Lock()  # Comme app.cache.Cache : compteurs partagés entre threads
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, playlist_id: int, loader: Callable[[], list[TrackRead]]) -> Timeline:
+        timeline = self._timelines.get(str(playlist_id))
+        with self._stats_lock:
+            if timeline is MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if timeline is MISSING:
+            timeline = Timeline(loader())
+            self._timelines.set(str(playlist_id), timeline)
+        return timeline
+
+    def invalidate(self, *playlist_ids: int | None) -> None:
+        self._timelines.delete([str(playlist_id) for playlist_id in playlist_ids if playlist_id is not None])
+
+
+@lru_cache()
+def get_timelines() -> TimelineCache:
+    settings = get_settings()
+    return TimelineCache(settings["TIMELINE_TTL"], settings["TIMELINE_MAX_PLAYLISTS"])
+
@@ -0,0 +1 @@
+# Benchmarks runnable with `python -m benchmarks.<name>` from backend/
@@ -0,0 +1,165 @@
+"""
+How many concurrent listeners one uvicorn worker can stream to.
+
+Starts `uvicorn app.main:app` (one worker) on a temporary database and
+MEDIA_ROOT holding a generated WAV. Then, for each listener count, every
+listener plays the file like a player would: it seeks to a random offset
+and fetches `--chunk` bytes per Range request, one request per chunk of
+playback time at `--bitrate`, with a random seek now and then. A chunk
+received after its playback deadline is an underrun. The sustained count
+is the largest one with less than 1% underruns.
+
+The client runs in this process on the same machine, so the numbers are a
+lower bound of what the worker alone can do.
+
+Usage (from backend/): python -m benchmarks.listeners [--listeners 50,100,200,400] [--duration 15]
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import wave
+from pathlib import Path
+from statistics import quantiles
+from time import perf_counter
+
+import httpx
+
+# Un lecteur garde cette avance (secondes) avant de commencer à jouer
+PREBUFFER = 1.0
+SEEK_PROBABILITY = 0.05
+
+
+def make_wav(path: Path, size_mb: int) -> None:
+    frames = size_mb * 1024 * 1024 // 4
+    block = os.urandom(4 * 44100)
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(44100)
+        for _ in range(frames // 44100):
+            wav.writeframes(block)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_ready(client: httpx.AsyncClient) -> None:
+    for _ in range(100):
+        try:
+            await client.get("/playlists/")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def listener(
+    client: httpx.AsyncClient, url: str, size: int, chunk: int, chunk_seconds: float, stop: float, stats: dict
+) -> None:
+    # Les auditeurs ne démarrent pas tous au même instant
+    await asyncio.sleep(random.uniform(0, chunk_seconds))
+    position = random.randrange(0, size - chunk)
+    start = perf_counter()
+    played = 0
+    while perf_counter() < stop:
+        if random.random() < SEEK_PROBABILITY:
+            position = random.randrange(0, size - chunk)
+        sent = perf_counter()
+        try:
+            response = await client.get(url, headers={"Range": f"bytes={position}-{position + chunk - 1}"})
+            body_size = len(response.content)
+            ok = response.status_code == 206 and body_size == chunk
+        except httpx.HTTPError:
+            body_size, ok = 0, False
+        received = perf_counter()
+        if not ok:
+            stats["errors"] += 1
+        stats["latencies"].append(received - sent)
+        stats["bytes"] += body_size
+        if received > start + PREBUFFER + played * chunk_seconds:
+            stats["underruns"] += 1
+        stats["requests"] += 1
+        played += 1
+        position = (position + chunk) % (size - chunk)
+        # Attend que le lecteur ait consommé ce qui est en avance
+        await asyncio.sleep(max(0.0, start + played * chunk_seconds - perf_counter()))
+
+
+async def run_level(base_url: str, url: str, size: int, listeners: int, args: argparse.Namespace) -> dict:
+    chunk_seconds = args.chunk / (args.bitrate * 1000 / 8)
+    limits = httpx.Limits(max_connections=listeners, max_keepalive_connections=listeners)
+    stats = {"requests": 0, "underruns": 0, "errors": 0, "bytes": 0, "latencies": []}
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        start = perf_counter()
+        stop = start + args.duration
+        await asyncio.gather(*(
+            listener(client, url, size, args.chunk, chunk_seconds, stop, stats) for _ in range(listeners)
+        ))
+        elapsed = perf_counter() - start
+    latencies = quantiles(stats["latencies"], n=100) if len(stats["latencies"]) > 1 else [0.0] * 99
+    return {
+        "listeners": listeners,
+        "requests": stats["requests"],
+        "errors": stats["errors"],
+        "underrun_ratio": stats["underruns"] / max(stats["requests"], 1),
+        "p50_ms": latencies[49] * 1000,
+        "p95_ms": latencies[94] * 1000,
+        "p99_ms": latencies[98] * 1000,
+        "mb_per_s": stats["bytes"] / elapsed / 1e6,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as media_root:
+        make_wav(Path(media_root) / "mix.wav", args.size_mb)
+        size = (Path(media_root) / "mix.wav").stat().st_size
+        port = free_port()
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{media_root}/bench.db",
+            MEDIA_ROOT=media_root,
+        )
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", "1", "--log-level", "warning"],
+            env=env,
+        )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            async with httpx.AsyncClient(base_url=base_url) as client:
+                await wait_ready(client)
+                playlist = (await client.post("/playlists/", json={"name": "bench", "filename": "mix.wav"})).json()
+            url = f"/playlists/{playlist['id']}/audio"
+            print(f"{size / 1e6:.0f} MB file, {args.bitrate} kbit/s, {args.chunk // 1024} KiB per request")
+            print(f"{'listeners':>9} {'requests':>9} {'errors':>7} {'underrun':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'MB/s':>7}")
+            sustained = 0
+            for listeners in args.listeners:
+                result = await run_level(base_url, url, size, listeners, args)
+                print(
+                    f"{result['listeners']:>9} {result['requests']:>9} {result['errors']:>7} "
+                    f"{result['underrun_ratio']:>8.1%} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+                    f"{result['p99_ms']:>8.1f} {result['mb_per_s']:>7.1f}"
+                )
+                if result["underrun_ratio"] < 0.01 and not result["errors"]:
+                    sustained = listeners
+            print(f"Sustained by one worker: {sustained} listeners")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--listeners", type=lambda value: [int(n) for n in value.split(",")], default=[50, 100, 200, 400])
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per listener count")
+    parser.add_argument("--bitrate", type=int, default=1411, help="kbit/s of playback (1411 = CD WAV)")
+    parser.add_argument("--chunk", type=int, default=256 * 1024, help="bytes per Range request")
+    parser.add_argument("--size-mb", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
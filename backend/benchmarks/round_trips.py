@@ -0,0 +1,230 @@
+"""
+Database round trips per request for every write endpoint.
+
+Runs the app in-process (TestClient, synchronous sessions) on a temporary
+SQLite database and counts the statements each request sends (SELECT,
+INSERT, UPDATE, DELETE, SAVEPOINT...) plus its COMMIT. Rows needed by a
+request are created beforehand and not counted. The counts are deterministic:
+one request per endpoint is enough.
+
+To compare two trees, save the counts of one and pass them to the other:
+
+    git stash && python -m benchmarks.round_trips --save /tmp/before.json
+    git stash pop && python -m benchmarks.round_trips --baseline /tmp/before.json
+
+Usage (from backend/): python -m benchmarks.round_trips [--save FILE] [--baseline FILE]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from itertools import count
+from typing import Any, Callable
+
+# Avant tout import de l'application : la configuration est lue à l'import
+DATABASE = os.path.join(tempfile.mkdtemp(), "round_trips.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE}"
+os.environ["DB_ASYNC"] = "false"
+os.environ.setdefault("MEDIA_ROOT", tempfile.mkdtemp())
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.db.db_setup import get_engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+# Un scénario prépare ses lignes et renvoie (méthode, chemin, corps) de la requête mesurée
+Scenario = Callable[[TestClient], tuple[str, str, Any]]
+SCENARIOS: dict[str, Scenario] = {}
+sequence = count()
+
+
+def scenario(label: str) -> Callable[[Scenario], Scenario]:
+    def register(fn: Scenario) -> Scenario:
+        SCENARIOS[label] = fn
+        return fn
+    return register
+
+
+def created(client: TestClient, path: str, body: dict) -> dict:
+    response = client.post(path, json=body)
+    response.raise_for_status()
+    return response.json()
+
+
+def product(client: TestClient) -> dict:
+    return created(client, "/products/", {"name": f"product-{next(sequence)}", "price": 1.0})
+
+
+def place(client: TestClient) -> dict:
+    body = {"name": f"place-{next(sequence)}", "address": "1 rue", "zip_code": 75001, "city": "Paris", "country": "FR"}
+    return created(client, "/places/", body)
+
+
+def entity(client: TestClient) -> dict:
+    return created(client, "/entities/", {"name": f"entity-{next(sequence)}"})
+
+
+def person(client: TestClient) -> dict:
+    body = {"firstname": "Ada", "lastname": "Lovelace", "email": f"ada{next(sequence)}@example.com"}
+    return created(client, "/persons/", body)
+
+
+def playlist(client: TestClient) -> dict:
+    return created(client, "/playlists/", {"name": f"playlist-{next(sequence)}", "filename": "mix.wav"})
+
+
+def track(client: TestClient) -> dict:
+    return created(client, "/tracks/", {"playlist_id": playlist(client)["id"], "start_time": 0, "end_time": 10})
+
+
+def event_row(client: TestClient) -> dict:
+    return created(client, "/events/", {"name": f"event-{next(sequence)}", "happened_on": "2025-01-01T10:00:00"})
+
+
+@scenario("POST /products/")
+def _(client):
+    return "POST", "/products/", {"name": f"product-{next(sequence)}", "price": 1.0}
+
+@scenario("PATCH /products/{name}")
+def _(client):
+    return "PATCH", f"/products/{product(client)['name']}", {"price": 2.0}
+
+@scenario("PUT /products/{name}")
+def _(client):
+    name = product(client)["name"]
+    return "PUT", f"/products/{name}", {"name": name, "price": 3.0}
+
+@scenario("DELETE /products/{name}")
+def _(client):
+    return "DELETE", f"/products/{product(client)['name']}", None
+
+@scenario("DELETE /products/{name}/permanent")
+def _(client):
+    return "DELETE", f"/products/{product(client)['name']}/permanent", None
+
+@scenario("POST /places/")
+def _(client):
+    body = {"name": f"place-{next(sequence)}", "address": "1 rue", "zip_code": 75001, "city": "Paris", "country": "FR"}
+    return "POST", "/places/", body
+
+@scenario("PUT /places/{name}")
+def _(client):
+    body = {**place(client), "city": "Lyon"}
+    return "PUT", f"/places/{body['name']}", body
+
+@scenario("POST /musics/")
+def _(client):
+    return "POST", "/musics/", {"title": "Song", "artist": "Artist", "album": "Album"}
+
+@scenario("POST /entities/")
+def _(client):
+    return "POST", "/entities/", {"name": f"entity-{next(sequence)}"}
+
+@scenario("PATCH /entities/{id}")
+def _(client):
+    return "PATCH", f"/entities/{entity(client)['id']}", {"name": f"entity-{next(sequence)}"}
+
+@scenario("DELETE /entities/{id}")
+def _(client):
+    return "DELETE", f"/entities/{entity(client)['id']}", None
+
+@scenario("POST /persons/")
+def _(client):
+    return "POST", "/persons/", {"firstname": "Ada", "lastname": "Lovelace", "email": f"ada{next(sequence)}@example.com"}
+
+@scenario("PATCH /persons/{id}")
+def _(client):
+    return "PATCH", f"/persons/{person(client)['id']}", {"lastname": "Byron"}
+
+@scenario("DELETE /persons/{id}")
+def _(client):
+    return "DELETE", f"/persons/{person(client)['id']}", None
+
+@scenario("POST /playlists/")
+def _(client):
+    return "POST", "/playlists/", {"name": f"playlist-{next(sequence)}", "filename": "mix.wav"}
+
+@scenario("PATCH /playlists/{id}")
+def _(client):
+    return "PATCH", f"/playlists/{playlist(client)['id']}", {"name": "renamed"}
+
+@scenario("DELETE /playlists/{id}")
+def _(client):
+    return "DELETE", f"/playlists/{playlist(client)['id']}", None
+
+@scenario("POST /tracks/")
+def _(client):
+    return "POST", "/tracks/", {"playlist_id": playlist(client)["id"], "start_time": 0, "end_time": 10}
+
+@scenario("PATCH /tracks/{id}")
+def _(client):
+    return "PATCH", f"/tracks/{track(client)['id']}", {"end_time": 20}
+
+@scenario("DELETE /tracks/{id}")
+def _(client):
+    return "DELETE", f"/tracks/{track(client)['id']}", None
+
+@scenario("POST /events/")
+def _(client):
+    return "POST", "/events/", {"name": f"event-{next(sequence)}", "happened_on": "2025-01-01T10:00:00"}
+
+@scenario("PATCH /events/{id}")
+def _(client):
+    return "PATCH", f"/events/{event_row(client)['id']}", {"happened_on": "2025-02-01T10:00:00"}
+
+@scenario("DELETE /events/{id}")
+def _(client):
+    return "DELETE", f"/events/{event_row(client)['id']}", None
+
+
+class RoundTrips:
+    def __init__(self) -> None:
+        self.statements = 0
+        self.commits = 0
+        event.listen(get_engine(), "before_cursor_execute", self.on_statement)
+        event.listen(get_engine(), "commit", self.on_commit)
+
+    def on_statement(self, *args: Any) -> None:
+        self.statements += 1
+
+    def on_commit(self, *args: Any) -> None:
+        self.commits += 1
+
+    def measure(self, client: TestClient, method: str, path: str, body: Any) -> dict[str, int]:
+        self.statements = self.commits = 0
+        response = client.request(method, path, json=body)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {path}: {response.status_code} {response.text}")
+        return {"statements": self.statements, "commits": self.commits}
+
+
+def main(args: argparse.Namespace) -> None:
+    baseline = json.loads(open(args.baseline).read()) if args.baseline else {}
+    results = {}
+    with TestClient(app) as client:
+        counter = RoundTrips()
+        for label, prepare in SCENARIOS.items():
+            results[label] = counter.measure(client, *prepare(client))
+
+    header = f"{'endpoint':<36} {'statements':>10} {'commits':>8}"
+    print(header + (f" {'before':>7} {'saved':>6}" if baseline else ""))
+    for label, result in results.items():
+        line = f"{label:<36} {result['statements']:>10} {result['commits']:>8}"
+        if label in baseline:
+            before = baseline[label]["statements"] + baseline[label]["commits"]
+            after = result["statements"] + result["commits"]
+            line += f" {baseline[label]['statements']:>7} {before - after:>6}"
+        print(line)
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Saved to {args.save}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save", help="write the counts to this JSON file")
+    parser.add_argument("--baseline", help="JSON file saved by --save, shown as the before column")
+    main(parser.parse_args())
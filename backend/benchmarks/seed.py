@@ -0,0 +1,174 @@
+"""
+Synthetic, reproducible datasets for the benchmarks.
+
+`rows` sets the size of the large tables (products, musics, places, persons,
+events); the others are derived from it. Persons get dense memberships:
+each one is linked to `memberships` random entities, and with one entity per
+100 persons every entity ends up with about 100 x `memberships` persons.
+
+Rows are written with Core executemany in chunks, in a fresh database:
+ids are then 1..count in every table, which the scenarios rely on.
+
+Usage (from backend/): DATABASE_URL=... python -m benchmarks.seed --rows 100000
+"""
+import argparse
+import random
+from collections import Counter
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Any, Callable, Iterator
+
+from sqlalchemy import Connection, Engine, func, insert, select
+
+from app.crud.event import bucket_start
+from app.models.entity import Entity
+from app.models.event import Event, EventRollup, Granularity
+from app.models.music import Music
+from app.models.person import Person, PersonEntityLink
+from app.models.place import Place, place_geohash
+from app.models.playlist import Playlist
+from app.models.product import Product
+from app.models.track import Track
+from app.models.versioning import utcnow
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+CHUNK_SIZE = 10_000
+TRACK_SECONDS = 180
+EVENTS_START = datetime(2024, 1, 1)
+AUDIO_FILE = "bench.wav"
+PEAKS_FILE = "peaks/bench.peaks"
+
+
+@dataclass
+class Dataset:
+    products: int
+    musics: int
+    places: int
+    persons: int
+    entities: int
+    playlists: int
+    tracks: int
+    events: int
+    memberships: int
+
+    @classmethod
+    def load(cls, connection: Connection) -> "Dataset":
+        def last_id(model: Any) -> int:
+            return connection.execute(select(func.coalesce(func.max(model.id), 0))).scalar_one()
+
+        return cls(
+            products=last_id(Product),
+            musics=last_id(Music),
+            places=last_id(Place),
+            persons=last_id(Person),
+            entities=last_id(Entity),
+            playlists=last_id(Playlist),
+            tracks=last_id(Track),
+            events=last_id(Event),
+            memberships=connection.execute(select(func.count()).select_from(PersonEntityLink)).scalar_one(),
+        )
+
+
+def _write(connection: Connection, model: Any, rows: Iterator[dict[str, Any]]) -> int:
+    table, count, chunk = model.__table__, 0, []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            connection.execute(insert(table), chunk)
+            count, chunk = count + len(chunk), []
+    if chunk:
+        connection.execute(insert(table), chunk)
+        count += len(chunk)
+    return count
+
+
+def seed(engine: Engine, rows: int, memberships: int = 5, seed: int = 0, progress: Callable[[str], None] = print) -> Dataset:
+    """
+    Fill an empty database (tables already created) and return its sizes.
+    The same `rows`, `memberships` and `seed` always give the same data.
+    """
+    rng = random.Random(seed)
+    now = utcnow()
+    entities = max(rows // 100, 10)
+    playlists = max(rows // 1000, 10)
+    tracks_per_playlist = max(rows // 10 // playlists, 1)
+
+    def products() -> Iterator[dict]:
+        for i in range(1, rows + 1):
+            yield {"name": f"product-{i}", "description": f"Synthetic product {i}", "price": round(rng.uniform(1, 500), 2),
+                   "in_stock": rng.random() < 0.7, "is_deleted": False, "updated_at": now}
+
+    def musics() -> Iterator[dict]:
+        for i in range(1, rows + 1):
+            yield {"title": f"title-{i}", "artist": f"artist-{i % 5000}", "album": f"album-{i % 20000}", "updated_at": now}
+
+    def places() -> Iterator[dict]:
+        for i in range(1, rows + 1):
+            latitude, longitude = rng.uniform(42.5, 51.0), rng.uniform(-4.5, 8.0)
+            yield {"name": f"place-{i}", "address": f"{i} rue du Banc", "zip_code": 10000 + i % 85000, "city": f"city-{i % 3000}",
+                   "country": "FR", "latitude": latitude, "longitude": longitude,
+                   "geohash": place_geohash(latitude, longitude), "updated_at": now}
+
+    def persons() -> Iterator[dict]:
+        for i in range(1, rows + 1):
+            yield {"firstname": f"first-{i % 2000}", "lastname": f"last-{i % 10000}", "email": f"person{i}@example.com", "updated_at": now}
+
+    def links() -> Iterator[dict]:
+        for person_id in range(1, rows + 1):
+            for entity_id in rng.sample(range(1, entities + 1), min(memberships, entities)):
+                yield {"person_id": person_id, "entity_id": entity_id}
+
+    def tracks() -> Iterator[dict]:
+        for playlist_id in range(1, playlists + 1):
+            for index in range(tracks_per_playlist):
+                start = timedelta(seconds=index * TRACK_SECONDS)
+                yield {"playlist_id": playlist_id, "music_id": rng.randint(1, rows), "start_time": start,
+                       "end_time": start + timedelta(seconds=TRACK_SECONDS)}
+
+    rollup: Counter[tuple] = Counter()
+
+    def events() -> Iterator[dict]:
+        for i in range(1, rows + 1):
+            happened_on = EVENTS_START + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+            row = {"name": f"event-{i}", "happened_on": happened_on, "place_id": rng.randint(1, rows),
+                   "playlist_id": rng.randint(1, playlists), "entity_id": rng.randint(1, entities)}
+            for granularity in Granularity:
+                rollup[(granularity, bucket_start(happened_on, granularity), row["place_id"], row["playlist_id"], row["entity_id"])] += 1
+            yield row
+
+    def rollups() -> Iterator[dict]:
+        for (granularity, start, place_id, playlist_id, entity_id), count in rollup.items():
+            yield {"granularity": granularity, "bucket_start": start, "place_id": place_id,
+                   "playlist_id": playlist_id, "entity_id": entity_id, "count": count}
+
+    steps = [
+        (Product, products), (Music, musics), (Place, places), (Person, persons),
+        (Entity, lambda: ({"name": f"entity-{i}", "updated_at": now} for i in range(1, entities + 1))),
+        (PersonEntityLink, links),
+        (Playlist, lambda: ({"name": f"playlist-{i}", "filename": AUDIO_FILE, "peaksfile": PEAKS_FILE, "count_listen": 0}
+                            for i in range(1, playlists + 1))),
+        (Track, tracks), (Event, events), (EventRollup, rollups),
+    ]
+    for model, rows_of in steps:
+        start = perf_counter()
+        with engine.begin() as connection:
+            count = _write(connection, model, rows_of())
+        progress(f"seeded {count:>9} {model.__tablename__} in {perf_counter() - start:.1f}s")
+    with engine.connect() as connection:
+        return Dataset.load(connection)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=lambda value: SIZES.get(value.lower()) or int(value), default=SIZES["10k"],
+                        help="10k, 100k, 1m or a number")
+    parser.add_argument("--memberships", type=int, default=5, help="entities per person")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import app.main  # noqa: F401  Enregistre tous les modèles avant create_all
+    from app.db.db_setup import create_db_and_tables, get_engine
+
+    create_db_and_tables()
+    print(asdict(seed(get_engine(), args.rows, args.memberships, args.seed)))
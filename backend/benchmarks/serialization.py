@@ -0,0 +1,67 @@
+"""
+Per-row cost of serialising a page of products.
+
+before: the default FastAPI path, returning ORM rows with response_model=Page[Product]:
+        validation against the response model, field.serialize to Python
+        objects, then json.dumps in JSONResponse.
+after:  the path used by the product/music/place routers: a Page[Product]
+        built without validation and dumped to bytes by its own serializer
+        (app.responses.model_json_response).
+
+Usage (from backend/): python -m benchmarks.serialization [rows] [repeat]
+"""
+import asyncio
+import sys
+from datetime import datetime
+from time import perf_counter
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.models.pagination import Page
+from app.models.product import Product
+from app.responses import model_json_response
+
+
+def make_rows(count: int) -> list[Product]:
+    now = datetime(2025, 1, 1)
+    return [
+        Product(id=i, name=f"product-{i}", description="A product description", price=i * 1.5,
+                in_stock=bool(i % 2), is_deleted=False, updated_at=now)
+        for i in range(count)
+    ]
+
+
+async def fastapi_default(page: Page, response_class: type[JSONResponse]) -> bytes:
+    field = create_model_field("Response_get_all", Page[Product], mode="serialization")
+    content = await serialize_response(field=field, response_content=page)
+    return response_class(content).body
+
+
+def measure(label: str, fn, rows: int, repeat: int) -> float:
+    fn()  # échauffement
+    start = perf_counter()
+    for _ in range(repeat):
+        body = fn()
+    per_row = (perf_counter() - start) / repeat / rows * 1e6
+    print(f"{label:<40} {per_row:8.3f} µs/row  ({len(body)} bytes)")
+    return per_row
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    items = make_rows(rows)
+    untyped = Page(items=items, next_cursor=None)
+    typed = Page[Product].model_construct(items=items, next_cursor=None)
+
+    print(f"{rows} rows, {repeat} runs")
+    before = measure("before: response_model + json", lambda: asyncio.run(fastapi_default(untyped, JSONResponse)), rows, repeat)
+    measure("before: response_model + orjson", lambda: asyncio.run(fastapi_default(untyped, ORJSONResponse)), rows, repeat)
+    after = measure("after: model_json_response", lambda: model_json_response(typed).body, rows, repeat)
+    print(f"speedup: x{before / after:.1f}")
+
+
+if __name__ == "__main__":
+    main()
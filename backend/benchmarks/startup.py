@@ -0,0 +1,71 @@
+"""
+Cold start of one uvicorn worker: time from spawning the process to the
+first served request, with and without FAST_START.
+
+Each run starts `uvicorn app.main:app` on the same database (a temporary
+SQLite file by default, or --database-url), polls GET /system/pool until it
+answers, then reads the worker's own profile from GET /system/startup
+(imports, app construction, schema check). The first run of each mode
+creates or updates the schema and is not counted.
+
+Usage (from backend/): python -m benchmarks.startup [--runs 5] [--database-url postgresql://...]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from statistics import median
+from time import perf_counter, sleep
+
+import httpx
+
+from benchmarks.listeners import free_port
+
+POLL_INTERVAL = 0.005
+
+
+def cold_start(env: dict[str, str]) -> dict[str, float]:
+    port = free_port()
+    start = perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"], env=env
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            while True:
+                try:
+                    client.get("/system/pool").raise_for_status()
+                    break
+                except httpx.TransportError:
+                    if server.poll() is not None:
+                        raise RuntimeError("server exited during startup")
+                    sleep(POLL_INTERVAL)
+            first_request = perf_counter() - start
+            profile = client.get("/system/startup").json()
+    finally:
+        server.terminate()
+        server.wait()
+    return {"first_request": first_request, "ready": profile["ready_seconds"] or 0.0, **profile["phases_seconds"]}
+
+
+def main(args: argparse.Namespace) -> None:
+    workdir = Path(tempfile.mkdtemp(prefix="snd-startup-"))
+    env = dict(os.environ, DATABASE_URL=args.database_url or f"sqlite:///{workdir / 'startup.db'}", MEDIA_ROOT=str(workdir))
+    columns = ("first_request", "ready", "imports", "app", "schema")
+    print(f"{'mode':<12}" + "".join(f"{column + ' ms':>18}" for column in columns))
+    for fast_start in ("false", "true"):
+        mode_env = dict(env, FAST_START=fast_start)
+        cold_start(mode_env)  # Crée ou met à jour le schéma et enregistre sa version
+        runs = [cold_start(mode_env) for _ in range(args.runs)]
+        medians = {column: median(run.get(column) or 0.0 for run in runs) for column in columns}
+        label = "fast start" if fast_start == "true" else "create_all"
+        print(f"{label:<12}" + "".join(f"{medians[column] * 1000:>18.0f}" for column in columns))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="measured starts per mode (medians are printed)")
+    parser.add_argument("--database-url", help="default: a temporary SQLite file")
+    main(parser.parse_args())
@@ -0,0 +1,610 @@
+"""
+Latency and throughput of every route of app/routers/, as a baseline CI can
+compare against.
+
+Seeds a fresh database (SQLite in --workdir by default, or --database-url,
+e.g. a local PostgreSQL) with benchmarks.seed at --rows, then runs every
+scenario below either in-process (ASGI transport, no network) or over HTTP
+against one uvicorn worker. Per route it reports p50/p95/p99 latency,
+throughput and the peak RSS of the process serving the requests (Linux:
+the high-water mark is reset before each route).
+
+Each scenario prepares its requests before the clock starts, including rows
+that DELETE requests consume. Writes change the data: use a fresh database
+(the default) for numbers comparable between runs.
+
+Usage (from backend/):
+    python -m benchmarks.suite --rows 10k --output baseline.json
+    python -m benchmarks.suite --rows 10k --compare baseline.json --tolerance 0.25
+
+Exits with status 1 when a route has no scenario, or with --compare when a
+route got slower (p95) or lost throughput beyond the tolerance, or returned
+more errors.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from itertools import count
+from pathlib import Path
+from statistics import quantiles
+from time import perf_counter
+from typing import Any, Awaitable, Callable
+from uuid import uuid4
+
+import httpx
+
+from benchmarks.listeners import free_port, make_wav, wait_ready
+from benchmarks.seed import AUDIO_FILE, PEAKS_FILE, SIZES, Dataset
+
+# Une différence de p95 plus petite que ça n'est pas une régression (bruit de mesure)
+MIN_REGRESSION_MS = 0.5
+OK_STATUSES = frozenset({200, 201, 202, 204, 206})
+
+Call = tuple[str, dict[str, Any]]  # chemin, arguments de httpx (params, json, headers)
+
+
+@dataclass
+class Context:
+    client: httpx.AsyncClient
+    dataset: Dataset
+    rng: random.Random
+    run_id: str = field(default_factory=lambda: uuid4().hex[:8])
+    sequence: count = field(default_factory=count)
+
+    def unique(self, prefix: str) -> str:
+        return f"{prefix}-{self.run_id}-{next(self.sequence)}"
+
+    def pick(self, size: int) -> int:
+        return self.rng.randint(1, size)
+
+    async def create(self, path: str, body: dict[str, Any]) -> dict[str, Any]:
+        response = await self.client.post(path, json=body)
+        response.raise_for_status()
+        return response.json()
+
+
+@dataclass
+class Scenario:
+    method: str
+    route: str  # Tel que déclaré dans le routeur : sert de nom et au contrôle de couverture
+    build: Callable[[Context], Awaitable[Call]]
+    requests: int | None = None  # Pour les routes trop lourdes pour le nombre de requêtes par défaut
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.route}"
+
+
+SCENARIOS: list[Scenario] = []
+
+
+def route(method: str, path: str, requests: int | None = None) -> Callable:
+    def register(build: Callable[[Context], Awaitable[Call]]) -> Callable:
+        SCENARIOS.append(Scenario(method, path, build, requests))
+        return build
+    return register
+
+
+def product_body(ctx: Context, name: str) -> dict:
+    return {"name": name, "description": "Benchmark product", "price": round(ctx.rng.uniform(1, 500), 2), "in_stock": True}
+
+def place_body(ctx: Context, name: str) -> dict:
+    return {"name": name, "address": "1 rue du Banc", "zip_code": 75001, "city": "Paris", "country": "FR",
+            "latitude": ctx.rng.uniform(42.5, 51.0), "longitude": ctx.rng.uniform(-4.5, 8.0)}
+
+def person_body(ctx: Context) -> dict:
+    return {"firstname": "Ada", "lastname": "Lovelace", "email": f"{ctx.unique('ada')}@example.com"}
+
+def event_body(ctx: Context) -> dict:
+    happened_on = datetime(2024, 1, 1) + timedelta(seconds=ctx.rng.randrange(365 * 24 * 3600))
+    return {"name": ctx.unique("event"), "happened_on": happened_on.isoformat(),
+            "place_id": ctx.pick(ctx.dataset.places), "entity_id": ctx.pick(ctx.dataset.entities)}
+
+def ids(ctx: Context, size: int, count: int = 20) -> list[int]:
+    return [ctx.pick(size) for _ in range(count)]
+
+
+# Produits
+@route("POST", "/products/")
+async def _(ctx): return "/products/", {"json": product_body(ctx, ctx.unique("product"))}
+
+@route("POST", "/products/bulk")
+async def _(ctx): return "/products/bulk", {"json": [product_body(ctx, ctx.unique("product")) for _ in range(100)]}
+
+@route("PUT", "/products/bulk")
+async def _(ctx): return "/products/bulk", {"json": [product_body(ctx, f"product-{i}") for i in ids(ctx, ctx.dataset.products, 100)]}
+
+@route("PUT", "/products/{product_name}")
+async def _(ctx):
+    name = f"product-{ctx.pick(ctx.dataset.products)}"
+    return f"/products/{name}", {"json": product_body(ctx, name)}
+
+@route("GET", "/products/batch")
+async def _(ctx): return "/products/batch", {"params": {"names": [f"product-{i}" for i in ids(ctx, ctx.dataset.products, 50)]}}
+
+@route("GET", "/products/{product_name}")
+async def _(ctx): return f"/products/product-{ctx.pick(ctx.dataset.products)}", {}
+
+@route("GET", "/products/")
+async def _(ctx): return "/products/", {"params": {"limit": 100}}
+
+@route("PATCH", "/products/{product_name}")
+async def _(ctx): return f"/products/product-{ctx.pick(ctx.dataset.products)}", {"json": {"price": 9.99}}
+
+@route("DELETE", "/products/{product_name}")
+async def _(ctx): return f"/products/{(await ctx.create('/products/', product_body(ctx, ctx.unique('product'))))['name']}", {}
+
+@route("DELETE", "/products/{product_name}/permanent")
+async def _(ctx): return f"/products/{(await ctx.create('/products/', product_body(ctx, ctx.unique('product'))))['name']}/permanent", {}
+
+
+# Musiques
+@route("POST", "/musics/")
+async def _(ctx): return "/musics/", {"json": {"title": ctx.unique("title"), "artist": "artist", "album": "album"}}
+
+@route("POST", "/musics/bulk")
+async def _(ctx): return "/musics/bulk", {"json": [{"title": ctx.unique("title"), "artist": "artist", "album": "album"} for _ in range(100)]}
+
+@route("GET", "/musics/{music_name}")
+async def _(ctx): return f"/musics/title-{ctx.pick(ctx.dataset.musics)}", {}
+
+@route("GET", "/musics/")
+async def _(ctx): return "/musics/", {"params": {"limit": 100}}
+
+
+# Lieux
+@route("POST", "/places/")
+async def _(ctx): return "/places/", {"json": place_body(ctx, ctx.unique("place"))}
+
+@route("POST", "/places/bulk")
+async def _(ctx): return "/places/bulk", {"json": [place_body(ctx, ctx.unique("place")) for _ in range(100)]}
+
+@route("GET", "/places/nearby")
+async def _(ctx):
+    return "/places/nearby", {"params": {"lat": ctx.rng.uniform(43, 50), "lon": ctx.rng.uniform(-3, 7), "radius": 20, "k": 10}}
+
+@route("PUT", "/places/bulk")
+async def _(ctx): return "/places/bulk", {"json": [place_body(ctx, f"place-{i}") for i in ids(ctx, ctx.dataset.places, 100)]}
+
+@route("PUT", "/places/{place_name}")
+async def _(ctx):
+    name = f"place-{ctx.pick(ctx.dataset.places)}"
+    return f"/places/{name}", {"json": place_body(ctx, name)}
+
+@route("GET", "/places/{place_name}")
+async def _(ctx): return f"/places/place-{ctx.pick(ctx.dataset.places)}", {}
+
+@route("GET", "/places/")
+async def _(ctx): return "/places/", {"params": {"limit": 100}}
+
+
+# Personnes et entités (liens denses)
+@route("POST", "/persons/")
+async def _(ctx): return "/persons/", {"json": person_body(ctx)}
+
+@route("POST", "/persons/bulk")
+async def _(ctx): return "/persons/bulk", {"json": [person_body(ctx) for _ in range(100)]}
+
+@route("GET", "/persons/")
+async def _(ctx): return "/persons/", {"params": {"limit": 100}}
+
+@route("GET", "/persons/batch")
+async def _(ctx): return "/persons/batch", {"params": {"ids": ids(ctx, ctx.dataset.persons, 50)}}
+
+@route("GET", "/persons/{person_id}")
+async def _(ctx): return f"/persons/{ctx.pick(ctx.dataset.persons)}", {}
+
+@route("GET", "/persons/by_email/{email}")
+async def _(ctx): return f"/persons/by_email/person{ctx.pick(ctx.dataset.persons)}@example.com", {}
+
+@route("PATCH", "/persons/{person_id}")
+async def _(ctx): return f"/persons/{ctx.pick(ctx.dataset.persons)}", {"json": {"lastname": "Byron"}}
+
+@route("DELETE", "/persons/{person_id}")
+async def _(ctx): return f"/persons/{(await ctx.create('/persons/', person_body(ctx)))['id']}", {}
+
+@route("POST", "/persons/{person_id}/entities/{entity_id}")
+async def _(ctx): return f"/persons/{ctx.pick(ctx.dataset.persons)}/entities/{ctx.pick(ctx.dataset.entities)}", {}
+
+@route("DELETE", "/persons/{person_id}/entities/{entity_id}")
+async def _(ctx): return f"/persons/{ctx.pick(ctx.dataset.persons)}/entities/{ctx.pick(ctx.dataset.entities)}", {}
+
+@route("POST", "/persons/{person_id}/entities")
+async def _(ctx): return f"/persons/{ctx.pick(ctx.dataset.persons)}/entities", {"json": {"ids": ids(ctx, ctx.dataset.entities)}}
+
+@route("DELETE", "/persons/{person_id}/entities")
+async def _(ctx): return f"/persons/{ctx.pick(ctx.dataset.persons)}/entities", {"json": {"ids": ids(ctx, ctx.dataset.entities)}}
+
+@route("POST", "/entities/")
+async def _(ctx): return "/entities/", {"json": {"name": ctx.unique("entity")}}
+
+@route("POST", "/entities/bulk")
+async def _(ctx): return "/entities/bulk", {"json": [{"name": ctx.unique("entity")} for _ in range(100)]}
+
+@route("GET", "/entities/")
+async def _(ctx): return "/entities/", {"params": {"limit": 100}}
+
+@route("GET", "/entities/{entity_id}")
+async def _(ctx): return f"/entities/{ctx.pick(ctx.dataset.entities)}", {}
+
+@route("GET", "/entities/by_name/{entity_name}")
+async def _(ctx): return f"/entities/by_name/entity-{ctx.pick(ctx.dataset.entities)}", {}
+
+@route("PATCH", "/entities/{entity_id}")
+async def _(ctx):
+    entity_id = ctx.pick(ctx.dataset.entities)
+    return f"/entities/{entity_id}", {"json": {"name": f"entity-{entity_id}"}}
+
+@route("DELETE", "/entities/{entity_id}")
+async def _(ctx): return f"/entities/{(await ctx.create('/entities/', {'name': ctx.unique('entity')}))['id']}", {}
+
+@route("POST", "/entities/{entity_id}/persons/{person_id}")
+async def _(ctx): return f"/entities/{ctx.pick(ctx.dataset.entities)}/persons/{ctx.pick(ctx.dataset.persons)}", {}
+
+@route("DELETE", "/entities/{entity_id}/persons/{person_id}")
+async def _(ctx): return f"/entities/{ctx.pick(ctx.dataset.entities)}/persons/{ctx.pick(ctx.dataset.persons)}", {}
+
+@route("POST", "/entities/{entity_id}/persons")
+async def _(ctx): return f"/entities/{ctx.pick(ctx.dataset.entities)}/persons", {"json": {"ids": ids(ctx, ctx.dataset.persons, 100)}}
+
+@route("DELETE", "/entities/{entity_id}/persons")
+async def _(ctx): return f"/entities/{ctx.pick(ctx.dataset.entities)}/persons", {"json": {"ids": ids(ctx, ctx.dataset.persons, 100)}}
+
+
+# Playlists, audio, peaks, pistes
+@route("POST", "/playlists/")
+async def _(ctx): return "/playlists/", {"json": {"name": ctx.unique("playlist"), "filename": AUDIO_FILE}}
+
+@route("GET", "/playlists/")
+async def _(ctx): return "/playlists/", {"params": {"limit": 100}}
+
+@route("GET", "/playlists/{playlist_id}")
+async def _(ctx): return f"/playlists/{ctx.pick(ctx.dataset.playlists)}", {}
+
+@route("PATCH", "/playlists/{playlist_id}")
+async def _(ctx):
+    playlist_id = ctx.pick(ctx.dataset.playlists)
+    return f"/playlists/{playlist_id}", {"json": {"name": f"playlist-{playlist_id}"}}
+
+@route("DELETE", "/playlists/{playlist_id}")
+async def _(ctx): return f"/playlists/{(await ctx.create('/playlists/', {'name': ctx.unique('playlist'), 'filename': AUDIO_FILE}))['id']}", {}
+
+@route("POST", "/playlists/{playlist_id}/listen")
+async def _(ctx): return f"/playlists/{ctx.pick(ctx.dataset.playlists)}/listen", {}
+
+@route("GET", "/playlists/{playlist_id}/audio")
+async def _(ctx):
+    start = ctx.rng.randrange(0, 4 * 1024 * 1024)
+    return f"/playlists/{ctx.pick(ctx.dataset.playlists)}/audio", {"headers": {"Range": f"bytes={start}-{start + 65535}"}}
+
+@route("GET", "/playlists/{playlist_id}/peaks")
+async def _(ctx):
+    start = ctx.rng.uniform(0, 20)
+    params = {"start": start, "end": start + 10, "resolution": 1024}
+    return f"/playlists/{ctx.pick(ctx.dataset.playlists)}/peaks", {"params": params}
+
+# Toujours la playlist 1 : un seul calcul à la fois, les suivants renvoient le job en cours
+@route("POST", "/playlists/{playlist_id}/peaks", requests=20)
+async def _(ctx): return "/playlists/1/peaks", {}
+
+@route("GET", "/playlists/{playlist_id}/peaks/job")
+async def _(ctx): return "/playlists/1/peaks/job", {}
+
+@route("POST", "/tracks/")
+async def _(ctx): return "/tracks/", {"json": {"music_id": ctx.pick(ctx.dataset.musics), "start_time": 0, "end_time": 180}}
+
+@route("GET", "/tracks/{track_id}")
+async def _(ctx): return f"/tracks/{ctx.pick(ctx.dataset.tracks)}", {}
+
+@route("PATCH", "/tracks/{track_id}")
+async def _(ctx): return f"/tracks/{ctx.pick(ctx.dataset.tracks)}", {"json": {"music_id": ctx.pick(ctx.dataset.musics)}}
+
+@route("DELETE", "/tracks/{track_id}")
+async def _(ctx): return f"/tracks/{(await ctx.create('/tracks/', {'start_time': 0}))['id']}", {}
+
+@route("GET", "/playlists/{playlist_id}/tracks")
+async def _(ctx): return f"/playlists/{ctx.pick(ctx.dataset.playlists)}/tracks", {}
+
+@route("GET", "/playlists/{playlist_id}/tracks/at")
+async def _(ctx):
+    tracks_per_playlist = ctx.dataset.tracks // ctx.dataset.playlists
+    return f"/playlists/{ctx.pick(ctx.dataset.playlists)}/tracks/at", {"params": {"t": ctx.rng.uniform(0, tracks_per_playlist * 180)}}
+
+@route("GET", "/playlists/{playlist_id}/tracks/between")
+async def _(ctx):
+    start = ctx.rng.uniform(0, ctx.dataset.tracks // ctx.dataset.playlists * 180)
+    return f"/playlists/{ctx.pick(ctx.dataset.playlists)}/tracks/between", {"params": {"start": start, "end": start + 3600}}
+
+
+# Événements
+@route("POST", "/events/")
+async def _(ctx): return "/events/", {"json": event_body(ctx)}
+
+@route("GET", "/events/")
+async def _(ctx):
+    start = datetime(2024, 1, 1) + timedelta(days=ctx.rng.randrange(330))
+    params = {"start": start.isoformat(), "end": (start + timedelta(days=7)).isoformat(), "limit": 100}
+    return "/events/", {"params": params}
+
+@route("GET", "/events/details")
+async def _(ctx):
+    start = datetime(2024, 1, 1) + timedelta(days=ctx.rng.randrange(330))
+    params = {"start": start.isoformat(), "end": (start + timedelta(days=7)).isoformat(), "limit": 100}
+    return "/events/details", {"params": params}
+
+@route("GET", "/events/histogram")
+async def _(ctx):
+    return "/events/histogram", {"params": {"granularity": "day", "start": "2024-01-01T00:00:00", "end": "2025-01-01T00:00:00"}}
+
+@route("GET", "/events/{event_id}")
+async def _(ctx): return f"/events/{ctx.pick(ctx.dataset.events)}", {}
+
+@route("PATCH", "/events/{event_id}")
+async def _(ctx): return f"/events/{ctx.pick(ctx.dataset.events)}", {"json": {"name": ctx.unique("event")}}
+
+@route("DELETE", "/events/{event_id}")
+async def _(ctx): return f"/events/{(await ctx.create('/events/', event_body(ctx)))['id']}", {}
+
+
+# Export complet : une requête lit toute la table
+@route("GET", "/export/{resource}", requests=3)
+async def _(ctx): return f"/export/{ctx.rng.choice(['products', 'persons', 'places', 'musics'])}", {}
+
+@route("GET", "/search/")
+async def _(ctx): return "/search/", {"params": {"q": ctx.rng.choice(["product-1", "place-2", "title-3", "first-4", "city-5"])}}
+
+@route("GET", "/system/pool")
+async def _(ctx): return "/system/pool", {}
+
+@route("GET", "/system/cache")
+async def _(ctx): return "/system/cache", {}
+
+@route("GET", "/system/listens")
+async def _(ctx): return "/system/listens", {}
+
+@route("GET", "/system/startup")
+async def _(ctx): return "/system/startup", {}
+
+@route("GET", "/metrics")
+async def _(ctx): return "/metrics", {}
+
+
+def reset_peak_rss(pid: int) -> None:
+    # "5" remet VmHWM à la taille courante (Linux >= 4.0)
+    try:
+        Path(f"/proc/{pid}/clear_refs").write_text("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb(pid: int) -> float | None:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if pid == os.getpid():
+        # Pic depuis le démarrage du processus, en Ko sur Linux et en octets sur macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return None
+
+
+async def run_scenario(ctx: Context, scenario: Scenario, args: argparse.Namespace, pid: int) -> dict[str, Any]:
+    total = scenario.requests or args.requests
+    calls = [await scenario.build(ctx) for _ in range(min(args.warmup, total) + total)]
+    warmup, calls = calls[:-total], calls[-total:]
+    for path, kwargs in warmup:
+        await ctx.client.request(scenario.method, path, **kwargs)
+
+    reset_peak_rss(pid)
+    latencies: list[float] = []
+    statuses: Counter[int] = Counter()
+    pending = iter(calls)
+
+    async def worker() -> None:
+        for path, kwargs in pending:
+            start = perf_counter()
+            response = await ctx.client.request(scenario.method, path, **kwargs)
+            latencies.append(perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(args.concurrency, total))))
+    elapsed = perf_counter() - start
+    cuts = quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": total,
+        "errors": sum(n for status, n in statuses.items() if status not in OK_STATUSES),
+        "statuses": {str(status): n for status, n in sorted(statuses.items())},
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        "throughput_rps": total / elapsed,
+        "peak_rss_mb": peak_rss_mb(pid),
+    }
+
+
+def uncovered_routes(app: Any) -> list[str]:
+    from fastapi.routing import APIRoute
+
+    declared = {
+        f"{method} {api_route.path}"
+        for api_route in app.routes if isinstance(api_route, APIRoute)
+        for method in api_route.methods if method != "HEAD"
+    }
+    return sorted(declared - {scenario.name for scenario in SCENARIOS})
+
+
+async def run_all(client: httpx.AsyncClient, dataset: Dataset, args: argparse.Namespace, pid: int) -> dict[str, Any]:
+    ctx = Context(client=client, dataset=dataset, rng=random.Random(args.seed))
+    results = {}
+    for scenario in SCENARIOS:
+        if args.only and not re.search(args.only, scenario.name):
+            continue
+        result = await run_scenario(ctx, scenario, args, pid)
+        results[scenario.name] = result
+        print(
+            f"{scenario.name:<48} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+            f"{result['throughput_rps']:>9.1f} {result['errors']:>6} {result['peak_rss_mb'] or 0:>8.1f}"
+        )
+    return results
+
+
+def prepare_media(media_root: Path) -> None:
+    from app.peaks import generate_peaks
+
+    make_wav(media_root / AUDIO_FILE, 8)
+    generate_peaks(str(media_root / AUDIO_FILE), str(media_root / PEAKS_FILE), 256, 262144)
+
+
+async def main(args: argparse.Namespace) -> dict[str, Any]:
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="snd-bench-"))
+    media_root = workdir / "media"
+    media_root.mkdir(parents=True, exist_ok=True)
+    env = {
+        "DATABASE_URL": args.database_url or f"sqlite:///{workdir / 'bench.db'}",
+        "DB_ASYNC": "true" if args.db_async else "false",
+        "MEDIA_ROOT": str(media_root),
+    }
+    # Avant l'import de l'application : la configuration est lue à l'import
+    os.environ.update(env)
+
+    from sqlalchemy import func, select
+
+    import app.main
+    from app.db.db_setup import create_db_and_tables, get_engine
+    from app.models.product import Product
+    from benchmarks.seed import seed
+
+    create_db_and_tables()
+    engine = get_engine()
+    with engine.connect() as connection:
+        empty = connection.execute(select(func.count()).select_from(Product)).scalar_one() == 0
+    if not empty and not args.reuse:
+        raise SystemExit("The database is not empty: pass --reuse to benchmark it as is")
+    if empty:
+        dataset = seed(engine, args.rows, args.memberships, args.seed)
+    else:
+        with engine.connect() as connection:
+            dataset = Dataset.load(connection)
+    prepare_media(media_root)
+
+    uncovered = uncovered_routes(app.main.app)
+    if uncovered:
+        print(f"Routes without a scenario: {', '.join(uncovered)}", file=sys.stderr)
+    print(f"{'route':<48} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>9} {'errors':>6} {'RSS MB':>8}")
+
+    if args.mode == "inprocess":
+        transport = httpx.ASGITransport(app=app.main.app, raise_app_exceptions=False)
+        async with app.main.lifespan(app.main.app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                results = await run_all(client, dataset, args, os.getpid())
+    else:
+        engine.dispose()  # Le serveur a ses propres connexions
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", "1", "--log-level", "warning"],
+            env=dict(os.environ, **env),
+        )
+        try:
+            limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=None) as client:
+                await wait_ready(client)
+                results = await run_all(client, dataset, args, server.pid)
+        finally:
+            server.terminate()
+            server.wait()
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "mode": args.mode,
+            "database": engine.dialect.name,
+            "db_async": args.db_async,
+            "rows": args.rows,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "dataset": asdict(dataset),
+        "results": results,
+        "uncovered": uncovered,
+    }
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """
+    Routes that regressed against `baseline`: p95 more than `tolerance`
+    slower, throughput more than `tolerance` lower, or more errors.
+    """
+    for key in ("mode", "database", "rows", "concurrency"):
+        if report["meta"].get(key) != baseline["meta"].get(key):
+            print(f"Warning: {key} differs from the baseline ({baseline['meta'].get(key)})", file=sys.stderr)
+    regressions = []
+    print(f"\n{'route':<48} {'p95 ms':>8} {'base':>8} {'change':>8} {'req/s':>9} {'base':>9}")
+    for name, result in report["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        change = result["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        reasons = []
+        if change > tolerance and result["p95_ms"] - base["p95_ms"] > MIN_REGRESSION_MS:
+            reasons.append(f"p95 {change:+.0%}")
+        if result["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            reasons.append(f"throughput {result['throughput_rps'] / base['throughput_rps'] - 1:+.0%}")
+        if result["errors"] > base["errors"]:
+            reasons.append(f"errors {base['errors']} -> {result['errors']}")
+        if reasons:
+            regressions.append(f"{name}: {', '.join(reasons)}")
+        print(
+            f"{name:<48} {result['p95_ms']:>8.2f} {base['p95_ms']:>8.2f} {change:>+8.0%} "
+            f"{result['throughput_rps']:>9.1f} {base['throughput_rps']:>9.1f}{'  REGRESSION' if reasons else ''}"
+        )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=lambda value: SIZES.get(value.lower()) or int(value), default=SIZES["10k"],
+                        help="dataset size: 10k, 100k, 1m or a number")
+    parser.add_argument("--memberships", type=int, default=5, help="entities per person")
+    parser.add_argument("--mode", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--database-url", help="default: SQLite in --workdir")
+    parser.add_argument("--db-async", action="store_true", help="run the app with DB_ASYNC")
+    parser.add_argument("--workdir", help="database and media directory (default: a new temporary directory)")
+    parser.add_argument("--reuse", action="store_true", help="benchmark a database that is already seeded")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per route")
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests per route")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", help="regex on 'METHOD /route' to run a subset")
+    parser.add_argument("--output", help="write the report (JSON) to this file")
+    parser.add_argument("--compare", help="baseline report (JSON) to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    failed = bool(report["uncovered"])
+    if args.compare:
+        regressions = compare(report, json.loads(Path(args.compare).read_text()), args.tolerance)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            failed = True
+    sys.exit(1 if failed else 0)
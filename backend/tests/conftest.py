@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# Avant tout import de l'application : la configuration et les moteurs sont lus une seule fois
+_workdir = tempfile.mkdtemp(prefix="snd-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_workdir}/test.db")
+os.environ.setdefault("MEDIA_ROOT", _workdir)
+# Sans cache, chaque lecture par nom/email passe par la base : comptes de requêtes déterministes
+os.environ.setdefault("CACHE_BACKEND", "none")
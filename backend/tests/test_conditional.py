@@ -0,0 +1,31 @@
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+@pytest.fixture(scope="module")
+def client() -> Iterator[TestClient]:
+    with TestClient(app) as client:
+        yield client
+
+
+def test_unchanged_collection_answers_304_to_if_none_match(client: TestClient) -> None:
+    client.post("/products/", json={"name": "cond-unchanged"})
+    etag = client.get("/products/").headers["etag"]
+    assert client.get("/products/", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_hard_delete_of_an_older_row_is_not_a_304(client: TestClient) -> None:
+    for name in ("cond-older", "cond-newer"):
+        assert client.post("/products/", json={"name": name}).status_code == 201
+    first = client.get("/products/")
+    # max(updated_at) ne change pas : seul le nombre de lignes, dans l'ETag, trahit la suppression
+    assert client.delete("/products/cond-older/permanent").status_code == 200
+
+    after_delete = client.get("/products/", headers={"If-Modified-Since": first.headers["last-modified"]})
+    assert after_delete.status_code == 200
+    assert "cond-older" not in [product["name"] for product in after_delete.json()["items"]]
+    assert client.get("/products/", headers={"If-None-Match": first.headers["etag"]}).status_code == 200
@@ -0,0 +1,29 @@
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+@pytest.fixture(scope="module")
+def client() -> Iterator[TestClient]:
+    with TestClient(app) as client:
+        # happened_on est stocké en UTC sans fuseau : 10:30+02:00 devient 08:30
+        response = client.post("/events/", json={"name": "tz-event", "happened_on": "2031-03-01T10:30:00+02:00"})
+        assert response.status_code == 201
+        yield client
+
+
+def names(client: TestClient, path: str, **params: str) -> list[str]:
+    response = client.get(path, params=params)
+    assert response.status_code == 200, response.text
+    return [event["name"] for event in response.json()["items"]]
+
+
+@pytest.mark.parametrize("path", ["/events/", "/events/details"])
+def test_range_bounds_with_a_time_zone_are_converted_to_utc(client: TestClient, path: str) -> None:
+    assert names(client, path, start="2031-03-01T10:00:00+02:00", end="2031-03-01T11:00:00+02:00") == ["tz-event"]
+    assert names(client, path, start="2031-03-01T08:00:00Z", end="2031-03-01T09:00:00Z") == ["tz-event"]
+    # 10:00 à 10:45 UTC : l'événement (08:30 UTC) est avant
+    assert names(client, path, start="2031-03-01T12:00:00+02:00", end="2031-03-01T12:45:00+02:00") == []
@@ -0,0 +1,38 @@
+import random
+from math import degrees
+
+import pytest
+
+from app.geo import EARTH_RADIUS_KM, covering_prefixes, encode_geohash, haversine_km
+
+
+def missed_points(latitude: float, longitude: float, radius_km: float, rng: random.Random) -> int:
+    """In-radius random points whose geohash is outside every covering prefix."""
+    prefixes = covering_prefixes(latitude, longitude, radius_km)
+    radius_deg = degrees(radius_km / EARTH_RADIUS_KM)
+    missed = 0
+    for _ in range(200):
+        point_lat = min(max(latitude + rng.uniform(-radius_deg, radius_deg), -90.0), 90.0)
+        point_lon = rng.uniform(-180.0, 180.0)  # Toutes les longitudes : près des pôles le cercle les traverse
+        if haversine_km(latitude, longitude, point_lat, point_lon) > radius_km:
+            continue
+        geohash = encode_geohash(point_lat, point_lon)
+        missed += not any(geohash.startswith(prefix) for prefix in prefixes)
+    return missed
+
+
+def test_nine_cells_away_from_the_poles() -> None:
+    assert len(covering_prefixes(48.8566, 2.3522, 10)) == 9
+
+
+@pytest.mark.parametrize("radius_km", [1, 100, 1000])
+@pytest.mark.parametrize("latitude", [80.0, 84.5, 89.9, -87.0])
+def test_high_latitude_circles_are_covered(latitude: float, radius_km: float) -> None:
+    rng = random.Random(f"{latitude}-{radius_km}")
+    assert sum(missed_points(latitude, rng.uniform(-180.0, 180.0), radius_km, rng) for _ in range(50)) == 0
+
+
+def test_circle_containing_the_pole_covers_every_longitude() -> None:
+    prefixes = covering_prefixes(89.5, 10.0, 100)
+    for longitude in range(-180, 180, 5):
+        assert any(encode_geohash(89.9, longitude).startswith(prefix) for prefix in prefixes)
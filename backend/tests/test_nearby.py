@@ -0,0 +1,15 @@
+import re
+
+from sqlalchemy.dialects import postgresql
+
+from app.crud.place import _nearby_postgis_statement
+
+
+def test_postgis_statement_binds_every_parameter() -> None:
+    compiled = _nearby_postgis_statement(48.85, 2.35, 10, 5).compile(dialect=postgresql.psycopg2.dialect())
+    sql = str(compiled)
+    # Un :name resté brut est une erreur de syntaxe pour PostgreSQL
+    assert not re.search(r"(?<!:):[a-z_]+", sql), sql
+    assert sql.count("%(longitude)s") == 3 and sql.count("%(latitude)s") == 3
+    assert compiled.params["longitude"] == 2.35 and compiled.params["latitude"] == 48.85
+    assert compiled.params["radius_m"] == 10000
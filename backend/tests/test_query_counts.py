@@ -0,0 +1,85 @@
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, event
+
+from app.db.db_setup import DB_ASYNC, get_async_engine, get_engine
+from app.main import app
+
+
+class QueryCounter:
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.count = 0
+
+    def __call__(self, *args) -> None:
+        self.count += 1
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine, "before_cursor_execute", self)
+
+
+@pytest.fixture(scope="module")
+def client() -> Iterator[TestClient]:
+    with TestClient(app) as client:
+        entities = [client.post("/entities/", json={"name": f"qc-entity-{i}"}).json() for i in range(3)]
+        persons = [
+            client.post("/persons/", json={"firstname": "Ada", "lastname": "Lovelace", "email": f"qc-{i}@example.com"}).json()
+            for i in range(3)
+        ]
+        for person in persons:
+            response = client.post(f"/persons/{person['id']}/entities", json={"ids": [entity["id"] for entity in entities]})
+            assert response.status_code == 200
+        client.entity_id, client.person_id = entities[0]["id"], persons[0]["id"]
+        yield client
+
+
+def get(client: TestClient, path: str) -> tuple[int, dict]:
+    """Number of statements run to answer GET `path`, and the response body."""
+    engine = get_async_engine().sync_engine if DB_ASYNC else get_engine()
+    with QueryCounter(engine) as counter:
+        response = client.get(path)
+    assert response.status_code == 200, response.text
+    return counter.count, response.json()
+
+
+def test_list_persons_does_not_load_entities(client: TestClient) -> None:
+    count, page = get(client, "/persons/")
+    assert count == 1
+    assert "entities" not in page["items"][0]
+
+
+def test_list_entities_does_not_load_persons(client: TestClient) -> None:
+    count, page = get(client, "/entities/")
+    assert count == 1
+    assert "persons" not in page["items"][0]
+
+
+def test_person_by_id(client: TestClient) -> None:
+    # Version (ETag), la personne, puis ses entités en une requête IN
+    count, person = get(client, f"/persons/{client.person_id}")
+    assert count == 3
+    assert len(person["entities"]) == 3
+
+
+def test_entity_by_id(client: TestClient) -> None:
+    count, entity = get(client, f"/entities/{client.entity_id}")
+    assert count == 3
+    assert len(entity["persons"]) == 3
+
+
+def test_person_by_email(client: TestClient) -> None:
+    count, person = get(client, "/persons/by_email/qc-0@example.com")
+    assert count == 2
+    assert len(person["entities"]) == 3
+
+
+def test_entity_by_name(client: TestClient) -> None:
+    count, entity = get(client, "/entities/by_name/qc-entity-0")
+    assert count == 2
+    assert len(entity["persons"]) == 3